@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Check the import time of service entry modules against a budget.
+
+Each module is imported in a fresh interpreter with `python -X importtime`, and
+the cumulative time of the module is compared to its budget. Heavy dependencies
+(torch, vLLM, Selenium, provider SDKs...) should only be imported when used, so a
+module going over budget usually means something started importing them eagerly.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# module -> cumulative import time budget, in milliseconds
+BUDGETS_MS = {
+    "src.utils.config_loader": 100,
+    "src.a2rchi.models": 50,
+    "src.a2rchi.pipelines": 50,
+    "src.interfaces.redmine_mailer_integration.mailbox": 1500,
+    "src.interfaces.piazza": 3000,
+}
+
+
+def measure(module: str) -> Tuple[Optional[float], List[Tuple[float, str]], str]:
+    """
+    Import module in a fresh interpreter and return its cumulative import time (ms),
+    the (cumulative ms, name) of every module it imported, and stderr on failure.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}" if module else "pass"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return None, [], result.stderr
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        imports.append((int(cumulative) / 1000, name))
+
+    total = next((ms for ms, name in reversed(imports) if name == module), None)
+    return total, imports, ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check module import times against budgets.")
+    parser.add_argument("modules", nargs="*", help="Modules to check (defaults to all budgeted modules)")
+    parser.add_argument("--budget", type=float, help="Budget in ms for the given modules (overrides the defaults)")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest imports to show per module")
+    args = parser.parse_args()
+
+    budgets: Dict[str, float] = (
+        {module: args.budget or BUDGETS_MS.get(module, float("inf")) for module in args.modules}
+        if args.modules else dict(BUDGETS_MS)
+    )
+
+    # modules imported by the interpreter itself at startup are not part of any module's cost
+    _, startup_imports, _ = measure("")
+    startup = {name for _, name in startup_imports}
+
+    failed = False
+    for module, budget in budgets.items():
+        total, imports, error = measure(module)
+        if total is None:
+            failed = True
+            print(f"[FAIL] {module}: import failed\n{error.strip().splitlines()[-1] if error.strip() else ''}")
+            continue
+
+        status = "OK" if total <= budget else "FAIL"
+        failed |= status == "FAIL"
+        print(f"[{status}] {module}: {total:.1f} ms (budget {budget:g} ms)")
+        # skip the module itself and its parent packages, whose times include it
+        dependencies = [
+            (ms, name) for ms, name in imports
+            if not module.startswith(name) and name not in startup
+        ]
+        for ms, name in sorted(dependencies, reverse=True)[:args.top]:
+            print(f"         {ms:8.1f} ms  {name}")
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+import asyncio
+import dataclasses
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Union
+
 import src.a2rchi.pipelines as A2rchiPipelines 
 from src.utils.config_loader import load_config
 from src.utils.logging import get_logger
@@ -6,6 +12,9 @@ from src.a2rchi.utils.vectorstore_connector import VectorstoreConnector
 
 logger = get_logger(__name__)
 
+# default number of pipeline calls A2rchi.batch runs at once
+DEFAULT_BATCH_CONCURRENCY = 8
+
 class A2rchi():
     """
     Central class of the A2rchi framework.
@@ -86,6 +95,70 @@ class A2rchi():
         result = self.pipeline.invoke(*args, **call_kwargs)
         return self._ensure_pipeline_output(result)
 
+    async def ainvoke(self, *args, **kwargs) -> PipelineOutput:
+        """
+        Asynchronous invoke. Uses the pipeline's own ainvoke if it has one,
+        otherwise runs the (blocking) invoke in a worker thread.
+        """
+        call_kwargs = await asyncio.to_thread(self._prepare_call_kwargs, kwargs)
+        pipeline_ainvoke = getattr(self.pipeline, "ainvoke", None)
+        if callable(pipeline_ainvoke):
+            result = await pipeline_ainvoke(*args, **call_kwargs)
+        else:
+            result = await asyncio.to_thread(self.pipeline.invoke, *args, **call_kwargs)
+        return self._ensure_pipeline_output(result)
+
+    def batch(
+        self,
+        inputs: Sequence[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Union[PipelineOutput, Exception]]:
+        """
+        Invoke the pipeline once per item of inputs (each a dict of invoke kwargs, e.g.
+        {"history": ...}), running up to max_concurrency calls at a time. All calls share
+        one vectorstore connection. Results come back in the order of inputs, and each
+        carries its own duration in metadata["elapsed_seconds"].
+
+        A failing item does not affect the others: with return_exceptions (the default)
+        its exception takes its place in the results, otherwise the first one is raised.
+        """
+        if not inputs:
+            return []
+
+        vectorstore = self._prepare_call_kwargs({})["vectorstore"]
+
+        def run(item_kwargs: Dict[str, Any]) -> PipelineOutput:
+            start = time.perf_counter()
+            result = self._ensure_pipeline_output(
+                self.pipeline.invoke(**{"vectorstore": vectorstore, **item_kwargs})
+            )
+            elapsed = time.perf_counter() - start
+            return dataclasses.replace(result, metadata={**result.metadata, "elapsed_seconds": elapsed})
+
+        max_workers = max(1, min(max_concurrency or DEFAULT_BATCH_CONCURRENCY, len(inputs)))
+        results: List[Union[PipelineOutput, Exception]] = []
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="a2rchi-batch") as executor:
+            futures = [executor.submit(run, dict(item_kwargs)) for item_kwargs in inputs]
+            for idx, future in enumerate(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    logger.error(f"Batch item {idx} failed: {e}")
+                    results.append(e)
+        return results
+
+    async def abatch(
+        self,
+        inputs: Sequence[Dict[str, Any]],
+        max_concurrency: Optional[int] = None,
+        return_exceptions: bool = True,
+    ) -> List[Union[PipelineOutput, Exception]]:
+        """Asynchronous batch, see batch."""
+        return await asyncio.to_thread(self.batch, inputs, max_concurrency, return_exceptions)
+
     def stream(self, *args, **kwargs):
         """
         Stream the pipeline output if the underlying pipeline supports it.
@@ -109,6 +182,25 @@ class A2rchi():
     def __call__(self, *args, **kwargs) -> PipelineOutput:
         return self.invoke(*args, **kwargs)
 
+    def close(self):
+        """
+        Release the resources shared with the rest of the process (e.g. the embedding model).
+        Only call it once no request is running on this instance; dropped instances
+        release them when they are garbage collected.
+        """
+        vs_connector = getattr(self, "vs_connector", None)
+        if vs_connector is not None:
+            vs_connector.close()
+        close_pipeline = getattr(getattr(self, "pipeline", None), "close", None)
+        if callable(close_pipeline):
+            close_pipeline()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
     
 
 
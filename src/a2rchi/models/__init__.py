@@ -1,26 +1,30 @@
-from src.a2rchi.models.anthropic import AnthropicLLM
-from src.a2rchi.models.base import BaseCustomLLM, print_model_params
-from src.a2rchi.models.claude import ClaudeLLM
-from src.a2rchi.models.dumb import DumbLLM
-from src.a2rchi.models.huggingface_image import HuggingFaceImageLLM
-from src.a2rchi.models.huggingface_open import HuggingFaceOpenLLM
-from src.a2rchi.models.llama import LlamaLLM
-from src.a2rchi.models.ollama import OllamaInterface
-from src.a2rchi.models.openai import OpenAILLM
-from src.a2rchi.models.safety import SalesforceSafetyChecker
-from src.a2rchi.models.vllm import VLLM
+"""
+Model classes, imported lazily: the provider SDKs, torch and vLLM are only
+loaded when the class that needs them is first accessed.
+"""
 
-__all__ = [
-    "AnthropicLLM",
-    "BaseCustomLLM",
-    "ClaudeLLM",
-    "DumbLLM",
-    "HuggingFaceImageLLM",
-    "HuggingFaceOpenLLM",
-    "LlamaLLM",
-    "OllamaInterface",
-    "OpenAILLM",
-    "SalesforceSafetyChecker",
-    "VLLM",
-    "print_model_params",
-]
+from src.utils.lazy_imports import make_lazy_getattr
+
+# name -> "module:attribute" for every class exported by this package
+_LAZY_IMPORTS = {
+    "AnthropicLLM": "src.a2rchi.models.anthropic:AnthropicLLM",
+    "BaseCustomLLM": "src.a2rchi.models.base:BaseCustomLLM",
+    "ClaudeLLM": "src.a2rchi.models.claude:ClaudeLLM",
+    "DumbLLM": "src.a2rchi.models.dumb:DumbLLM",
+    "HuggingFaceImageLLM": "src.a2rchi.models.huggingface_image:HuggingFaceImageLLM",
+    "HuggingFaceOpenLLM": "src.a2rchi.models.huggingface_open:HuggingFaceOpenLLM",
+    "LazyModel": "src.a2rchi.models.lazy:LazyModel",
+    "LlamaLLM": "src.a2rchi.models.llama:LlamaLLM",
+    "OllamaInterface": "src.a2rchi.models.ollama:OllamaInterface",
+    "OpenAILLM": "src.a2rchi.models.openai:OpenAILLM",
+    "SalesforceSafetyChecker": "src.a2rchi.models.safety:SalesforceSafetyChecker",
+    "VLLM": "src.a2rchi.models.vllm:VLLM",
+    "get_model_instance": "src.a2rchi.models.base:get_model_instance",
+    "init_pipeline_llms": "src.a2rchi.models.lazy:init_pipeline_llms",
+    "print_model_params": "src.a2rchi.models.base:print_model_params",
+    "resolve_model": "src.a2rchi.models.lazy:resolve_model",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+__getattr__, __dir__ = make_lazy_getattr(_LAZY_IMPORTS, __name__)
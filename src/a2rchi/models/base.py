@@ -1,13 +1,47 @@
+import copy
+import json
+import weakref
 from abc import abstractmethod
-from typing import Any, Dict, List, Optional, Union
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from langchain_core.caches import BaseCache
 from langchain_core.language_models.llms import LLM
 
+from src.utils.config_loader import resolve_class
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# model instances shared by every pipeline (and config) that asks for the same class with the same kwargs,
+# for as long as one of them holds on to it: a model is freed with the last pipeline using it
+_MODEL_INSTANCES: "weakref.WeakValueDictionary[Tuple[type, str], Any]" = weakref.WeakValueDictionary()
+_MODEL_INSTANCES_LOCK = Lock()
+
+
+def get_model_instance(model_class: type, model_kwargs: Dict[str, Any]) -> Any:
+    """
+    Return a shared instance of model_class built with model_kwargs, creating it on first use.
+
+    Parameters:
+    model_class (type): The model class, as mapped in the config's model_class_map.
+    model_kwargs (dict): The keyword arguments the model is constructed with.
+    """
+    model_class = resolve_class(model_class)
+    key = (model_class, json.dumps(model_kwargs or {}, sort_keys=True, default=repr))
+    with _MODEL_INSTANCES_LOCK:
+        instance = _MODEL_INSTANCES.get(key)
+        if instance is None:
+            # configs are read-only and shared, so give the model its own copy of the kwargs
+            instance = model_class(**copy.deepcopy(dict(model_kwargs or {})))
+            try:
+                _MODEL_INSTANCES[key] = instance
+            except TypeError:
+                logger.debug(f"Model class {model_class.__name__} does not support weak references, not sharing it")
+        else:
+            logger.debug(f"Reusing shared instance of model class {model_class.__name__}")
+    return instance
+
 
 def print_model_params(name: str, model_name: str, model_class_map: Dict[str, Dict[str, Any]]) -> None:
     """
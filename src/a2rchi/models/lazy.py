@@ -0,0 +1,117 @@
+from threading import Lock, Thread
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from src.a2rchi.models.base import get_model_instance
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class LazyModel(Runnable):
+    """
+    Stand-in for a model that is only instantiated (i.e. its weights loaded) the first
+    time it is used, so that optional models a deployment never calls cost nothing.
+
+    It is a Runnable, so it can be composed into chains like the model itself; invoking
+    or streaming it, or accessing any other attribute, materializes the model.
+    """
+
+    def __init__(self, llm_name: str, model_class: type, model_kwargs: Dict[str, Any]):
+        self.llm_name = llm_name
+        self.model_class = model_class
+        self.model_kwargs = model_kwargs
+        self._model = None
+        self._lock = Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self) -> Any:
+        """The underlying model, instantiated on first access."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    logger.info(f"Loading lazily initialised model '{self.llm_name}'")
+                    self._model = get_model_instance(self.model_class, self.model_kwargs)
+        return self._model
+
+    def prewarm(self) -> Thread:
+        """Load the model in a background thread, so the first call does not pay for it."""
+        thread = Thread(target=lambda: self.model, name=f"prewarm-{self.llm_name}", daemon=True)
+        thread.start()
+        return thread
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self.model.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await self.model.ainvoke(input, config, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        yield from self.model.stream(input, config, **kwargs)
+
+    async def astream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AsyncIterator[Any]:
+        async for chunk in self.model.astream(input, config, **kwargs):
+            yield chunk
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes not found on the proxy itself
+        if name.startswith("__") or name in ("_model", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"LazyModel({self.llm_name!r}, {state})"
+
+
+def resolve_model(model: Any) -> Any:
+    """Return the actual model behind a (possibly lazy) model."""
+    return model.model if isinstance(model, LazyModel) else model
+
+
+def init_pipeline_llms(
+    model_class_map: Dict[str, Any],
+    models_config: Dict[str, Any],
+    prewarm_optional: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build the models declared in a pipeline's config, by name. Required models are
+    instantiated right away; optional ones are wrapped in a LazyModel and only loaded
+    on first use (or in the background, with prewarm_optional). Models of the same
+    class are instantiated only once.
+    """
+    llms: Dict[str, Any] = {}
+    initialised_models: Dict[str, Any] = {}
+
+    required = models_config.get("required", {}) or {}
+    optional = models_config.get("optional", {}) or {}
+    all_models = dict(required, **optional)
+
+    for model_name, model_class_name in all_models.items():
+        if model_class_name in initialised_models:
+            llms[model_name] = initialised_models[model_class_name]
+            logger.debug(
+                "Reusing initialised model '%s' of class '%s'",
+                model_name,
+                model_class_name,
+            )
+            continue
+
+        model_entry = model_class_map[model_class_name]
+        model_class = model_entry["class"]
+        model_kwargs = model_entry["kwargs"]
+        if model_name in required:
+            instance = get_model_instance(model_class, model_kwargs)
+        else:
+            instance = LazyModel(model_name, model_class, model_kwargs)
+            if prewarm_optional:
+                instance.prewarm()
+        llms[model_name] = instance
+        initialised_models[model_class_name] = instance
+
+    return llms
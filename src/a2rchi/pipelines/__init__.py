@@ -1,17 +1,21 @@
-"""Pipeline package exposing the available pipeline classes."""
+"""Pipeline package exposing the available pipeline classes.
 
-from .classic_pipelines.base import BasePipeline
-from .classic_pipelines.grading import GradingPipeline
-from .classic_pipelines.image_processing import ImageProcessingPipeline
-from .classic_pipelines.qa import QAPipeline
-from .agents.base import BaseAgent
-from .agents.cms_comp_ops_agent import CMSCompOpsAgent
+Pipelines are imported lazily, so that e.g. LangGraph is only loaded by
+services that actually run an agent.
+"""
 
-__all__ = [
-    "BasePipeline",
-    "GradingPipeline",
-    "ImageProcessingPipeline",
-    "QAPipeline",
-    "BaseAgent",
-    "CMSCompOpsAgent",
-]
+from src.utils.lazy_imports import make_lazy_getattr
+
+# name -> "module:attribute" for every pipeline exported by this package
+_LAZY_IMPORTS = {
+    "BasePipeline": "src.a2rchi.pipelines.classic_pipelines.base:BasePipeline",
+    "GradingPipeline": "src.a2rchi.pipelines.classic_pipelines.grading:GradingPipeline",
+    "ImageProcessingPipeline": "src.a2rchi.pipelines.classic_pipelines.image_processing:ImageProcessingPipeline",
+    "QAPipeline": "src.a2rchi.pipelines.classic_pipelines.qa:QAPipeline",
+    "BaseAgent": "src.a2rchi.pipelines.agents.base:BaseAgent",
+    "CMSCompOpsAgent": "src.a2rchi.pipelines.agents.cms_comp_ops_agent:CMSCompOpsAgent",
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+__getattr__, __dir__ = make_lazy_getattr(_LAZY_IMPORTS, __name__)
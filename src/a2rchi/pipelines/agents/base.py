@@ -1,16 +1,33 @@
-from typing import Any, Callable, Dict, List, Optional, Sequence, Iterator, AsyncIterator
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Iterator, AsyncIterator
 
 from langchain.agents import create_agent
-from langchain_core.messages import BaseMessage, SystemMessage
+from langchain.tools import tool
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langgraph.errors import GraphRecursionError
 from langgraph.graph.state import CompiledStateGraph
 
+from src.a2rchi.models.lazy import init_pipeline_llms, resolve_model
 from src.a2rchi.pipelines.agents.utils.prompt_utils import read_prompt
 from src.a2rchi.utils.output_dataclass import PipelineOutput
 from src.a2rchi.pipelines.agents.utils.document_memory import DocumentMemory
+from src.a2rchi.pipelines.agents.utils.run_budget import RunBudget
+from src.a2rchi.pipelines.agents.utils.tool_result_cache import ToolResult, ToolResultCache
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Per-run state lives in context variables rather than on the (shared) agent instance,
+# so that concurrent requests served by one agent don't see each other's memory or tools.
+# Each thread / asyncio task has its own context; LangChain copies it into tool executors.
+_run_memory: ContextVar[Optional[DocumentMemory]] = ContextVar("a2rchi_agent_run_memory", default=None)
+_run_agent: ContextVar[Optional[CompiledStateGraph]] = ContextVar("a2rchi_agent_run_graph", default=None)
+_run_conversation: ContextVar[Optional[Any]] = ContextVar("a2rchi_agent_run_conversation", default=None)
+# documents recorded by the tool call in progress, collected for the tool result cache
+_tool_documents: ContextVar[Optional[List[Tuple[str, List[Document]]]]] = ContextVar("a2rchi_agent_tool_documents", default=None)
+
 
 class BaseAgent:
     """
@@ -28,12 +45,15 @@ class BaseAgent:
         self.a2rchi_config = self.config["a2rchi"]
         self.dm_config = self.config["data_manager"]
         self.pipeline_config = self.a2rchi_config["pipeline_map"][self.__class__.__name__]
-        self._active_memory: Optional[DocumentMemory] = None
         self._static_tools: Optional[List[Callable]] = None
         self._active_tools: List[Callable] = []
+        self._agent_lock = Lock()
         self.agent: Optional[CompiledStateGraph] = None
         self.agent_llm: Optional[Any] = None
         self.agent_prompt: Optional[str] = None
+        # tool calls of one agent step run concurrently, on at most this many threads
+        self.max_parallel_tool_calls = max(1, int(self.pipeline_config.get("max_parallel_tool_calls", 4)))
+        self.tool_result_cache = self._init_tool_result_cache()
 
         self._init_llms()
         self._init_prompts()
@@ -41,7 +61,8 @@ class BaseAgent:
         if self.agent_llm is None:
             if not self.llms:
                 raise ValueError(f"No LLMs configured for agent {self.__class__.__name__}")
-            self.agent_llm = self.llms.get("chat_model") or next(iter(self.llms.values()))
+            # the agent graph needs the model itself, so an optional (lazy) one is loaded here
+            self.agent_llm = resolve_model(self.llms.get("chat_model") or next(iter(self.llms.values())))
         if self.agent_prompt is None:
             self.agent_prompt = self.prompts.get("agent_prompt")
 
@@ -52,13 +73,30 @@ class BaseAgent:
     def start_run_memory(self) -> DocumentMemory:
         """Create and store the active memory for the current run."""
         memory = self.create_document_memory()
-        self._active_memory = memory
+        _run_memory.set(memory)
         return memory
 
     @property
     def active_memory(self) -> Optional[DocumentMemory]:
         """Return the memory currently associated with the run, if any."""
-        return self._active_memory
+        return _run_memory.get()
+
+    def _prepare_run(self, **kwargs) -> Tuple[Dict[str, Any], CompiledStateGraph]:
+        """Prepare the inputs for a new run and return them with the agent graph to execute."""
+        _run_agent.set(None)
+        _run_conversation.set(kwargs.get("conversation_id"))
+        agent_inputs = self._prepare_agent_inputs(**kwargs)
+        agent = _run_agent.get()
+        if agent is None:
+            agent = self.refresh_agent(force=self.agent is None)
+        return agent_inputs, agent
+
+    def _run_config(self) -> Dict[str, Any]:
+        """Config of an agent graph run; max_concurrency bounds the tool calls run in parallel."""
+        return {
+            "recursion_limit": int((self.pipeline_config.get("run_budget") or {}).get("max_steps", 50)),
+            "max_concurrency": self.max_parallel_tool_calls,
+        }
 
     def finalize_output(
         self,
@@ -79,92 +117,145 @@ class BaseAgent:
             final=final,
         )
 
+    def _start_budget(self) -> RunBudget:
+        """Budget of a new run, from the pipeline's run_budget config."""
+        return RunBudget.from_config(self.pipeline_config.get("run_budget"))
+
+    @staticmethod
+    def _is_final_answer(message: BaseMessage) -> bool:
+        return isinstance(message, AIMessage) and not message.tool_calls
+
+    def _should_stop(self, budget: RunBudget, messages: Sequence[BaseMessage]) -> bool:
+        """Whether the run must stop using tools now (unless the agent has just answered)."""
+        if not messages or self._is_final_answer(messages[-1]):
+            return False
+        budget.exhausted = budget.check()
+        return budget.exhausted is not None
+
+    def _finalization_messages(self, agent_inputs: Dict[str, Any], budget: RunBudget) -> List[BaseMessage]:
+        """Prompt for a final answer, without tools, from the documents the run collected so far."""
+        memory = self.active_memory
+        documents = memory.unique_documents() if memory else []
+        context = "\n\n".join(
+            f"[{idx}] {doc.metadata.get('filename') or doc.metadata.get('source') or 'unknown source'}\n"
+            f"{doc.page_content[:800]}"
+            for idx, doc in enumerate(documents[:8], start=1)
+        ) or "(no documents were retrieved)"
+        instruction = (
+            "You can no longer use tools. Answer the latest question now, as well as you can, "
+            "using only the conversation and these documents:\n\n" + context
+        )
+        messages: List[BaseMessage] = []
+        if self.agent_prompt:
+            messages.append(SystemMessage(content=self.agent_prompt))
+        messages.extend(agent_inputs.get("messages", []))
+        messages.append(HumanMessage(content=instruction))
+        logger.info(
+            f"{self.__class__.__name__} run hit its {budget.exhausted} budget after {budget.elapsed:.1f}s "
+            f"and {budget.tokens_used} tokens; finalizing with {len(documents)} document(s)"
+        )
+        return messages
+
+    def _run_metadata(self, budget: RunBudget) -> Dict[str, Any]:
+        """Budget consumption of the run and, with the tool result cache, its hits and misses."""
+        metadata: Dict[str, Any] = {"budget": budget.as_metadata()}
+        memory = self.active_memory
+        if self.tool_result_cache is not None and memory is not None:
+            metadata["tool_cache"] = memory.tool_call_stats()
+        return metadata
+
     def invoke(self, **kwargs) -> PipelineOutput:
-        """Synchronously invoke the agent graph and return the final output."""
+        """Synchronously run the agent graph, within the run budget, and return the final output."""
         logger.debug("Invoking %s", self.__class__.__name__)
-        agent_inputs = self._prepare_agent_inputs(**kwargs)
-        if self.agent is None:
-            self.refresh_agent(force=True)
-        logger.debug("Agent refreshed, invoking now")
-        answer_output = self.agent.invoke(agent_inputs, {"recursion_limit": 50})
+        agent_inputs, agent = self._prepare_run(**kwargs)
+        budget = self._start_budget()
+
+        all_messages: List[BaseMessage] = list(agent_inputs.get("messages", []))
+        try:
+            for event in agent.stream(agent_inputs, self._run_config(), stream_mode="updates"):
+                new_messages = self._extract_update_messages(event)
+                all_messages.extend(new_messages)
+                budget.record(new_messages)
+                if self._should_stop(budget, all_messages):
+                    break
+        except GraphRecursionError:
+            budget.exhausted = "steps"
+        if budget.exhausted:
+            final_message = self.agent_llm.invoke(self._finalization_messages(agent_inputs, budget))
+            budget.record([final_message])
+            all_messages.append(final_message)
         logger.debug("Agent invocation completed")
-        messages = self._extract_messages(answer_output)
-        metadata = self._metadata_from_agent_output(answer_output)
-        output = self._build_output_from_messages(messages, metadata=metadata)
-        return output
+
+        metadata = self._metadata_from_agent_output({"messages": all_messages})
+        metadata.update(self._run_metadata(budget))
+        return self._build_output_from_messages(all_messages, metadata=metadata)
 
     def stream(self, **kwargs) -> Iterator[PipelineOutput]:
         """Stream agent updates synchronously."""
         logger.debug("Streaming %s", self.__class__.__name__)
-        agent_inputs = self._prepare_agent_inputs(**kwargs)
-        if self.agent is None:
-            self.refresh_agent(force=True)
-
-        latest_messages: List[BaseMessage] = []
-        for event in self.agent.stream(agent_inputs, stream_mode="updates"):
-            messages = self._extract_messages(event)
-            if messages:
-                latest_messages = messages
-                content = self._message_content(messages[-1])
-                if content:
-                    yield self.finalize_output(
-                        answer=content,
-                        memory=self.active_memory,
-                        messages=messages,
-                        metadata={},
-                        final=False,
-                    )
-        yield self._build_output_from_messages(latest_messages)
+        agent_inputs, agent = self._prepare_run(**kwargs)
+        budget = self._start_budget()
+
+        all_messages: List[BaseMessage] = list(agent_inputs.get("messages", []))
+        try:
+            for event in agent.stream(agent_inputs, self._run_config(), stream_mode="updates"):
+                new_messages = self._extract_update_messages(event)
+                if new_messages:
+                    all_messages.extend(new_messages)
+                    budget.record(new_messages)
+                    yield self._build_partial_output(all_messages)
+                    if self._should_stop(budget, all_messages):
+                        break
+        except GraphRecursionError:
+            budget.exhausted = "steps"
+        if budget.exhausted:
+            final_message = self.agent_llm.invoke(self._finalization_messages(agent_inputs, budget))
+            budget.record([final_message])
+            all_messages.append(final_message)
+        yield self._build_output_from_messages(all_messages, metadata=self._run_metadata(budget))
 
     async def astream(self, **kwargs) -> AsyncIterator[PipelineOutput]:
         """Stream agent updates asynchronously."""
         logger.debug("Streaming %s asynchronously", self.__class__.__name__)
-        agent_inputs = self._prepare_agent_inputs(**kwargs)
-        if self.agent is None:
-            self.refresh_agent(force=True)
-
-        latest_messages: List[BaseMessage] = []
-        async for event in self.agent.astream(agent_inputs, stream_mode="updates"):
-            messages = self._extract_messages(event)
-            if messages:
-                latest_messages = messages
-                content = self._message_content(messages[-1])
-                if content:
-                    yield self.finalize_output(
-                        answer=content,
-                        memory=self.active_memory,
-                        messages=messages,
-                        metadata={},
-                        final=False,
-                    )
-        yield self._build_output_from_messages(latest_messages)
+        agent_inputs, agent = self._prepare_run(**kwargs)
+        budget = self._start_budget()
+
+        all_messages: List[BaseMessage] = list(agent_inputs.get("messages", []))
+        try:
+            async for event in agent.astream(agent_inputs, self._run_config(), stream_mode="updates"):
+                new_messages = self._extract_update_messages(event)
+                if new_messages:
+                    all_messages.extend(new_messages)
+                    budget.record(new_messages)
+                    yield self._build_partial_output(all_messages)
+                    if self._should_stop(budget, all_messages):
+                        break
+        except GraphRecursionError:
+            budget.exhausted = "steps"
+        if budget.exhausted:
+            final_message = await self.agent_llm.ainvoke(self._finalization_messages(agent_inputs, budget))
+            budget.record([final_message])
+            all_messages.append(final_message)
+        yield self._build_output_from_messages(all_messages, metadata=self._run_metadata(budget))
+
+    def _build_partial_output(self, messages: Sequence[BaseMessage]) -> PipelineOutput:
+        """Wrap the messages seen so far in a non-final PipelineOutput."""
+        return self.finalize_output(
+            answer=self._message_content(messages[-1]),
+            memory=self.active_memory,
+            messages=list(messages),
+            metadata={},
+            final=False,
+        )
 
     def _init_llms(self) -> None:
-        """Initialise language models declared for the pipeline."""
-
-        model_class_map = self.a2rchi_config["model_class_map"]
-        models_config = self.pipeline_config.get("models", {})
-        self.llms: Dict[str, Any] = {}
-
-        all_models = dict(models_config.get("required", {}), **models_config.get("optional", {}))
-        initialised_models: Dict[str, Any] = {}
-
-        for model_name, model_class_name in all_models.items():
-            if model_class_name in initialised_models:
-                self.llms[model_name] = initialised_models[model_class_name]
-                logger.debug(
-                    "Reusing initialised model '%s' of class '%s'",
-                    model_name,
-                    model_class_name,
-                )
-                continue
+        """Initialise language models declared for the pipeline; optional ones load on first use."""
 
-            model_entry = model_class_map[model_class_name]
-            model_class = model_entry["class"]
-            model_kwargs = model_entry["kwargs"]
-            instance = model_class(**model_kwargs)
-            self.llms[model_name] = instance
-            initialised_models[model_class_name] = instance
+        self.llms: Dict[str, Any] = init_pipeline_llms(
+            self.a2rchi_config["model_class_map"],
+            self.pipeline_config.get("models", {}),
+            prewarm_optional=self.a2rchi_config.get("prewarm_optional_models", False),
+        )
 
     def _init_prompts(self) -> None:
         """Initialise prompts defined in pipeline configuration."""
@@ -196,9 +287,64 @@ class BaseAgent:
 
     def rebuild_static_tools(self) -> List[Callable]:
         """Recompute and cache the static tool list."""
-        self._static_tools = list(self._build_static_tools())
+        self._static_tools = self._memoize_tools(self._build_static_tools())
         return self._static_tools
 
+    def _init_tool_result_cache(self) -> Optional[ToolResultCache]:
+        cache_cfg = self.pipeline_config.get("tool_result_cache", {}) or {}
+        if not cache_cfg.get("enabled", False):
+            return None
+        return ToolResultCache(
+            max_entries=cache_cfg.get("max_entries", 512),
+            ttl_seconds=cache_cfg.get("ttl_seconds", 1800),
+        )
+
+    def _corpus_version(self) -> Optional[str]:
+        """Version of what the tools search; cached tool results of other versions are not reused."""
+        return None
+
+    def _capture_tool_documents(self, stage: str, docs: Sequence[Document]) -> None:
+        """Let the tool result cache see the documents a tool records (call from the tools' store_docs)."""
+        captured = _tool_documents.get()
+        if captured is not None:
+            captured.append((stage, list(docs)))
+
+    def _memoize_tools(self, tools: Sequence[Callable]) -> List[Callable]:
+        """Wrap single-query tools so that repeated calls within a conversation are served from the tool result cache."""
+        if self.tool_result_cache is None:
+            return list(tools)
+        return [self._memoize_tool(t) if set(getattr(t, "args", {})) == {"query"} else t for t in tools]
+
+    def _memoize_tool(self, original: Any) -> Callable:
+        cache = self.tool_result_cache
+
+        def run(query: str) -> ToolResult:
+            token = _tool_documents.set([])
+            try:
+                output = original.invoke({"query": query})
+                return ToolResult(output=output, documents=_tool_documents.get())
+            finally:
+                _tool_documents.reset(token)
+
+        @tool(original.name, description=original.description)
+        def _memoized(query: str) -> str:
+            conversation_id = _run_conversation.get()
+            if conversation_id is None:
+                return original.invoke({"query": query})
+            key = cache.key(conversation_id, original.name, query, self._corpus_version())
+            result, hit = cache.get_or_compute(key, lambda: run(query))
+            memory = self.active_memory
+            if memory is not None:
+                memory.count_tool_call(cached=hit)
+                if hit:
+                    # the documents of a cached call still count as sources of this run
+                    for stage, docs in result.documents:
+                        memory.record(stage, docs)
+                    memory.note(f"{original.name}: {query} answered from the tool result cache.")
+            return result.output
+
+        return _memoized
+
     @property
     def tools(self) -> List[Callable]:
         """Return the cached static tools, rebuilding if necessary."""
@@ -218,23 +364,30 @@ class BaseAgent:
         extra_tools: Optional[Sequence[Callable]] = None,
         force: bool = False,
     ) -> CompiledStateGraph:
-        """Ensure the LangGraph agent reflects the latest tool set."""
+        """
+        Ensure the LangGraph agent reflects the requested tool set, and bind it to the current run.
+        The returned graph is the one the caller should execute, even if another request
+        refreshes the shared agent with a different tool set in the meantime.
+        """
         base_tools = list(static_tools) if static_tools is not None else self.tools
         toolset: List[Callable] = list(base_tools)
         if extra_tools:
             toolset.extend(extra_tools)
 
-        requires_refresh = (
-            force
-            or self.agent is None
-            or len(toolset) != len(self._active_tools)
-            or any(a is not b for a, b in zip(toolset, self._active_tools))
-        )
-        if requires_refresh:
-            logger.debug("Refreshing agent %s with %d tools", self.__class__.__name__, len(toolset))
-            self.agent = self._create_agent(toolset)
-            self._active_tools = list(toolset)
-        return self.agent
+        with self._agent_lock:
+            requires_refresh = (
+                force
+                or self.agent is None
+                or len(toolset) != len(self._active_tools)
+                or any(a is not b for a, b in zip(toolset, self._active_tools))
+            )
+            if requires_refresh:
+                logger.debug("Refreshing agent %s with %d tools", self.__class__.__name__, len(toolset))
+                self.agent = self._create_agent(toolset)
+                self._active_tools = list(toolset)
+            agent = self.agent
+        _run_agent.set(agent)
+        return agent
 
     def _create_agent(self, tools: Sequence[Callable]) -> CompiledStateGraph:
         """Create the LangGraph agent with the specified LLM, tools, and system prompt."""
@@ -265,6 +418,30 @@ class BaseAgent:
                 return messages
         return []
 
+    def _extract_update_messages(self, event: Any) -> List[BaseMessage]:
+        """
+        Pull the new messages out of a stream_mode="updates" event,
+        which maps each graph node that ran to the state update it returned.
+        """
+        messages = self._extract_messages(event)
+        if messages:
+            return messages
+        collected: List[BaseMessage] = []
+        if isinstance(event, dict):
+            for update in event.values():
+                collected.extend(self._extract_messages(update))
+        return collected
+
+    @staticmethod
+    def _tool_call_stages(messages: Sequence[BaseMessage]) -> List[str]:
+        """Memory stage names ("<tool>: <query>") of the tool calls in the messages, in the order they were issued."""
+        stages = []
+        for message in messages:
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                args = tool_call.get("args") or {}
+                stages.append(f"{tool_call.get('name')}: {args.get('query')}")
+        return stages
+
     def _message_content(self, message: BaseMessage) -> str:
         """Normalise message content to a printable string."""
         content = getattr(message, "content", "")
@@ -293,9 +470,12 @@ class BaseAgent:
         else:
             answer_text = "No answer generated by the agent."
         safe_metadata = dict(metadata or {})
+        memory = self.active_memory
+        if memory is not None:
+            memory.order_events(self._tool_call_stages(messages))
         return self.finalize_output(
             answer=answer_text,
-            memory=self.active_memory,
+            memory=memory,
             messages=messages,
             metadata=safe_metadata,
             final=final,
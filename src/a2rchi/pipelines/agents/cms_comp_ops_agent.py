@@ -1,22 +1,35 @@
 from __future__ import annotations
 
-from typing import Any, Callable, Dict, List, Sequence
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence
 
 from langchain_core.documents import Document
 
 from src.utils.logging import get_logger
 from src.a2rchi.pipelines.agents.base import BaseAgent
-from src.data_manager.vectorstore.retrievers import HybridRetriever
+from src.a2rchi.utils.context_compressor import ContextCompressor
+from src.data_manager.vectorstore.embeddings import (embedding_from_config,
+                                                     release_embedding_model)
+from src.data_manager.vectorstore.corpus_version import read_corpus_version
+from src.data_manager.vectorstore.retrievers import HybridRetriever, retrieval_cache_from_config
 from src.a2rchi.pipelines.agents.tools import (
     create_file_search_tool,
     create_metadata_search_tool,
     create_retriever_tool,
 )
+from src.a2rchi.models.lazy import resolve_model
+from src.a2rchi.pipelines.agents.utils.history_compactor import HistoryCompactor
 from src.a2rchi.pipelines.agents.utils.history_utils import infer_speaker
+from src.a2rchi.pipelines.classic_pipelines.utils.token_counter import get_token_counter
 from src.data_manager.collectors.utils.index_utils import CatalogService
 
 logger = get_logger(__name__)
 
+# The vectorstore connection of the current run. The retriever tool is built once and
+# resolves it at call time, so the agent graph is not recompiled for every request.
+_run_vectorstore: ContextVar[Optional[Any]] = ContextVar("a2rchi_agent_run_vectorstore", default=None)
+
 
 class CMSCompOpsAgent(BaseAgent):
     """Agent designed for CMS CompOps operations."""
@@ -32,12 +45,51 @@ class CMSCompOpsAgent(BaseAgent):
         self.catalog_service = CatalogService(
             data_path=self.config["global"]["DATA_PATH"]
         )
-        self._vector_retrievers = None
-        self._vector_tool = None
-
+        self.retrieval_cache = retrieval_cache_from_config(self.config)
+        self.context_compressor = self._init_context_compressor()
+        self.history_compactor = self._init_history_compactor()
+        self._vector_tools: Optional[List[Callable]] = None
+        self._retriever_lock = Lock()
+        self._retriever: Optional[HybridRetriever] = None
+        self._retriever_key: Optional[tuple] = None
         self.rebuild_static_tools()
         self.refresh_agent()
 
+    def _init_context_compressor(self) -> Optional[ContextCompressor]:
+        compression_cfg = self.pipeline_config.get("context_compression", {}) or {}
+        if not compression_cfg.get("enabled", False):
+            return None
+
+        logger.info("Initializing extractive context compression for the retriever tool")
+        return ContextCompressor(
+            embedding_from_config(self.dm_config, self.config.get("services", {})),
+            max_tokens=compression_cfg.get("max_tokens", 1500),
+            count_tokens=get_token_counter(self.agent_llm).count_many,
+            min_similarity=compression_cfg.get("min_similarity", 0.0),
+            min_sentences_per_document=compression_cfg.get("min_sentences_per_document", 1),
+        )
+
+    def _init_history_compactor(self) -> Optional[HistoryCompactor]:
+        compaction_cfg = self.pipeline_config.get("history_compaction", {}) or {}
+        if not compaction_cfg.get("enabled", False):
+            return None
+
+        # a dedicated (optional) summary model if the pipeline declares one, else the agent's own
+        summarizer = self.llms.get("history_summary_model") or self.agent_llm
+        return HistoryCompactor(
+            resolve_model(summarizer),
+            get_token_counter(self.agent_llm).count_many,
+            max_tokens=compaction_cfg.get("max_tokens", 3000),
+            keep_recent_messages=compaction_cfg.get("keep_recent_messages", 4),
+            summary_max_words=compaction_cfg.get("summary_max_words", 250),
+        )
+
+    def close(self) -> None:
+        """Release the embedding model held by the context compressor, if any."""
+        if self.context_compressor is not None:
+            release_embedding_model(self.context_compressor.embedding_model)
+            self.context_compressor = None
+
     def _build_static_tools(self) -> List[Callable]:
         """Initialise static tools that are always available to the agent."""
         file_search_tool = create_file_search_tool(
@@ -69,6 +121,7 @@ class CMSCompOpsAgent(BaseAgent):
 
     def _store_documents(self, stage: str, docs: Sequence[Document]) -> None:
         """Centralised helper used by tools to record documents into the active memory."""
+        self._capture_tool_documents(stage, docs)
         memory = self.active_memory
         if not memory:
             return
@@ -81,10 +134,15 @@ class CMSCompOpsAgent(BaseAgent):
             memory.record(stage, docs)
             memory.note(f"{stage} returned {len(list(docs))} document(s).")
 
-    def _prepare_inputs(self, history: Any, **kwargs) -> Dict[str, Any]:
-        """Create list of messages using LangChain's formatting."""
+    def _prepare_inputs(self, history: Any, conversation_id: Any = None, **kwargs) -> Dict[str, Any]:
+        """Create list of messages using LangChain's formatting, compacted to the history budget if enabled."""
         history = history or []
         history_messages = [infer_speaker(msg[0])(msg[1]) for msg in history]
+        if self.history_compactor is not None:
+            try:
+                history_messages = self.history_compactor.compact(conversation_id, history_messages)
+            except Exception as exc:
+                logger.warning(f"History compaction failed, passing the full history: {exc}")
         return {"history": history_messages}
 
     def _prepare_agent_inputs(self, **kwargs) -> Dict[str, Any]:
@@ -93,14 +151,10 @@ class CMSCompOpsAgent(BaseAgent):
         # event-level memory (which documents were retrieved)
         memory = self.start_run_memory()
        
-        # refresh vs connection
+        # bind this run's vectorstore connection; the retriever tools themselves are long-lived
         vectorstore = kwargs.get("vectorstore")
-        if vectorstore:
-            self._update_vector_retrievers(vectorstore)
-        else:
-            self._vector_retrievers = None
-            self._vector_tools = None
-        extra_tools = self._vector_tools if self._vector_tools else None
+        _run_vectorstore.set(vectorstore)
+        extra_tools = self._get_vector_tools() if vectorstore else None
 
         # ensure the latest files are indexed for the tools' use
         self.catalog_service.refresh()
@@ -108,7 +162,7 @@ class CMSCompOpsAgent(BaseAgent):
 
         self.refresh_agent(extra_tools=extra_tools)
 
-        inputs = self._prepare_inputs(history=kwargs.get("history"))
+        inputs = self._prepare_inputs(history=kwargs.get("history"), conversation_id=kwargs.get("conversation_id"))
         history_messages = inputs["history"]
         if history_messages:
             memory.note(f"History contains {len(history_messages)} message(s).")
@@ -119,26 +173,59 @@ class CMSCompOpsAgent(BaseAgent):
                 memory.note(f"Latest user message: {snippet}")
         return {"messages": history_messages}
 
-    def _update_vector_retrievers(self, vectorstore: Any) -> None:
-        """Instantiate or refresh the vectorstore retriever tool using hybrid retrieval."""
+    def _get_vector_tools(self) -> List[Callable]:
+        """The vectorstore retriever tools, built on first use and reused by every run."""
+        if self._vector_tools is None:
+            self._vector_tools = self._memoize_tools(self._build_vector_tools())
+        return self._vector_tools
+
+    def _vectorstore_corpus_version(self) -> Optional[str]:
+        collection_name = f"{self.dm_config['collection_name']}_with_{self.dm_config['embedding_name']}"
+        return read_corpus_version(self.config["global"]["DATA_PATH"], collection_name)
+
+    def _corpus_version(self) -> Optional[str]:
+        """The vectorstore's corpus version and the generation of the file catalog, which the tools search."""
+        return f"{self._vectorstore_corpus_version()}:{self.catalog_service.store.generation()}"
+
+    def _current_retriever(self) -> HybridRetriever:
+        """
+        The hybrid retriever over the vectorstore of the current run. It is reused across
+        runs as long as the corpus version is the same, so its BM25 index is built once
+        per version rather than once per request.
+        """
+        vectorstore = _run_vectorstore.get()
+        if vectorstore is None:
+            raise RuntimeError("No vectorstore connection is bound to this agent run")
+        corpus_version = self._vectorstore_corpus_version()
+        # without a published corpus version, there is no telling when the corpus changed
+        key = (corpus_version, vectorstore if corpus_version is None else None)
+
+        with self._retriever_lock:
+            if self._retriever is None or self._retriever_key != key:
+                logger.debug(f"Building hybrid retriever for corpus version {corpus_version}")
+                self._retriever = self._build_hybrid_retriever(vectorstore)
+                self._retriever_key = key
+            return self._retriever
+
+    def _build_hybrid_retriever(self, vectorstore: Any) -> HybridRetriever:
         retrievers_cfg = self.dm_config.get("retrievers", {})
         hybrid_cfg = retrievers_cfg.get("hybrid_retriever", {})
-        
-        k = hybrid_cfg["num_documents_to_retrieve"]
-        bm25_weight = hybrid_cfg["bm25_weight"]
-        semantic_weight = hybrid_cfg["semantic_weight"]
-        bm25_k1 = hybrid_cfg["bm25_k1"]
-        bm25_b = hybrid_cfg["bm25_b"]
 
-        hybrid_retriever = HybridRetriever(
+        return HybridRetriever(
             vectorstore=vectorstore,
-            k=k,
-            bm25_weight=bm25_weight,
-            semantic_weight=semantic_weight,
-            bm25_k1=bm25_k1,
-            bm25_b=bm25_b,
+            k=hybrid_cfg["num_documents_to_retrieve"],
+            bm25_weight=hybrid_cfg["bm25_weight"],
+            semantic_weight=hybrid_cfg["semantic_weight"],
+            bm25_k1=hybrid_cfg["bm25_k1"],
+            bm25_b=hybrid_cfg["bm25_b"],
+            cache=self.retrieval_cache,
+            identifier_lookup=(
+                self.catalog_service.find_by_identifiers if hybrid_cfg.get("exact_identifier_match", True) else None
+            ),
         )
 
+    def _build_vector_tools(self) -> List[Callable]:
+        """Instantiate the vectorstore retriever tools, using hybrid retrieval."""
         hybrid_description = (
             "Hybrid search over the knowledge base that combines both lexical (BM25) and semantic (vector) search. "
             "This automatically finds documents matching exact keywords, error messages, ticket IDs, filenames, "
@@ -147,13 +234,12 @@ class CMSCompOpsAgent(BaseAgent):
             "and conceptual similarity automatically."
         )
 
-        self._vector_retrievers = [hybrid_retriever]
-        self._vector_tools = []
-        self._vector_tools.append(
+        return [
             create_retriever_tool(
-                hybrid_retriever,
+                self._current_retriever,
                 name="search_vectorstore_hybrid",
                 description=hybrid_description,
                 store_docs=self._store_documents,
+                compressor=self.context_compressor,
             )
-        )
+        ]
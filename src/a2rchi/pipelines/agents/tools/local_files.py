@@ -78,25 +78,27 @@ def create_file_search_tool(
         if not query.strip():
             return "Please provide a non-empty search query."
 
-        pattern = re.compile(re.escape(query.strip()), re.IGNORECASE)
+        query_pattern = re.escape(query.strip())
+        pattern = re.compile(query_pattern, re.IGNORECASE)
         hits: List[Tuple[str, Path, Optional[Dict[str, object]], str]] = []
         docs: List[Document] = []
 
-        for resource_hash, path in catalog.iter_files():
-            # attempt to load a Document via catalog helper
-            doc = None
-            try:
-                doc = catalog.get_document_for_hash(resource_hash)
-            except Exception:
-                doc = None
-
+        # scan the extracted texts of the files the trigram index cannot rule out; the
+        # store is only read here, the data manager keeps it in line with the catalog
+        text_index = catalog.text_index
+        text_index.reload()
+        candidates = text_index.candidates(query_pattern)
+        for resource_hash in candidates if candidates is not None else text_index.hashes():
             # search the content
-            text = doc.page_content if doc else None
+            text = text_index.get_text(resource_hash)
             if not text:
                 continue
             match = pattern.search(text)
             if not match:
                 continue
+            path = catalog.get_filepath_for_hash(resource_hash)
+            if not path:
+                continue
 
             # form the snippet to pass to the LLM
             snippet = _collect_snippet(text, match, window=window)
@@ -108,8 +110,7 @@ def create_file_search_tool(
             hits.append((resource_hash, path, metadata, snippet))
 
             # store the Document
-            if doc:
-                docs.append(doc)
+            docs.append(Document(page_content=text, metadata={"source": str(path), **(metadata or {})}))
 
             if len(hits) >= max_results:
                 break
@@ -122,17 +123,6 @@ def create_file_search_tool(
     return _search_local_files
 
 
-def _flatten_metadata(data: Dict[str, object], prefix: str = "") -> Dict[str, str]:
-    flattened: Dict[str, str] = {}
-    for key, value in data.items():
-        full_key = f"{prefix}.{key}" if prefix else str(key)
-        if isinstance(value, dict):
-            flattened.update(_flatten_metadata(value, prefix=full_key))
-        else:
-            flattened[full_key] = "" if value is None else str(value)
-    return flattened
-
-
 def create_metadata_search_tool(
     catalog: CatalogService,
     *,
@@ -155,36 +145,28 @@ def create_metadata_search_tool(
 
         hits: List[Tuple[str, Path, Optional[Dict[str, object]], str]] = []
         docs: List[Document] = []
-        query_lower = query.lower()
-
-        for resource_hash, _ in catalog.metadata_index.items():
-            resource_metadata = catalog.get_metadata_for_hash(resource_hash)
-            if not isinstance(resource_metadata, dict):
-                continue
 
-            flattened = _flatten_metadata(resource_metadata)
-            matches = {
-                key: value
-                for key, value in flattened.items()
-                if query_lower in key.lower() or query_lower in value.lower()
-            }
-            if not matches:
+        # only read here: the data manager keeps the index in line with the catalog
+        catalog.metadata_search_index.reload()
+        # resources named exactly (ticket ID, URL, file name, hash) come first
+        exact = catalog.find_by_identifiers(query)
+        searched = [h for h, _ in catalog.metadata_search_index.search(query) if h not in exact]
+        for resource_hash in exact + searched:
+            path = catalog.get_filepath_for_hash(resource_hash)
+            if not path:
                 continue
+            resource_metadata = catalog.metadata_search_index.get(resource_hash) or {}
 
-            # obtain file path and content for snippet
+            # the content is only read for the results that are returned
             try:
-                doc = catalog.get_document_for_hash(resource_hash)
+                text = catalog.get_text_for_hash(resource_hash)
             except Exception:
-                doc = None
-            text = doc.page_content if doc else None
-
-            # build snippet from content
-            path = catalog.get_filepath_for_hash(resource_hash)
+                text = None
             hits.append((resource_hash, path, resource_metadata, text))
 
             # store docs
-            if doc:
-                docs.append(doc)
+            if text:
+                docs.append(Document(page_content=text, metadata={"source": str(path), **resource_metadata}))
 
             if len(hits) >= max_results:
                 break
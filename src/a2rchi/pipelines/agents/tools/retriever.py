@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Callable, Iterable, Optional, Sequence, Tuple
+from typing import TYPE_CHECKING, Callable, Iterable, Optional, Sequence, Tuple, Union
 
 from langchain.tools import tool
 from langchain_core.documents import Document
@@ -8,6 +8,9 @@ from langchain_core.retrievers import BaseRetriever
 
 from src.utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from src.a2rchi.utils.context_compressor import ContextCompressor
+
 logger = get_logger(__name__)
 
 
@@ -28,6 +31,20 @@ def _normalize_results(
     return normalized
 
 
+def _compress_results(
+    compressor: "ContextCompressor",
+    query: str,
+    docs: Sequence[Tuple[Document, Optional[float]]],
+) -> Sequence[Tuple[Document, Optional[float]]]:
+    """Compress the documents to the query, keeping the score of each one that is left."""
+    try:
+        compressed = compressor.compress_indexed(query, [doc for doc, _ in docs])
+    except Exception as exc:
+        logger.warning(f"Context compression failed, returning whole passages: {exc}")
+        return docs
+    return [(doc, docs[idx][1]) for idx, doc in compressed]
+
+
 def _format_documents_for_llm(
     docs: Sequence[Tuple[Document, Optional[float]]],
     *,
@@ -59,13 +76,14 @@ def _format_documents_for_llm(
 
 
 def create_retriever_tool(
-    retriever: BaseRetriever,
+    retriever: Union[BaseRetriever, Callable[[], BaseRetriever]],
     *,
     name: str = "search_knowledge_base",
     description: Optional[str] = None,
     max_documents: int = 4,
     max_chars: int = 800,
     store_docs: Optional[Callable[[str, Sequence[Document]], None]] = None,
+    compressor: Optional["ContextCompressor"] = None,
 ) -> Callable[[str], str]:
     """
     Wrap a `BaseRetriever` instance in a LangChain tool.
@@ -74,6 +92,10 @@ def create_retriever_tool(
     so the calling agent can ground its responses in the vector store content.
     If ``store_docs`` is provided, it will be invoked with the tool name and
     the list of retrieved ``Document`` objects before formatting the response.
+    ``retriever`` may also be a callable returning the retriever to use, resolved on
+    every call, so one tool can outlive the vectorstore connections it searches.
+    If ``compressor`` is provided, the passages are reduced to their sentences most
+    relevant to the query (see ``ContextCompressor``) before being cut at ``max_chars``.
     """
 
     tool_description = (
@@ -83,10 +105,13 @@ def create_retriever_tool(
 
     @tool(name, description=tool_description)
     def _retriever_tool(query: str) -> str:
-        results = retriever.invoke(query)
+        active = retriever if isinstance(retriever, BaseRetriever) else retriever()
+        results = active.invoke(query)
         docs = _normalize_results(results or [])
         if store_docs:
             store_docs(f"{name}: {query}", [doc for doc, _ in docs])
+        if compressor is not None and docs:
+            docs = _compress_results(compressor, query, docs[:max_documents])
         return _format_documents_for_llm(docs, max_documents=max_documents, max_chars=max_chars)
 
     return _retriever_tool
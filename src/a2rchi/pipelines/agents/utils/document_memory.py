@@ -2,27 +2,46 @@
 
 from __future__ import annotations
 
+from threading import Lock
 from typing import Iterable, List, Sequence, Tuple
 
 from langchain_core.documents import Document
 
 
 class DocumentMemory:
-    """Track documents and textual annotations produced by agent tool calls."""
+    """
+    Track documents and textual annotations produced by agent tool calls.
+    Tool calls of one agent step may run concurrently, so recording is thread-safe.
+    """
     # TODO for now we return langchain's Document objects. We could think about returning the same Resource classes we use when collecting these (or vice versa) to reduce the amount of dataclasses to worry about.
     # TODO we don't collect retriever scores
 
     def __init__(self) -> None:
+        self._lock = Lock()
         self._document_events: List[Tuple[str, List[Document]]] = []
         self._notes: List[str] = []
+        self._tool_calls = {"cached": 0, "executed": 0}
 
     def record(self, stage: str, documents: Iterable[Document]) -> None:
         """Store the documents captured for a specific stage or tool call."""
         docs_list: List[Document] = [doc for doc in documents if doc]
         if not docs_list:
             return
-        self._document_events.append((stage, docs_list))
-    
+        with self._lock:
+            self._document_events.append((stage, docs_list))
+
+    def order_events(self, stages: Sequence[str]) -> None:
+        """
+        Put the document events in the order of the given stages (stable; events of
+        other stages go last), e.g. the order the agent issued concurrent tool calls in
+        rather than the order they happened to finish in.
+        """
+        position = {}
+        for idx, stage in enumerate(stages):
+            position.setdefault(stage, idx)
+        with self._lock:
+            self._document_events.sort(key=lambda event: position.get(event[0], len(position)))
+
     def record_documents(self, stage: str, documents: Iterable[Document]) -> None:
         """Convenience wrapper that records documents and appends a note.
 
@@ -39,7 +58,17 @@ class DocumentMemory:
         """Append a textual note describing an intermediate step."""
         if not message:
             return
-        self._notes.append(message)
+        with self._lock:
+            self._notes.append(message)
+
+    def count_tool_call(self, cached: bool) -> None:
+        """Count a tool call, served from the tool result cache or executed."""
+        with self._lock:
+            self._tool_calls["cached" if cached else "executed"] += 1
+
+    def tool_call_stats(self) -> dict:
+        with self._lock:
+            return dict(self._tool_calls)
 
     @property
     def notes(self) -> Sequence[str]:
@@ -0,0 +1,170 @@
+"""Token-budgeted compaction of the conversation history passed to agents."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+_SUMMARY_PROMPT = (
+    "Summarize the conversation below between a user and an assistant, in at most {max_words} words. "
+    "Keep every identifier (ticket IDs, sites, dataset and file names, error messages, commands), "
+    "what was tried, what was found and what is still open. Write only the summary.\n\n"
+    "{previous}"
+    "Conversation:\n{conversation}"
+)
+
+
+@dataclass
+class _Summary:
+    covered: int  # number of leading messages the summary replaces
+    digest: bytes  # of those messages, to tell whether a later history starts with them
+    text: str
+    tokens: int
+
+
+def _message_text(message: BaseMessage) -> str:
+    content = getattr(message, "content", "")
+    if isinstance(content, list):
+        content = " ".join(str(part) for part in content)
+    return str(content)
+
+
+def _digest(messages: Sequence[BaseMessage]) -> bytes:
+    digest = hashlib.blake2b(digest_size=16)
+    for message in messages:
+        digest.update(message.type.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(_message_text(message).encode("utf-8", "surrogatepass"))
+        digest.update(b"\0")
+    return digest.digest()
+
+
+class HistoryCompactor:
+    """
+    Keep the history given to an agent within ``max_tokens``: the most recent messages
+    are passed verbatim, the older ones are replaced by a rolling summary.
+
+    Summaries are cached per conversation. When the history outgrows the budget again,
+    the cached summary is extended with the messages that fell out of the verbatim
+    window instead of summarizing the whole conversation again, and the window is cut
+    back to ``target_ratio`` of the budget, so that the next turns fit without a new
+    summary.
+    """
+
+    def __init__(
+        self,
+        summarizer: Any,
+        count_tokens: Callable[[List[str]], List[int]],
+        max_tokens: int = 3000,
+        keep_recent_messages: int = 4,
+        summary_max_words: int = 250,
+        target_ratio: float = 0.5,
+        max_conversations: int = 1024,
+    ) -> None:
+        self.summarizer = summarizer
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+        self.keep_recent_messages = max(1, keep_recent_messages)
+        self.summary_max_words = summary_max_words
+        self.target_ratio = min(max(target_ratio, 0.1), 1.0)
+        self.max_conversations = max(1, max_conversations)
+
+        self._lock = Lock()
+        self._summaries: OrderedDict[Any, _Summary] = OrderedDict()
+
+    def compact(self, conversation_id: Optional[Any], messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+        """Return the messages, or a summary of the older ones followed by the recent ones, within the budget."""
+        messages = list(messages)
+        if len(messages) <= self.keep_recent_messages:
+            return messages
+        counts = self.count_tokens([_message_text(message) for message in messages])
+        if sum(counts) <= self.max_tokens:
+            return messages
+
+        key = conversation_id if conversation_id is not None else _digest(messages[:1])
+        with self._lock:
+            cached = self._summaries.get(key)
+            if cached is not None:
+                self._summaries.move_to_end(key)
+        if cached is not None and (cached.covered >= len(messages) or _digest(messages[:cached.covered]) != cached.digest):
+            cached = None  # a different (edited) history
+
+        if cached is not None and cached.tokens + sum(counts[cached.covered:]) <= self.max_tokens:
+            return self._with_summary(cached.text, messages[cached.covered:])
+
+        cut = self._cut(messages, counts)
+        if cached is not None and cut <= cached.covered:
+            # the recent turns alone exceed the budget: nothing more to summarize
+            return self._with_summary(cached.text, messages[cached.covered:])
+        start = cached.covered if cached is not None else 0
+        text = self._summarize(cached.text if cached is not None else None, messages[start:cut])
+        summary = _Summary(
+            covered=cut,
+            digest=_digest(messages[:cut]),
+            text=text,
+            tokens=self.count_tokens([SUMMARY_PREFIX + text])[0],
+        )
+        with self._lock:
+            self._summaries[key] = summary
+            self._summaries.move_to_end(key)
+            while len(self._summaries) > self.max_conversations:
+                self._summaries.popitem(last=False)
+        logger.info(
+            f"Compacted history of {len(messages)} messages ({sum(counts)} tokens): {cut} summarized "
+            f"into {summary.tokens} tokens, {len(messages) - cut} kept verbatim"
+        )
+        return self._with_summary(text, messages[cut:])
+
+    def _cut(self, messages: Sequence[BaseMessage], counts: Sequence[int]) -> int:
+        """
+        Index of the first message to keep verbatim: the newest messages that fit in the
+        target share of the budget (and at least keep_recent_messages), starting at a user turn.
+        """
+        target = self.max_tokens * self.target_ratio
+        cut, kept_tokens = len(messages), 0
+        while cut > 0:
+            kept = len(messages) - cut
+            if kept >= self.keep_recent_messages and kept_tokens + counts[cut - 1] > target:
+                break
+            cut -= 1
+            kept_tokens += counts[cut]
+        # do not split a turn: keep from the user message that starts it
+        while cut < len(messages) - 1 and not isinstance(messages[cut], HumanMessage):
+            cut += 1
+        return max(cut, 1)
+
+    def _summarize(self, previous: Optional[str], messages: Sequence[BaseMessage]) -> str:
+        conversation = "\n".join(
+            f"{'User' if isinstance(message, HumanMessage) else 'Assistant'}: {_message_text(message)}"
+            for message in messages
+        )
+        prompt = _SUMMARY_PROMPT.format(
+            max_words=self.summary_max_words,
+            previous=f"Summary of the conversation before it:\n{previous}\n\n" if previous else "",
+            conversation=conversation,
+        )
+        result = self.summarizer.invoke(prompt)
+        return str(getattr(result, "content", result)).strip()
+
+    @staticmethod
+    def _with_summary(summary: str, recent: List[BaseMessage]) -> List[BaseMessage]:
+        """Put the summary in front of the recent messages, merged into the first one if it is a user turn."""
+        if recent and isinstance(recent[0], HumanMessage):
+            first = HumanMessage(content=f"{SUMMARY_PREFIX}{summary}\n\n{_message_text(recent[0])}")
+            return [first, *recent[1:]]
+        return [HumanMessage(content=f"{SUMMARY_PREFIX}{summary}"), *recent]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._summaries.clear()
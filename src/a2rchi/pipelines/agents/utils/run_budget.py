@@ -0,0 +1,78 @@
+"""Wall-clock and token budgets of an agent run."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage
+
+
+class RunBudget:
+    """
+    Track the time and the model tokens an agent run has spent against its limits.
+
+    A run should stop calling tools once it is within ``reserve`` (a fraction) of a
+    limit, so that what is left is enough for a final answer. Tokens are taken from
+    the usage the model reports; models that report none are estimated from the
+    length of their output.
+    """
+
+    def __init__(
+        self,
+        max_seconds: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        reserve: float = 0.15,
+    ) -> None:
+        self.max_seconds = max_seconds or None
+        self.max_tokens = max_tokens or None
+        self.reserve = min(max(reserve, 0.0), 0.9)
+        self.started = time.monotonic()
+        self.tokens_used = 0
+        self.model_calls = 0
+        self.exhausted: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, budget_config: Optional[Dict[str, Any]]) -> "RunBudget":
+        budget_config = budget_config or {}
+        return cls(
+            max_seconds=budget_config.get("max_seconds"),
+            max_tokens=budget_config.get("max_tokens"),
+            reserve=budget_config.get("reserve", 0.15),
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def record(self, messages: Sequence[BaseMessage]) -> None:
+        """Account for the model calls among the new messages of the run."""
+        for message in messages:
+            if not isinstance(message, AIMessage):
+                continue
+            self.model_calls += 1
+            usage = getattr(message, "usage_metadata", None) or {}
+            tokens = usage.get("total_tokens")
+            if tokens is None:
+                content = message.content if isinstance(message.content, str) else str(message.content)
+                tokens = max(1, len(content) // 4)
+            self.tokens_used += int(tokens)
+
+    def check(self) -> Optional[str]:
+        """Return which limit ("time" or "tokens") is nearly reached, if any."""
+        headroom = 1.0 - self.reserve
+        if self.max_seconds is not None and self.elapsed >= self.max_seconds * headroom:
+            return "time"
+        if self.max_tokens is not None and self.tokens_used >= self.max_tokens * headroom:
+            return "tokens"
+        return None
+
+    def as_metadata(self) -> Dict[str, Any]:
+        return {
+            "elapsed_seconds": round(self.elapsed, 3),
+            "max_seconds": self.max_seconds,
+            "tokens_used": self.tokens_used,
+            "max_tokens": self.max_tokens,
+            "model_calls": self.model_calls,
+            "exhausted": self.exhausted,
+        }
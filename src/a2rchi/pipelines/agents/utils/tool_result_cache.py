@@ -0,0 +1,87 @@
+"""Conversation-scoped cache of agent tool results."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_tool_query(query: str) -> str:
+    """Tool queries differing only in case or whitespace are the same call."""
+    return " ".join(query.split()).casefold()
+
+
+@dataclass
+class ToolResult:
+    """What a tool call returned to the agent, and the documents it recorded."""
+
+    output: str
+    documents: List[Tuple[str, List[Document]]] = field(default_factory=list)
+
+
+class ToolResultCache:
+    """
+    LRU cache of tool results, keyed by (conversation, tool name, normalized query,
+    corpus version), so that follow-up turns repeating a tool call do not run it again.
+
+    Results are only reused within one conversation and one corpus version; entries
+    also expire after ``ttl_seconds``.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: Optional[float] = 1800):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = Lock()
+        self._entries: OrderedDict[Tuple, Tuple[float, ToolResult]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(conversation_id: Any, tool_name: str, query: str, corpus_version: Optional[str]) -> Tuple:
+        return (str(conversation_id), tool_name, normalize_tool_query(query), corpus_version)
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], ToolResult]) -> Tuple[ToolResult, bool]:
+        """Return the cached result of this call and True, or run compute() and return its result and False."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not self.ttl_seconds or now - entry[0] < self.ttl_seconds):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Tool result cache hit for {key[1]}: '{key[2]}'")
+                return entry[1], True
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result, False
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
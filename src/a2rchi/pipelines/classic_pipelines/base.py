@@ -4,6 +4,7 @@ from __future__ import annotations
 
 from typing import Any, Dict
 
+from src.a2rchi.models.lazy import init_pipeline_llms
 from src.a2rchi.pipelines.classic_pipelines.utils.prompt_utils import read_prompt
 from src.a2rchi.pipelines.classic_pipelines.utils.prompt_validator import ValidatedPromptTemplate
 from src.a2rchi.utils.output_dataclass import PipelineOutput
@@ -28,12 +29,16 @@ class BasePipeline:
         self.a2rchi_config = self.config["a2rchi"]
         self.dm_config = self.config["data_manager"]
         self.pipeline_config = self.a2rchi_config["pipeline_map"][self.__class__.__name__]
+        self.retriever = None
         self._init_llms()
         self._init_prompts()
 
     def update_retriever(self, vectorstore):
         self.retriever = None
 
+    def close(self) -> None:
+        """Release resources shared with the rest of the process; a no-op by default."""
+
     def invoke(self, *args, **kwargs) -> PipelineOutput:
         return PipelineOutput(
             answer="Stat rosa pristina nomine, nomina nuda tenemus.",
@@ -42,31 +47,13 @@ class BasePipeline:
         )
 
     def _init_llms(self) -> None:
-        """Initialise language models declared for the pipeline."""
-
-        model_class_map = self.a2rchi_config["model_class_map"]
-        models_config = self.pipeline_config.get("models", {})
-        self.llms: Dict[str, Any] = {}
-
-        all_models = dict(models_config.get("required", {}), **models_config.get("optional", {}))
-        initialised_models: Dict[str, Any] = {}
+        """Initialise language models declared for the pipeline; optional ones load on first use."""
 
-        for model_name, model_class_name in all_models.items():
-            if model_class_name in initialised_models:
-                self.llms[model_name] = initialised_models[model_class_name]
-                logger.debug(
-                    "Reusing initialised model '%s' of class '%s'",
-                    model_name,
-                    model_class_name,
-                )
-                continue
-
-            model_entry = model_class_map[model_class_name]
-            model_class = model_entry["class"]
-            model_kwargs = model_entry["kwargs"]
-            instance = model_class(**model_kwargs)
-            self.llms[model_name] = instance
-            initialised_models[model_class_name] = instance
+        self.llms: Dict[str, Any] = init_pipeline_llms(
+            self.a2rchi_config["model_class_map"],
+            self.pipeline_config.get("models", {}),
+            prewarm_optional=self.a2rchi_config.get("prewarm_optional_models", False),
+        )
 
     def _init_prompts(self) -> None:
         """Initialise prompts defined in pipeline configuration."""
@@ -7,9 +7,10 @@ from typing import Any, Dict
 from langchain_core.output_parsers import StrOutputParser
 
 from src.a2rchi.pipelines.classic_pipelines.utils.chain_wrappers import ChainWrapper
+from src.a2rchi.pipelines.classic_pipelines.utils.token_counter import get_token_counter
 from src.a2rchi.pipelines.classic_pipelines.base import BasePipeline
 from src.a2rchi.utils.output_dataclass import PipelineOutput
-from src.data_manager.vectorstore.retrievers import SemanticRetriever
+from src.data_manager.vectorstore.retrievers import SemanticRetriever, retrieval_cache_from_config
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -29,6 +30,7 @@ class GradingPipeline(BasePipeline):
         self.analysis_chain = None
         self.final_grade_chain = None
         self.retriever = None
+        self.retrieval_cache = retrieval_cache_from_config(self.config)
         self._init_chains()
 
     def _init_chains(self) -> None:
@@ -63,13 +65,17 @@ class GradingPipeline(BasePipeline):
         )
 
     def update_retriever(self, vectorstore):
+        self.retriever = self._build_retriever(vectorstore)
+
+    def _build_retriever(self, vectorstore) -> SemanticRetriever:
         retrievers_cfg = self.dm_config.get("retrievers", {})
         semantic_cfg = retrievers_cfg.get("semantic_retriever", {})
         default_k = self.dm_config.get("num_documents_to_retrieve", 4)
-        self.retriever = SemanticRetriever(
+        return SemanticRetriever(
             vectorstore=vectorstore,
             k=semantic_cfg.get("num_documents_to_retrieve", default_k),
             dm_config=self.dm_config,
+            cache=self.retrieval_cache,
         )
 
     def _estimate_grader_reserved_tokens(
@@ -80,11 +86,8 @@ class GradingPipeline(BasePipeline):
         additional_comments: str,
     ) -> int:
         reserved_tokens = 300
-        llm = self.llms['final_grade_model']
-        reserved_tokens += llm.get_num_tokens(submission_text)
-        reserved_tokens += llm.get_num_tokens(rubric_text)
-        reserved_tokens += llm.get_num_tokens(summary)
-        reserved_tokens += llm.get_num_tokens(additional_comments)
+        token_counter = get_token_counter(self.llms['final_grade_model'])
+        reserved_tokens += sum(token_counter.count_many([submission_text, rubric_text, summary, additional_comments]))
         logger.info("Estimated reserved tokens: %s", reserved_tokens)
         return reserved_tokens
 
@@ -96,8 +99,8 @@ class GradingPipeline(BasePipeline):
         vectorstore=None,
         **kwargs,
     ) -> PipelineOutput:
-        if vectorstore:
-            self.update_retriever(vectorstore)
+        # keep the retriever local to this call so concurrent gradings don't overwrite each other's
+        retriever = self._build_retriever(vectorstore) if vectorstore else self.retriever
 
         summary = "No solution summary."
         if self.summary_chain:
@@ -106,8 +109,8 @@ class GradingPipeline(BasePipeline):
             })['answer']
 
         retrieved_docs = []
-        if self.retriever:
-            retrieval = self.retriever.invoke(submission_text)
+        if retriever:
+            retrieval = retriever.invoke(submission_text)
             if retrieval:
                 retrieved_docs, _ = zip(*retrieval)
             else:
@@ -2,16 +2,25 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from langchain_classic.chains.combine_documents.stuff import create_stuff_documents_chain
 from langchain_core.output_parsers import StrOutputParser
 
 from src.a2rchi.pipelines.classic_pipelines.utils.chain_wrappers import ChainWrapper
 from src.a2rchi.pipelines.classic_pipelines.base import BasePipeline
+from src.a2rchi.utils.answer_cache import CacheLookup, SemanticAnswerCache
+from src.a2rchi.utils.context_compressor import ContextCompressor
 from src.a2rchi.utils.output_dataclass import PipelineOutput
-from src.data_manager.vectorstore.retrievers import SemanticRetriever, HybridRetriever
+from src.data_manager.collectors.utils.index_utils import CatalogService
+from src.data_manager.vectorstore.corpus_version import read_corpus_version
+from src.data_manager.vectorstore.embeddings import (embedding_from_config,
+                                                     release_embedding_model)
+from src.data_manager.vectorstore.retrievers import SemanticRetriever, HybridRetriever, retrieval_cache_from_config
 from src.a2rchi.pipelines.classic_pipelines.utils import history_utils
+from src.a2rchi.pipelines.classic_pipelines.utils.token_counter import get_token_counter
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -28,6 +37,8 @@ class QAPipeline(BasePipeline):
     ) -> None:
         super().__init__(config, *args, **kwargs)
 
+        self.retrieval_cache = retrieval_cache_from_config(self.config)
+        self.catalog = self._init_catalog()
         self.condense_chain = ChainWrapper(
             chain=self.prompts['condense_prompt']
             | self.llms['condense_model']
@@ -48,7 +59,79 @@ class QAPipeline(BasePipeline):
             required_input_variables=['question'],
             unprunable_input_variables=['question'],
             max_tokens=self.pipeline_config['max_tokens'],
+            context_packing=self.pipeline_config.get('context_packing'),
         )
+        self.answer_cache = self._init_answer_cache()
+        self.context_compressor = self._init_context_compressor()
+
+        speculative_cfg = self.pipeline_config.get("speculative_retrieval", {}) or {}
+        self.speculative_min_overlap = speculative_cfg.get("min_overlap", 0.8)
+        self._speculative_executor = (
+            ThreadPoolExecutor(thread_name_prefix="qa-speculative-retrieval")
+            if speculative_cfg.get("enabled", True) else None
+        )
+
+    def _init_answer_cache(self) -> Optional[SemanticAnswerCache]:
+        cache_cfg = self.pipeline_config.get("answer_cache", {}) or {}
+        if not cache_cfg.get("enabled", False):
+            return None
+
+        logger.info("Initializing semantic answer cache")
+        return SemanticAnswerCache(
+            embedding_from_config(self.dm_config, self.config.get("services", {})),
+            similarity_threshold=cache_cfg.get("similarity_threshold", 0.95),
+            max_entries=cache_cfg.get("max_entries", 1000),
+            ttl_seconds=cache_cfg.get("ttl_seconds"),
+        )
+
+    def _init_context_compressor(self) -> Optional[ContextCompressor]:
+        compression_cfg = self.pipeline_config.get("context_compression", {}) or {}
+        if not compression_cfg.get("enabled", False):
+            return None
+
+        logger.info("Initializing extractive context compression")
+        return ContextCompressor(
+            embedding_from_config(self.dm_config, self.config.get("services", {})),
+            max_tokens=compression_cfg.get("max_tokens", 1500),
+            count_tokens=get_token_counter(self.llms['chat_model']).count_many,
+            min_similarity=compression_cfg.get("min_similarity", 0.0),
+            min_sentences_per_document=compression_cfg.get("min_sentences_per_document", 1),
+        )
+
+    def close(self) -> None:
+        if self.answer_cache is not None:
+            release_embedding_model(self.answer_cache.embedding_model)
+            self.answer_cache = None
+        if self.context_compressor is not None:
+            release_embedding_model(self.context_compressor.embedding_model)
+            self.context_compressor = None
+        if self._speculative_executor is not None:
+            self._speculative_executor.shutdown(wait=False)
+            self._speculative_executor = None
+
+    def _corpus_version(self) -> Optional[str]:
+        collection_name = f"{self.dm_config['collection_name']}_with_{self.dm_config['embedding_name']}"
+        return read_corpus_version(self.config["global"]["DATA_PATH"], collection_name)
+
+    def _lookup_answer(self, question: str) -> Optional[CacheLookup]:
+        """Look the standalone question up in the answer cache, if there is one."""
+        if self.answer_cache is None or not question:
+            return None
+        try:
+            return self.answer_cache.lookup(question, self._corpus_version())
+        except Exception as e:
+            logger.warning(f"Answer cache lookup failed, answering without it: {e}")
+            return None
+
+    def _compress_documents(self, question: str, documents: List) -> List:
+        """The documents the chat model gets: compressed to the question, if compression is enabled."""
+        if self.context_compressor is None or not documents:
+            return documents
+        try:
+            return self.context_compressor.compress(question, documents)
+        except Exception as e:
+            logger.warning(f"Context compression failed, passing whole documents: {e}")
+            return documents
 
     def _prepare_inputs(self, history: Any, **kwargs) -> Dict[str, Any]:
         full_history = history_utils.tuplize_history(history)
@@ -65,51 +148,221 @@ class QAPipeline(BasePipeline):
             "full_history": full_history,
         }
 
+    def _init_catalog(self) -> Optional[CatalogService]:
+        """The resource catalog, for the retriever's exact identifier lookups (if enabled)."""
+        hybrid_cfg = self.dm_config.get("retrievers", {}).get("hybrid_retriever", {})
+        if not hybrid_cfg.get("exact_identifier_match", True):
+            return None
+        try:
+            return CatalogService(data_path=self.config["global"]["DATA_PATH"])
+        except Exception as exc:
+            logger.warning(f"Resource catalog unavailable, exact identifier matching disabled: {exc}")
+            return None
+
     def update_retriever(self, vectorstore):
+        self.retriever = self._build_retriever(vectorstore)
+
+    def _build_retriever(self, vectorstore) -> HybridRetriever:
         retrievers_cfg = self.dm_config.get("retrievers", {})
         hybrid_cfg = retrievers_cfg.get("hybrid_retriever", {})
         bm25_cfg = retrievers_cfg.get("bm25_retriever", {})
         default_k = 5
 
         logger.info("Initializing HybridRetriever with BM25 + semantic search")
-        self.retriever = HybridRetriever(
+        return HybridRetriever(
             vectorstore=vectorstore,
             k=hybrid_cfg.get("num_documents_to_retrieve", default_k),
             bm25_weight=hybrid_cfg.get("bm25_weight", 0.6),
             semantic_weight=hybrid_cfg.get("semantic_weight", 0.4),
             bm25_k1=bm25_cfg.get("k1", 0.5),
             bm25_b=bm25_cfg.get("b", 0.75),
+            cache=self.retrieval_cache,
+            identifier_lookup=self.catalog.find_by_identifiers if self.catalog is not None else None,
         )
 
-    def invoke(self, **kwargs) -> PipelineOutput:
-        vectorstore = kwargs.get("vectorstore")
+    def _resolve_retriever(self, vectorstore) -> HybridRetriever:
+        """
+        Return the retriever for this call. A retriever built from the call's vectorstore
+        stays local to the call, so concurrent invocations never share or overwrite it.
+        """
         if vectorstore:
-            self.update_retriever(vectorstore)
-
-        inputs = self._prepare_inputs(history=kwargs.get("history"))
+            return self._build_retriever(vectorstore)
+        return self.retriever
 
-        condense_output = self.condense_chain.invoke({**inputs})
-        retriever_output = self.retriever.invoke(condense_output['answer'])
+    def _retrieve(self, retriever: HybridRetriever, query: str) -> Tuple[List, List]:
+        """Run the retriever and split its (document, score) pairs."""
+        retriever_output = retriever.invoke(query)
         documents: List = []
         scores: List = []
         if retriever_output:
             retrieved_docs, retrieved_scores = zip(*retriever_output)
             documents = list(retrieved_docs)
             scores = list(retrieved_scores)
+        return documents, scores
+
+    @staticmethod
+    def _terms(text: str) -> set:
+        return set(re.findall(r"\w+", text.lower()))
+
+    def _queries_match(self, question: str, condensed: str) -> bool:
+        """Whether the condensed question is close enough to the raw one to reuse its retrieval."""
+        question_terms, condensed_terms = self._terms(question), self._terms(condensed)
+        if not question_terms or not condensed_terms:
+            return question.strip() == condensed.strip()
+        overlap = len(question_terms & condensed_terms) / len(question_terms | condensed_terms)
+        return overlap >= self.speculative_min_overlap
+
+    @staticmethod
+    def _merge_retrievals(primary: Tuple[List, List], secondary: Tuple[List, List], k: int) -> Tuple[List, List]:
+        """Results of primary first, then those of secondary not already in it, up to k documents."""
+        documents: List = []
+        scores: List = []
+        seen = set()
+        for docs, doc_scores in (primary, secondary):
+            for doc, score in zip(docs, doc_scores):
+                key = (doc.metadata.get("resource_hash"), doc.page_content)
+                if key in seen:
+                    continue
+                seen.add(key)
+                documents.append(doc)
+                scores.append(score)
+        return documents[:k], scores[:k]
+
+    def _collect_retrieval(
+        self,
+        retriever: HybridRetriever,
+        question: str,
+        condensed: str,
+        speculative: Optional[Future],
+    ) -> Tuple[List, List]:
+        """
+        Retrieval for the condensed question. If retrieval on the raw question was started
+        speculatively, it is reused when both questions match; otherwise the condensed
+        question is retrieved too, and its results come first in the merged list.
+        """
+        if speculative is None:
+            return self._retrieve(retriever, condensed)
+
+        try:
+            speculative_result = speculative.result()
+        except Exception as e:
+            logger.warning(f"Speculative retrieval failed, retrieving the condensed question only: {e}")
+            return self._retrieve(retriever, condensed)
+
+        if self._queries_match(question, condensed):
+            logger.debug("Condensed question matches the raw question; reusing speculative retrieval")
+            return speculative_result
+
+        logger.debug("Condensed question differs from the raw question; retrieving it as well")
+        condensed_result = self._retrieve(retriever, condensed)
+        k = getattr(retriever, "k", None) or len(condensed_result[0]) or len(speculative_result[0])
+        return self._merge_retrievals(condensed_result, speculative_result, k)
+
+    def _condense_and_retrieve(
+        self,
+        retriever: HybridRetriever,
+        inputs: Dict[str, Any],
+    ) -> Tuple[str, Optional[CacheLookup], List, List]:
+        """
+        Condense the history into a standalone question and retrieve documents for it.
+        Without history there is nothing to condense, so the question is used as is;
+        otherwise retrieval on the raw question runs while the condense model is called.
+        On an answer cache hit, nothing is retrieved.
+        """
+        question = inputs.get("question", "")
+        speculative: Optional[Future] = None
+        if not inputs.get("history"):
+            condensed = question
+        else:
+            if self._speculative_executor is not None and question:
+                speculative = self._speculative_executor.submit(self._retrieve, retriever, question)
+            condensed = self.condense_chain.invoke({**inputs})['answer']
+
+        lookup = self._lookup_answer(condensed)
+        if lookup is not None and lookup.hit:
+            if speculative is not None:
+                speculative.cancel()
+            return condensed, lookup, [], []
+
+        documents, scores = self._collect_retrieval(retriever, question, condensed, speculative)
+        return condensed, lookup, documents, scores
+
+    def invoke(self, **kwargs) -> PipelineOutput:
+        retriever = self._resolve_retriever(kwargs.get("vectorstore"))
+
+        inputs = self._prepare_inputs(history=kwargs.get("history"))
+
+        condensed, lookup, documents, scores = self._condense_and_retrieve(retriever, inputs)
+        if lookup is not None and lookup.hit:
+            return self.answer_cache.cached_output(lookup, {
+                "condensed_output": condensed,
+                "question": inputs.get("question", ""),
+            })
 
         answer_output = self.chat_chain.invoke({
             **inputs,
-            'condense_output': condense_output['answer'],
-            'retriever_output': documents if documents else "",
+            'condense_output': condensed,
+            'retriever_output': self._compress_documents(condensed, documents) or "",
         })
 
-        return PipelineOutput(
+        output = PipelineOutput(
             answer=answer_output['answer'],
             source_documents=documents,
             messages=[],
             metadata={
                 "retriever_scores": scores,
-                "condensed_output": condense_output['answer'],
+                "condensed_output": condensed,
                 "question": inputs.get("question", ""),
             },
         )
+        if lookup is not None:
+            self.answer_cache.store(lookup, output)
+        return output
+
+    def stream(self, **kwargs) -> Iterator[PipelineOutput]:
+        """
+        Same as invoke, but yields partial outputs carrying the answer generated so far.
+        Sources are known once retrieval finishes, so every partial output already carries them.
+        """
+        retriever = self._resolve_retriever(kwargs.get("vectorstore"))
+
+        inputs = self._prepare_inputs(history=kwargs.get("history"))
+
+        condensed, lookup, documents, scores = self._condense_and_retrieve(retriever, inputs)
+        if lookup is not None and lookup.hit:
+            yield self.answer_cache.cached_output(lookup, {
+                "condensed_output": condensed,
+                "question": inputs.get("question", ""),
+            })
+            return
+
+        metadata = {
+            "retriever_scores": scores,
+            "condensed_output": condensed,
+            "question": inputs.get("question", ""),
+        }
+
+        answer = ""
+        for chunk in self.chat_chain.stream({
+            **inputs,
+            'condense_output': condensed,
+            'retriever_output': self._compress_documents(condensed, documents) or "",
+        }):
+            answer += chunk
+            yield PipelineOutput(
+                answer=answer,
+                source_documents=documents,
+                messages=[],
+                metadata=metadata,
+                final=False,
+            )
+
+        output = PipelineOutput(
+            answer=answer,
+            source_documents=documents,
+            messages=[],
+            metadata=metadata,
+        )
+        if lookup is not None:
+            self.answer_cache.store(lookup, output)
+        yield output
@@ -1,6 +1,6 @@
 import os
 import pprint
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.prompts.base import BasePromptTemplate
@@ -27,7 +27,8 @@ class ChainWrapper:
             prompt: BasePromptTemplate,
             required_input_variables: List[str] = ['question'],
             unprunable_input_variables: Optional[List[str]] = [],
-            max_tokens: int = 1e10
+            max_tokens: int = 1e10,
+            context_packing: Optional[Dict[str, Any]] = None,
         ):
         self.chain = chain
         self.llm = llm
@@ -39,7 +40,9 @@ class ChainWrapper:
             llm=self.llm,
             prompt=self.prompt,
             max_tokens=max_tokens,
-            unprunable_input_variables=unprunable_input_variables
+            unprunable_input_variables=unprunable_input_variables,
+            doc_packing=(context_packing or {}).get("strategy", "density"),
+            truncate_last_document=(context_packing or {}).get("truncate_last_document", False),
         )
 
     def _check_prompt(self, prompt: BasePromptTemplate) -> BasePromptTemplate:
@@ -92,4 +95,21 @@ class ChainWrapper:
 
         logger.debug(f"Chain produced answer: {answer}")
 
-        return {"answer": answer, **input_variables}
\ No newline at end of file
+        return {"answer": answer, **input_variables}
+
+    def stream(self, inputs: Dict[str, Any]) -> Iterator[str]:
+        """
+        Same as invoke, but yields the LLM answer in chunks as the chain produces them.
+        """
+        logger.debug("Streaming chain with inputs:\n%s", pprint.pformat(inputs, indent=2))
+
+        for var in self.unprunable_input_variables:
+            if not self.token_limiter.check_input_size(inputs.get(var, "")):
+                yield self.token_limiter.INPUT_SIZE_WARNING.format(var=var)
+                return
+
+        input_variables = self._prepare_payload(inputs)
+
+        for chunk in self.chain.stream(input_variables, config={}):
+            if chunk:
+                yield chunk
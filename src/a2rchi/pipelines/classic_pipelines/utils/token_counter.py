@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import weakref
+from collections import OrderedDict
+from threading import Lock, RLock
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.language_models.base import BaseLanguageModel
+
+from src.a2rchi.models.lazy import resolve_model
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# tiktoken encoding used for models without a tokenizer of their own, instead of the
+# GPT-2 tokenizer LangChain would otherwise load for them
+DEFAULT_ENCODING = "cl100k_base"
+
+
+def _default_encoder() -> Optional[Callable[[List[str]], List[int]]]:
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+    return lambda texts: [len(ids) for ids in encoding.encode_batch(texts, disallowed_special=())]
+
+
+def _overrides(llm: Any, method: str) -> bool:
+    return getattr(type(llm), method, None) is not getattr(BaseLanguageModel, method)
+
+
+def _weak(obj: Any) -> Callable[[], Any]:
+    """A reference to obj that does not keep it alive, where obj supports weak references."""
+    try:
+        return weakref.ref(obj)
+    except TypeError:
+        return lambda: obj
+
+
+def _select_encoder(llm: Any) -> Callable[[List[str]], List[int]]:
+    """
+    Pick the fastest way to count tokens of a batch of texts for this model:
+    its own (HuggingFace) tokenizer with batch encoding, its own token counting,
+    or, for models that have none, a shared tiktoken encoding.
+    """
+    tokenizer = getattr(llm, "tokenizer", None)
+    if callable(tokenizer):
+        def encode_with_tokenizer(texts: List[str]) -> List[int]:
+            return [len(ids) for ids in tokenizer(texts, add_special_tokens=False)["input_ids"]]
+        return encode_with_tokenizer
+
+    # refer to the model weakly, so that its process-wide counter does not keep it alive
+    model = _weak(llm)
+    if _overrides(llm, "get_num_tokens"):
+        return lambda texts: [model().get_num_tokens(text) for text in texts]
+    if _overrides(llm, "get_token_ids"):
+        return lambda texts: [len(model().get_token_ids(text)) for text in texts]
+
+    default_encoder = _default_encoder()
+    if default_encoder is not None:
+        return default_encoder
+    return lambda texts: [model().get_num_tokens(text) for text in texts]
+
+
+class TokenCounter:
+    """
+    Counts tokens for one model, remembering the counts of recently seen texts by
+    content hash, so the same history messages and documents are not re-tokenized
+    by every chain and on every turn.
+    """
+
+    def __init__(self, llm: Any, max_cache_size: int = 20000):
+        self._llm = _weak(llm)
+        self.max_cache_size = max_cache_size
+        self._encode: Optional[Callable[[List[str]], List[int]]] = None
+        self._cache: OrderedDict[bytes, int] = OrderedDict()
+        self._lock = Lock()
+
+    @property
+    def llm(self) -> Any:
+        """The model counted for, or None once it has been freed."""
+        return self._llm()
+
+    @property
+    def encode(self) -> Callable[[List[str]], List[int]]:
+        if self._encode is None:
+            self._encode = _select_encoder(resolve_model(self.llm))
+        return self._encode
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def count(self, text: str) -> int:
+        return self.count_many([text])[0]
+
+    def count_many(self, texts: Sequence[str]) -> List[int]:
+        """Token counts of texts, encoding all the ones not in the cache in a single batch."""
+        keys = [self._key(text) for text in texts]
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for idx, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(idx)
+                else:
+                    self._cache.move_to_end(key)
+                    counts[idx] = cached
+
+        if missing:
+            missing_texts = [texts[indices[0]] for indices in missing.values()]
+            missing_counts = self.encode(missing_texts)
+            with self._lock:
+                for (key, indices), count in zip(missing.items(), missing_counts):
+                    self._cache[key] = count
+                    for idx in indices:
+                        counts[idx] = count
+                while len(self._cache) > self.max_cache_size:
+                    self._cache.popitem(last=False)
+
+        return counts
+
+
+# by id(llm), since models are not hashable; entries are dropped when their model is freed
+_counters: Dict[int, TokenCounter] = {}
+_counters_lock = RLock()
+
+
+def _drop_counter(key: int, counter: TokenCounter) -> None:
+    with _counters_lock:
+        if _counters.get(key) is counter:
+            del _counters[key]
+
+
+def get_token_counter(llm: Any) -> TokenCounter:
+    """Return the process-wide token counter of a model (shared by all chains using it)."""
+    with _counters_lock:
+        counter = _counters.get(id(llm))
+        if counter is None or counter.llm is not llm:
+            counter = TokenCounter(llm)
+            _counters[id(llm)] = counter
+            try:
+                weakref.finalize(llm, _drop_counter, id(llm), counter)
+            except TypeError:
+                pass  # kept until its id is reused by another model
+    return counter
@@ -1,3 +1,5 @@
+import math
+from functools import cached_property
 from typing import Any, Dict, List, Tuple
 
 from langchain_core.documents import Document
@@ -5,6 +7,7 @@ from langchain_core.language_models.base import BaseLanguageModel
 from langchain_core.prompts.base import BasePromptTemplate
 
 from src.a2rchi.pipelines.classic_pipelines.utils import history_utils
+from src.a2rchi.pipelines.classic_pipelines.utils.token_counter import TokenCounter, get_token_counter
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -19,11 +22,14 @@ class TokenLimiter:
         min_history_messages: int = 2,
         min_docs: int = 0,
         large_msg_fraction: float = 0.5, 
-        unprunable_input_variables: List[str] = ["question"]
+        unprunable_input_variables: List[str] = ["question"],
+        doc_packing: str = "density",
+        truncate_last_document: bool = False,
+        min_truncated_doc_tokens: int = 64,
     ):
         """
         Args:
-            llm: The LLM object, should have get_num_tokens(text) method,
+            llm: The LLM object; tokens are counted with its tokenizer (see TokenCounter),
                  else 4 chars per token is used.
             max_tokens: Max total token count allowed, used if no limit is set via config or the LLM model.
             prompt: if passed, used to reserve tokens from the maximum allowed.
@@ -32,19 +38,51 @@ class TokenLimiter:
             min_docs: Minimum number of documents to keep.
             large_msg_fraction: Fraction of budget above which a single history
                                 message is considered "very large".
+            doc_packing: How documents are dropped when over budget: "density" picks
+                         them by value per token, "tail" drops the last ones.
+            truncate_last_document: With "density", truncate the first document that
+                                    does not fit instead of dropping it.
+            min_truncated_doc_tokens: Don't truncate a document to fewer tokens than this.
         """
         self.llm = llm
+        self.prompt = prompt
         self.reserved_tokens = reserved_tokens
-        self.prompt_tokens = self.safe_token_count(prompt.format(**{v: "" for v in prompt.input_variables})) # TODO fix
-        self.max_tokens = self.get_max_tokens(max_tokens)
-        self.effective_max_tokens = self.calculate_effective_max_tokens()
+        self.configured_max_tokens = max_tokens
         self.unprunable_input_variables = unprunable_input_variables
     
         self.min_history_messages = min_history_messages
         self.min_docs = min_docs
-        self.large_msg_threshold = int(self.effective_max_tokens * large_msg_fraction)
+        self.large_msg_fraction = large_msg_fraction
+        if doc_packing not in ("density", "tail"):
+            raise ValueError(f"Unknown doc_packing '{doc_packing}', must be 'density' or 'tail'")
+        self.doc_packing = doc_packing
+        self.truncate_last_document = truncate_last_document
+        self.min_truncated_doc_tokens = min_truncated_doc_tokens
         self.INPUT_SIZE_WARNING = "WARNING: your last message is too large for the model A2rchi is running on. Please reduce the size of your message, and try again. The variable {var} was found to be too large."
 
+    # the limits below query the LLM, so they are computed on first use rather than in __init__;
+    # this way building a chain does not force a lazily loaded model (see LazyModel) to load
+
+    @cached_property
+    def token_counter(self) -> TokenCounter:
+        return get_token_counter(self.llm)
+
+    @cached_property
+    def prompt_tokens(self) -> int:
+        return self.safe_token_count(self.prompt.format(**{v: "" for v in self.prompt.input_variables})) # TODO fix
+
+    @cached_property
+    def max_tokens(self) -> int:
+        return self.get_max_tokens(self.configured_max_tokens)
+
+    @cached_property
+    def effective_max_tokens(self) -> int:
+        return self.calculate_effective_max_tokens()
+
+    @cached_property
+    def large_msg_threshold(self) -> int:
+        return int(self.effective_max_tokens * self.large_msg_fraction)
+
     def calculate_effective_max_tokens(self) -> int:
         """
         Returns the effective allowed max tokens, which will be used to cut down history and docs.
@@ -87,29 +125,105 @@ class TokenLimiter:
             logger.warning(e)
             return 1e10
 
-    def safe_token_count(self, text: str) -> int:
-        # Validate and sanitize input
+    @staticmethod
+    def _sanitize_text(text: Any) -> str:
         if text is None:
             logger.warning("Received None for text, using empty string")
-            text = ""
-        elif not isinstance(text, str):
+            return ""
+        if not isinstance(text, str):
             logger.warning(f"Expected string, got {type(text).__name__}. Attempting conversion.")
             try:
-                text = str(text)
+                return str(text)
             except Exception as e:
                 logger.warning(f"Could not convert to string ({e}), using empty string")
-                text = ""
+                return ""
+        return text
+
+    def safe_token_count(self, text: str) -> int:
+        return self.safe_token_counts([text])[0]
+
+    def safe_token_counts(self, texts: List[str]) -> List[int]:
+        """Token counts of several texts, counted together (and cached) by the model's token counter."""
+        texts = [self._sanitize_text(text) for text in texts]
+        if not texts:
+            return []
 
         try:
-            count = self.llm.get_num_tokens(text)
-            if count is None or count < 0:
-                raise Exception(f"Token count is {count}")
-            return count
+            counts = self.token_counter.count_many(texts)
+            if any(count is None or count < 0 for count in counts):
+                raise Exception(f"Token counts are {counts}")
+            return counts
         except Exception as e:
-            fallback = max(len(text) // 4, 1)
-            logger.warning(f"get_num_tokens failed ({e}), using fallback: {fallback}")
+            fallback = [max(len(text) // 4, 1) for text in texts]
+            logger.warning(f"Token counting failed ({e}), using fallback of 4 characters per token")
             return fallback
 
+    @staticmethod
+    def _document_priority(rank: int) -> float:
+        """Value of the document at this retrieval rank (0 = best), discounted like in DCG."""
+        return 1.0 / math.log2(rank + 2)
+
+    def _truncate_document(self, doc: Document, tokens: int, target_tokens: int) -> Tuple[Document, int]:
+        """Cut the document's content down to (at most about) target_tokens."""
+        content = doc.page_content
+        n_chars = int(len(content) * target_tokens / max(tokens, 1))
+        count = tokens
+        for _ in range(5):
+            truncated = content[:n_chars].rstrip()
+            count = self.safe_token_count(truncated)
+            if count <= target_tokens:
+                break
+            n_chars = int(n_chars * 0.9)
+        return Document(page_content=truncated, metadata={**doc.metadata, "truncated": True}), count
+
+    def _pack_documents(
+        self,
+        docs_lists: List[List[Document]],
+        tokens_lists: List[List[int]],
+        available: int,
+    ) -> Tuple[List[List[Document]], List[List[int]]]:
+        """
+        Select the documents to keep within `available` tokens. The first min_docs of each
+        list are always kept; the others are picked greedily by value (see _document_priority)
+        per token, so a long, lower ranked document gives way to shorter, better ones.
+        With truncate_last_document, the first document that does not fit is truncated to
+        the remaining budget instead of being dropped. Kept documents stay in retrieval order.
+        Sorting the candidates makes this O(n log n) in the number of documents.
+        """
+        kept: List[Dict[int, Tuple[Document, int]]] = [{} for _ in docs_lists]
+        candidates = []
+        remaining = available
+        for list_idx, (docs, tokens) in enumerate(zip(docs_lists, tokens_lists)):
+            for rank, (doc, count) in enumerate(zip(docs, tokens)):
+                if rank < self.min_docs:
+                    kept[list_idx][rank] = (doc, count)
+                    remaining -= count
+                else:
+                    density = self._document_priority(rank) / max(count, 1)
+                    candidates.append((-density, rank, list_idx, doc, count))
+
+        candidates.sort(key=lambda c: (c[0], c[1], c[2]))
+        truncated = False
+        for _, rank, list_idx, doc, count in candidates:
+            if count <= remaining:
+                kept[list_idx][rank] = (doc, count)
+                remaining -= count
+            elif self.truncate_last_document and not truncated and remaining >= self.min_truncated_doc_tokens:
+                truncated_doc, truncated_count = self._truncate_document(doc, count, remaining)
+                kept[list_idx][rank] = (truncated_doc, truncated_count)
+                remaining -= truncated_count
+                truncated = True
+                logger.info(f"Truncated document from {count} to {truncated_count} tokens")
+            else:
+                logger.info(f"Removed document ({count} tokens) from docs list {list_idx}")
+
+        packed_docs, packed_tokens = [], []
+        for list_kept in kept:
+            ordered = [list_kept[rank] for rank in sorted(list_kept)]
+            packed_docs.append([doc for doc, _ in ordered])
+            packed_tokens.append([count for _, count in ordered])
+        return packed_docs, packed_tokens
+
     def prune_inputs_to_token_limit(
         self,
         question: str = "",
@@ -122,18 +236,21 @@ class TokenLimiter:
         History and documents are dealt with according to priority as below,
         other input variables (extras) are removed last, since we don't know what they are.
         Document lists are inferred by the variable type.
-        If multiple document lists are passed, we alternate removing the last from each.
         Never remove unprunables or the user question.
 
         Priority:
         1a. Remove large history messages
         1b. Remove old history messages
-        2. Remove last documents
+        2. Pack documents into the remaining budget (doc_packing "density"), or remove the
+           last documents, alternating between document lists (doc_packing "tail")
         3. Remove extras
+
+        Token totals are kept as running sums, so the whole pruning is O(n log n).
         """
 
         # this will be the output of this function
         pruned_inputs = {}
+        budget = self.effective_max_tokens
 
         # count tokens of the question
         question_tokens = self.safe_token_count(question)
@@ -141,7 +258,6 @@ class TokenLimiter:
         # Validate and collect docs, extras
         docs_lists, docs_vars = [], []
         extras = {}
-        extra_tokens = {}
         for k, v in kwargs.items():
             # check if the variable is a list/tuple of Documents
             if (isinstance(v, tuple) or isinstance(v, list)) and len(v) > 0:
@@ -152,7 +268,7 @@ class TokenLimiter:
             elif not isinstance(v, str):
                 raise ValueError(f"Extra variable '{k}' must be a string, got {type(v)}")
             extras[k] = v
-            extra_tokens[k] = self.safe_token_count(v)
+        extra_tokens = dict(zip(extras.keys(), self.safe_token_counts(list(extras.values()))))
         
         # if history is passed as a string, make a tuple so we can easily remove old messages
         # but remember at the end to return it as a string
@@ -165,7 +281,7 @@ class TokenLimiter:
                 history = history_utils.tuplize_history(history)
                 orig_history_str = True
             orig_history = len(history)
-            history_tokens = [self.safe_token_count(h[1]) for h in history]
+            history_tokens = self.safe_token_counts([h[1] for h in history])
         
         # separate documents lists we can prune from those we can't
         orig_docs_counts, doc_tokens = [], []
@@ -173,7 +289,7 @@ class TokenLimiter:
         if docs_lists:
             for docs_list in docs_lists:
                 orig_docs_counts.append(len(docs_list))
-                doc_tokens.append([self.safe_token_count(d.page_content) for d in docs_list])
+                doc_tokens.append(self.safe_token_counts([d.page_content for d in docs_list]))
             # Calculate indices before converting tuples to lists
             prunable_indices = [i for i, (docs_list, docs_var) in enumerate(zip(docs_lists, docs_vars)) if docs_var not in self.unprunable_input_variables]
             prunable_docs_lists = [list(docs_lists[i]) if isinstance(docs_lists[i], tuple) else docs_lists[i] for i in prunable_indices]
@@ -181,8 +297,7 @@ class TokenLimiter:
                 if k in self.unprunable_input_variables:
                     pruned_inputs[k] = v
 
-        def total_tokens():
-            return question_tokens + sum(history_tokens) + sum(sum(x) for x in doc_tokens) + sum(extra_tokens.values())
+        total_tokens = question_tokens + sum(history_tokens) + sum(sum(x) for x in doc_tokens) + sum(extra_tokens.values())
         
         # --- Step 0: Leave question ---
         pruned_inputs['question'] = question
@@ -197,49 +312,56 @@ class TokenLimiter:
                     filtered_history.append(msg)
                     filtered_history_tokens.append(tcount)
                 else:
+                    total_tokens -= tcount
                     logger.info(f"Removed very large message ({tcount} tokens) from history")
 
-            history = filtered_history
-            history_tokens = filtered_history_tokens
-
             # 1b. Remove oldest messages while over budget and above min_history_messages
-            while total_tokens() > self.effective_max_tokens and len(history) > self.min_history_messages:
-                _ = history.pop(0)
-                removed_tokens = history_tokens.pop(0)
-                logger.info(f"Removed old message ({removed_tokens} tokens) from history")
+            n_removed = 0
+            while total_tokens > budget and len(filtered_history) - n_removed > self.min_history_messages:
+                total_tokens -= filtered_history_tokens[n_removed]
+                logger.info(f"Removed old message ({filtered_history_tokens[n_removed]} tokens) from history")
+                n_removed += 1
 
+            history = filtered_history[n_removed:]
+            history_tokens = filtered_history_tokens[n_removed:]
             pruned_inputs['history'] = history
 
         # --- Step 2: Reduce documents ---
         if prunable_docs_lists:
-            # Remove one document at a time from each prunable docs list in round-robin fashion
-            # Map prunable_docs_lists to their indices in docs_lists to update the correct doc_tokens
-            
-            while total_tokens() > self.effective_max_tokens and any(len(docs) > self.min_docs for docs in prunable_docs_lists):
-                for idx, prunable_docs_list in enumerate(prunable_docs_lists):
-                    if len(prunable_docs_list) > self.min_docs:
-                        prunable_index = prunable_indices[idx]
-                        prunable_docs_list.pop()
-                        removed_tokens = doc_tokens[prunable_index].pop()
-                        logger.info(f"Removed document ({removed_tokens} tokens) from docs list {prunable_index}")
-                        if total_tokens() <= self.effective_max_tokens or not any(len(docs) > self.min_docs for docs in prunable_docs_lists):
-                            break
+            prunable_tokens = [doc_tokens[i] for i in prunable_indices]
+            if total_tokens > budget and self.doc_packing == "density":
+                prunable_total = sum(sum(tokens) for tokens in prunable_tokens)
+                available = budget - (total_tokens - prunable_total)
+                prunable_docs_lists, prunable_tokens = self._pack_documents(prunable_docs_lists, prunable_tokens, available)
+                total_tokens += sum(sum(tokens) for tokens in prunable_tokens) - prunable_total
+            else:
+                # Remove one document at a time from each prunable docs list in round-robin fashion
+                while total_tokens > budget and any(len(docs) > self.min_docs for docs in prunable_docs_lists):
+                    for idx, prunable_docs_list in enumerate(prunable_docs_lists):
+                        if len(prunable_docs_list) > self.min_docs:
+                            prunable_docs_list.pop()
+                            removed_tokens = prunable_tokens[idx].pop()
+                            total_tokens -= removed_tokens
+                            logger.info(f"Removed document ({removed_tokens} tokens) from docs list {prunable_indices[idx]}")
+                            if total_tokens <= budget:
+                                break
             # Add back pruned docs lists to pruned_inputs
             for idx, prunable_docs_list in zip(prunable_indices, prunable_docs_lists):
                 pruned_inputs[docs_vars[idx]] = prunable_docs_list
 
         # --- Step 3: Remove extras (last resort) ---
         extras_removed = []
-        if total_tokens() > self.effective_max_tokens and extras:
+        if total_tokens > budget and extras:
             sorted_extras = sorted(extras.items(), key=lambda kv: extra_tokens[kv[0]], reverse=True)
-            for key, tcount in sorted_extras:
-                if total_tokens() <= self.effective_max_tokens:
+            for key, _ in sorted_extras:
+                if total_tokens <= budget:
                     break
                 if key not in self.unprunable_input_variables:
+                    tcount = extra_tokens.pop(key)
+                    total_tokens -= tcount
                     logger.info(f"Removed extra '{key}' ({tcount} tokens)")
                     extras_removed.append(key)
                     del extras[key]
-                    del extra_tokens[key]
         pruned_inputs.update(**extras)
 
         logger.info(
@@ -249,8 +371,8 @@ class TokenLimiter:
             f"{ ' + '.join(extras.keys()) }"
             f" to { sum(len(pruned_inputs[docs]) for docs in docs_vars) } docs + {len(history)} history items "
             f"{ ' + '.join(extras_removed)}: "
-            f"{total_tokens()} tokens total "
-            f"({self.effective_max_tokens} effective maximum allowed)"
+            f"{total_tokens} tokens total "
+            f"({budget} effective maximum allowed)"
         )
 
         if orig_history_str:
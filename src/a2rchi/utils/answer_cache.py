@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import dataclasses
+import time
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from src.a2rchi.utils.output_dataclass import PipelineOutput
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class _CacheEntry:
+    question: str
+    output: PipelineOutput
+    compute_seconds: float
+    created: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class CacheLookup:
+    """Result of SemanticAnswerCache.lookup; pass it back to store() on a miss."""
+
+    question: str
+    corpus_version: Optional[str]
+    vector: np.ndarray
+    output: Optional[PipelineOutput] = None
+    similarity: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+
+    @property
+    def hit(self) -> bool:
+        return self.output is not None
+
+
+class SemanticAnswerCache:
+    """
+    Cache of pipeline answers keyed by the (standalone) question, matched by embedding
+    similarity, so that a question asked again in different words reuses its answer.
+
+    Entries are only matched against questions asked on the same corpus version: once
+    a new version is published, the entries of the previous one are dropped. One cache
+    belongs to one pipeline instance, i.e. to one config.
+    """
+
+    def __init__(
+        self,
+        embedding_model: Any,
+        similarity_threshold: float = 0.95,
+        max_entries: int = 1000,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.embedding_model = embedding_model
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = Lock()
+        self._corpus_version: Optional[str] = None
+        self._entries: List[_CacheEntry] = []
+        self._matrix: Optional[np.ndarray] = None  # normalized vectors, one row per entry
+
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embedding_model.embed_query(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def _drop_stale(self, corpus_version: Optional[str]) -> None:
+        if corpus_version != self._corpus_version:
+            if self._entries:
+                logger.info(
+                    f"Corpus version changed ({self._corpus_version} -> {corpus_version}), "
+                    f"dropping {len(self._entries)} cached answers"
+                )
+            self._corpus_version = corpus_version
+            self._entries = []
+            self._matrix = None
+            return
+
+        if self.ttl_seconds and self._entries:
+            cutoff = time.monotonic() - self.ttl_seconds
+            keep = [i for i, entry in enumerate(self._entries) if entry.created >= cutoff]
+            if len(keep) < len(self._entries):
+                self._entries = [self._entries[i] for i in keep]
+                self._matrix = self._matrix[keep] if keep else None
+
+    def lookup(self, question: str, corpus_version: Optional[str]) -> CacheLookup:
+        """Embed the question and look for a cached answer to a similar enough one."""
+        lookup = CacheLookup(question=question, corpus_version=corpus_version, vector=self._embed(question))
+
+        with self._lock:
+            self._drop_stale(corpus_version)
+            if self._matrix is not None:
+                similarities = self._matrix @ lookup.vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    entry = self._entries[best]
+                    lookup.output = entry.output
+                    lookup.similarity = float(similarities[best])
+                    saved = max(0.0, entry.compute_seconds - (time.perf_counter() - lookup.started))
+                    self.hits += 1
+                    self.seconds_saved += saved
+                else:
+                    self.misses += 1
+            else:
+                self.misses += 1
+
+        if lookup.hit:
+            logger.info(
+                f"Answer cache hit (similarity {lookup.similarity:.3f}) for '{question}'; "
+                f"{self.hits} hits / {self.hits + self.misses} lookups, {self.seconds_saved:.1f}s saved"
+            )
+        return lookup
+
+    def store(self, lookup: CacheLookup, output: PipelineOutput) -> None:
+        """Cache the answer computed after a missed lookup."""
+        compute_seconds = time.perf_counter() - lookup.started
+        with self._lock:
+            self._drop_stale(lookup.corpus_version)
+            self._entries.append(_CacheEntry(question=lookup.question, output=output, compute_seconds=compute_seconds))
+            row = lookup.vector[np.newaxis, :]
+            self._matrix = row if self._matrix is None else np.vstack([self._matrix, row])
+            if len(self._entries) > self.max_entries:
+                overflow = len(self._entries) - self.max_entries
+                self._entries = self._entries[overflow:]
+                self._matrix = self._matrix[overflow:]
+
+    def cached_output(self, lookup: CacheLookup, metadata: Dict[str, Any]) -> PipelineOutput:
+        """The cached answer of a hit, with the metadata of the current question."""
+        return dataclasses.replace(
+            lookup.output,
+            metadata={
+                **lookup.output.metadata,
+                **metadata,
+                "answer_cache": {
+                    "hit": True,
+                    "similarity": lookup.similarity,
+                    "cached_question": lookup.output.metadata.get("condensed_output"),
+                },
+            },
+            final=True,
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = []
+            self._matrix = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "corpus_version": self._corpus_version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "seconds_saved": self.seconds_saved,
+            }
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# sentence ends, or line breaks (lists, tables, code and log lines carry no punctuation)
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\s*\n+\s*")
+GAP_MARKER = " ... "
+
+
+def split_sentences(text: str, min_chars: int = 3) -> List[str]:
+    """Split a text into sentences, dropping the fragments shorter than min_chars."""
+    return [s.strip() for s in _SENTENCE_BOUNDARY.split(text) if len(s.strip()) >= min_chars]
+
+
+def _approximate_token_counts(texts: List[str]) -> List[int]:
+    return [max(1, len(text) // 4) for text in texts]
+
+
+class ContextCompressor:
+    """
+    Extractive compression of retrieved documents: only the sentences most similar to
+    the question are kept, within a token budget, so the chat model reads what matters
+    instead of whole chunks.
+
+    Sentences are embedded with the (shared) embedding model of the deployment; their
+    embeddings are cached by content, so the same chunk retrieved again costs nothing
+    but the question embedding.
+    """
+
+    def __init__(
+        self,
+        embedding_model: Any,
+        max_tokens: int = 1500,
+        count_tokens: Optional[Callable[[List[str]], List[int]]] = None,
+        min_similarity: float = 0.0,
+        min_sentences_per_document: int = 1,
+        max_cache_entries: int = 50000,
+    ):
+        self.embedding_model = embedding_model
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens or _approximate_token_counts
+        self.min_similarity = min_similarity
+        self.min_sentences_per_document = min_sentences_per_document
+        self.max_cache_entries = max(1, int(max_cache_entries))
+
+        self._lock = Lock()
+        self._cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def _embed_sentences(self, sentences: Sequence[str]) -> np.ndarray:
+        """Normalized embeddings of the sentences, embedding the ones not in the cache in a single batch."""
+        keys = [self._key(sentence) for sentence in sentences]
+        vectors: List[Optional[np.ndarray]] = [None] * len(sentences)
+        missing: Dict[bytes, List[int]] = {}
+
+        with self._lock:
+            for idx, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.setdefault(key, []).append(idx)
+                else:
+                    self._cache.move_to_end(key)
+                    vectors[idx] = cached
+
+        if missing:
+            missing_sentences = [sentences[indices[0]] for indices in missing.values()]
+            embedded = self._normalize(np.asarray(self.embedding_model.embed_documents(missing_sentences), dtype=np.float32))
+            with self._lock:
+                for (key, indices), vector in zip(missing.items(), embedded):
+                    self._cache[key] = vector
+                    for idx in indices:
+                        vectors[idx] = vector
+                while len(self._cache) > self.max_cache_entries:
+                    self._cache.popitem(last=False)
+
+        return np.vstack(vectors)
+
+    def _select(
+        self,
+        sentences: List[Tuple[int, int]],
+        similarities: np.ndarray,
+        token_counts: List[int],
+    ) -> List[int]:
+        """
+        Indices of the sentences to keep: the best min_sentences_per_document of every
+        document first, then the others by similarity, as long as they fit in the budget.
+        """
+        order = np.argsort(-similarities, kind="stable")
+        guaranteed, others = [], []
+        per_document: Dict[int, int] = {}
+        for idx in order.tolist():
+            doc_idx = sentences[idx][0]
+            if per_document.get(doc_idx, 0) < self.min_sentences_per_document:
+                per_document[doc_idx] = per_document.get(doc_idx, 0) + 1
+                guaranteed.append(idx)
+            elif similarities[idx] >= self.min_similarity:
+                others.append(idx)
+
+        selected, remaining = [], self.max_tokens
+        for idx in guaranteed + others:
+            if token_counts[idx] <= remaining:
+                selected.append(idx)
+                remaining -= token_counts[idx]
+        return selected
+
+    def compress(self, question: str, documents: Sequence[Document]) -> List[Document]:
+        """
+        Return the documents reduced to their sentences most relevant to the question,
+        in their original order, with the gaps between kept sentences marked. Documents
+        with no sentence kept are left out. If the documents already fit in the budget,
+        they are returned as they are.
+        """
+        return [doc for _, doc in self.compress_indexed(question, documents)]
+
+    def compress_indexed(self, question: str, documents: Sequence[Document]) -> List[Tuple[int, Document]]:
+        """Same as compress, but pairs every returned document with its index in documents."""
+        documents = list(documents)
+        unchanged = list(enumerate(documents))
+        if not question or not documents:
+            return unchanged
+        if sum(self.count_tokens([doc.page_content for doc in documents])) <= self.max_tokens:
+            return unchanged
+
+        sentences: List[Tuple[int, int]] = []
+        texts: List[str] = []
+        doc_sentences: List[List[str]] = []
+        for doc_idx, doc in enumerate(documents):
+            split = split_sentences(doc.page_content)
+            doc_sentences.append(split)
+            for sent_idx, sentence in enumerate(split):
+                sentences.append((doc_idx, sent_idx))
+                texts.append(sentence)
+        if not texts:
+            return unchanged
+
+        question_vector = self._normalize(np.asarray(self.embedding_model.embed_query(question), dtype=np.float32))
+        similarities = self._embed_sentences(texts) @ question_vector
+        token_counts = self.count_tokens(texts)
+
+        kept: Dict[int, List[int]] = {}
+        for idx in self._select(sentences, similarities, token_counts):
+            doc_idx, sent_idx = sentences[idx]
+            kept.setdefault(doc_idx, []).append(sent_idx)
+
+        compressed = []
+        for doc_idx, doc in enumerate(documents):
+            if doc_idx not in kept:
+                continue
+            parts, previous = [], None
+            for sent_idx in sorted(kept[doc_idx]):
+                if parts and sent_idx != previous + 1:
+                    parts.append(GAP_MARKER)
+                elif parts:
+                    parts.append(" ")
+                parts.append(doc_sentences[doc_idx][sent_idx])
+                previous = sent_idx
+            compressed.append((doc_idx, Document(page_content="".join(parts), metadata={**doc.metadata, "compressed": True})))
+
+        logger.info(
+            f"Compressed {len(documents)} documents ({len(texts)} sentences) to "
+            f"{len(compressed)} documents ({sum(len(v) for v in kept.values())} sentences)"
+        )
+        return compressed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from src.a2rchi.a2rchi import A2rchi
+from src.utils.config_loader import get_config_hash
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class PipelinePool:
+    """
+    Bounded LRU pool of fully initialized A2rchi instances.
+
+    Instances are keyed by config name, pipeline and a hash of the config file's
+    contents, so switching between configs is a lookup rather than a rebuild,
+    while editing a config file makes the next request build a fresh instance.
+    Models are shared across pooled instances (see get_model_instance), so
+    configs that use the same model class and kwargs don't load it twice.
+
+    Evicted instances are dropped, not closed: requests still running on one keep
+    it alive, and it releases its shared resources once garbage collected.
+    """
+
+    def __init__(self, max_size: int = 4):
+        self.max_size = max(1, int(max_size))
+        self._entries: "OrderedDict[Tuple[Optional[str], str, str], A2rchi]" = OrderedDict()
+        self._lock = Lock()
+        self._build_locks: Dict[Tuple[Optional[str], str, str], Lock] = {}
+
+    def get(self, pipeline: str, config_name: Optional[str] = None) -> A2rchi:
+        """
+        Return the A2rchi instance running the given pipeline with the given config,
+        building it if it is not pooled yet. Concurrent requests for the same key
+        wait for a single build instead of each building their own instance.
+        """
+        key = (config_name, pipeline, get_config_hash(config_name))
+
+        with self._lock:
+            a2rchi = self._lookup(key)
+            if a2rchi is not None:
+                return a2rchi
+            build_lock = self._build_locks.setdefault(key, Lock())
+
+        with build_lock:
+            with self._lock:
+                a2rchi = self._lookup(key)
+                if a2rchi is not None:
+                    return a2rchi
+
+            logger.info(f"Building pipeline {pipeline} for config {config_name}")
+            try:
+                a2rchi = A2rchi(pipeline=pipeline, config_name=config_name)
+                with self._lock:
+                    self._insert(key, a2rchi)
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+        return a2rchi
+
+    def clear(self) -> None:
+        """Drop every pooled instance."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _lookup(self, key) -> Optional[A2rchi]:
+        a2rchi = self._entries.get(key)
+        if a2rchi is not None:
+            self._entries.move_to_end(key)
+        return a2rchi
+
+    def _insert(self, key, a2rchi: A2rchi) -> None:
+        # instances built from an older version of the same config can never be hit again
+        config_name, pipeline, _ = key
+        for stale_key in [k for k in self._entries if k[:2] == (config_name, pipeline)]:
+            del self._entries[stale_key]
+
+        self._entries[key] = a2rchi
+        while len(self._entries) > self.max_size:
+            evicted_key, _ = self._entries.popitem(last=False)
+            logger.info(f"Evicting pipeline {evicted_key[1]} for config {evicted_key[0]} from the pool")
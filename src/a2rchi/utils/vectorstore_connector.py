@@ -2,6 +2,8 @@ import chromadb
 from chromadb.config import Settings
 from langchain_chroma.vectorstores import Chroma
 
+from src.data_manager.vectorstore.embeddings import (embedding_from_config,
+                                                     release_embedding_model)
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -26,11 +28,9 @@ class VectorstoreConnector:
         dm_config = self.config["data_manager"]
         chroma_config = self.config["services"]["chromadb"]
 
-        embedding_class_map = dm_config["embedding_class_map"]
         embedding_name = dm_config["embedding_name"]
-        self.embedding_model = embedding_class_map[embedding_name]["class"](
-            **embedding_class_map[embedding_name]["kwargs"]
-        )
+        # shared with every other component of the process using the same embedding model
+        self.embedding_model = embedding_from_config(dm_config, self.config["services"])
         self.collection_name = dm_config["collection_name"] + "_with_" + embedding_name
         self.use_HTTP_chromadb_client = chroma_config["use_HTTP_chromadb_client"]
         self.chromadb_host = chroma_config["chromadb_host"]
@@ -73,4 +73,12 @@ class VectorstoreConnector:
         """
         Public method to get the updated vectorstore connection.
         """
-        return self._update_vectorstore_conn()
\ No newline at end of file
+        return self._update_vectorstore_conn()
+
+    def close(self):
+        """
+        Release this connector's reference to the shared embedding model.
+        """
+        if self.embedding_model is not None:
+            release_embedding_model(self.embedding_model)
+            self.embedding_model = None
@@ -1,6 +1,5 @@
 import json
 import os
-import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
@@ -20,6 +19,7 @@ from ragas.metrics import (answer_relevancy, context_precision, context_recall,
 from src.a2rchi.a2rchi import A2rchi
 from src.a2rchi.models import HuggingFaceOpenLLM
 from src.data_manager.data_manager import DataManager
+from src.data_manager.vectorstore.embeddings import acquire_embedding_model
 from src.utils.env import read_secret
 from src.utils.logging import get_logger, setup_logging
 from src.utils.generate_benchmark_report import parse_benchmark_results, format_html_output
@@ -205,13 +205,14 @@ class Benchmarker:
         ragas_configs = self.config['services']['benchmarking']['mode_settings']['ragas_settings']
         embedding_model = ragas_configs['embedding_model']
 
+        # shared with the rest of the process, e.g. if the data manager uses the same model
         match embedding_model.lower():
             case "openai":
-                return OpenAIEmbeddings()
+                return acquire_embedding_model(OpenAIEmbeddings)
             case "huggingface":
-                return HuggingFaceEmbeddings()
+                return acquire_embedding_model(HuggingFaceEmbeddings)
             case _:
-                return OpenAIEmbeddings()
+                return acquire_embedding_model(OpenAIEmbeddings)
             
 
     def prepare_match_fields(self, question_item):
@@ -407,18 +408,29 @@ class Benchmarker:
             relative_source_accuracy = 0.0 
             source_accuracy = 0.0
 
+            question_items = []
             for question_item in self.queries_to_answers:
-
-                logger.info("")
-                logger.info("====================================")
-                logger.info(f"Answering question: {question_id + 1}")
-
                 if type(question_item) is not dict:
                     logger.error(f"Each item in the question to answer list must be a dictionary, but got {type(question_item)}")
                     continue
                 if not all(field in question_item for field in self.required_fields):
                     logger.error(f"Each item in the question to answer list must contain the following fields: {self.required_fields}, but got {question_item.keys()}")
                     continue
+                question_items.append(question_item)
+
+            # answer the questions (concurrently, with max_concurrency > 1), then evaluate them in order
+            max_concurrency = self.benchmarking_configs.get('max_concurrency', 1)
+            logger.info(f"Answering {len(question_items)} questions, up to {max_concurrency} at a time")
+            results = self.chain.batch(
+                [{"history": [("User", question_item['question'])]} for question_item in question_items],
+                max_concurrency=max_concurrency,
+            )
+
+            for question_item, result in zip(question_items, results):
+
+                logger.info("")
+                logger.info("====================================")
+                logger.info(f"Answered question: {question_id + 1}")
 
                 question = question_item['question']
                 reference_answer = question_item.get('answer', 'N/A')
@@ -429,15 +441,15 @@ class Benchmarker:
                 logger.info(f"Reference Sources: {reference_sources}")
 
                 question_id +=1
-                formatted_question = [("User", question)]
-                start = time.perf_counter()
-                result = self.chain(history=formatted_question)
-                end = time.perf_counter()
-                logger.info(f"Finished answering question: {question_id} ({end - start:.2f}s)")
+                if isinstance(result, Exception):
+                    logger.error(f"Failed to answer question {question_id}: {result}")
+                    continue
+                time_elapsed = result.metadata["elapsed_seconds"]
+                logger.info(f"Finished answering question: {question_id} ({time_elapsed:.2f}s)")
                 q_results = {}
 
                 # prepare info to store for this question
-                q_results["time_elapsed"] = end - start
+                q_results["time_elapsed"] = time_elapsed
                 q_results["question"] = question
                 q_results["reference_answer"] = reference_answer
                 q_results["answer"] = result['answer']
@@ -0,0 +1,47 @@
+#!/bin/python
+import os
+
+from flask import Flask
+
+from src.data_manager.vectorstore.embeddings import acquire_embedding_model
+from src.interfaces.embedding_server.app import FlaskAppWrapper
+from src.utils.config_loader import load_config
+from src.utils.env import read_secret
+from src.utils.logging import setup_logging
+
+# set basicConfig for logging
+setup_logging()
+
+def main():
+    # load secrets
+    os.environ['OPENAI_API_KEY'] = read_secret("OPENAI_API_KEY")
+    os.environ['HUGGING_FACE_HUB_TOKEN'] = read_secret("HUGGING_FACE_HUB_TOKEN")
+
+    app = create_app()
+    config = load_config()
+    server_config = config["services"]["embedding_server"]
+    print(f"Starting Embedding Service for {config['data_manager']['embedding_name']} on port {server_config['port']}")
+    app.run(debug=False, use_reloader=False, threaded=True, port=server_config["port"], host="0.0.0.0")
+
+
+def create_app() -> FlaskAppWrapper:
+    """Build the embedding server for the deployment's config."""
+    # mapped, so that the embedding class entries are classes rather than their names
+    config = load_config(map=True)
+    server_config = config["services"]["embedding_server"]
+    dm_config = config["data_manager"]
+
+    # the server holds the actual model, so it never goes through the embedding client
+    embedding_entry = dm_config["embedding_class_map"][dm_config["embedding_name"]]
+    embedding_model = acquire_embedding_model(embedding_entry["class"], embedding_entry.get("kwargs", {}))
+
+    return FlaskAppWrapper(
+        Flask(__name__),
+        embedding_model,
+        max_batch_size=server_config["max_batch_size"],
+        max_wait_ms=server_config["max_wait_ms"],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -267,6 +267,10 @@ class TemplateManager:
                         "chromadb_port"
                     ] = external_port
 
+            if context.plan.get_service("embedding-server").enabled:
+                # services embed through the deployed embedding server instead of loading the model
+                updated_config.setdefault("services", {}).setdefault("embedding_server", {})["enabled"] = True
+
             config_template = self.env.get_template(BASE_CONFIG_TEMPLATE)
             config_rendered = config_template.render(verbosity=context.plan.verbosity, **updated_config)
 
@@ -354,6 +358,7 @@ class TemplateManager:
         template_vars = context.plan.to_template_vars()
         template_vars.update(self._extract_port_config(context))
         template_vars.setdefault("postgres_port", context.config_manager.config.get("services", {}).get("postgres", {}).get("port", 5432))
+        template_vars.setdefault("embedding_server_port", context.config_manager.config.get("services", {}).get("embedding_server", {}).get("port", 7870))
 
         template_vars["app_version"] = get_git_version()
 
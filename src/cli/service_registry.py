@@ -95,6 +95,13 @@ class ServiceRegistry:
             port_config_path='services.chat_app'
         ))
         
+        self.register(ServiceDefinition(
+            name='embedding-server',
+            description='Batching embedding server, so services share one copy of the embedding model',
+            category='application',
+            required_secrets=[],
+        ))
+        
         self.register(ServiceDefinition(
             name='grafana',
             description='Monitoring dashboard for system and LLM performance metrics',
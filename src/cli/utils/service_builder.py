@@ -64,6 +64,7 @@ class DeploymentPlan:
             "chromadb": ServiceState(),
             "postgres": ServiceState(),
             "chatbot": ServiceState(),
+            "embedding-server": ServiceState(),
             "grafana": ServiceState(),
             "uploader": ServiceState(),
             "grader": ServiceState(),
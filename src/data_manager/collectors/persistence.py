@@ -5,15 +5,20 @@ from typing import Dict, TYPE_CHECKING, Union, Any
 
 import yaml
 
+from src.data_manager.collectors.utils.catalog_store import file_fingerprint
 from src.data_manager.collectors.utils.index_utils import CatalogService
 from src.utils.logging import get_logger
 from src.data_manager.collectors.utils.metadata import ResourceMetadata
+from src.data_manager.vectorstore.loader_utils import extract_text_from_path
 
 if TYPE_CHECKING:
     from src.data_manager.collectors.resource_base import BaseResource
 
 logger = get_logger(__name__)
 
+# catalog changes after which flush_index exports the YAML catalogs even when not asked to
+YAML_EXPORT_EVERY = 1000
+
 
 class PersistenceService:
     """Shared filesystem persistence for collected resources."""
@@ -22,8 +27,6 @@ class PersistenceService:
         self.data_path = Path(data_path)
 
         self.catalog = CatalogService(self.data_path)
-        self._index_dirty = False
-        self._metadata_index_dirty = False
 
     def persist_resource(self, resource: "BaseResource", target_dir: Path) -> Path:
         """
@@ -39,7 +42,7 @@ class PersistenceService:
         metadata = resource.get_metadata()
         if metadata is not None:
             metadata_path = resource.get_metadata_path(file_path)
-            self._write_metadata(metadata_path, metadata)
+            metadata_dict = self._write_metadata(metadata_path, metadata)
             try:
                 metadata_relative_path = (
                     metadata_path.relative_to(self.data_path).as_posix()
@@ -49,7 +52,8 @@ class PersistenceService:
 
             resource_hash = resource.get_hash()
             self.catalog.metadata_index[resource_hash] = metadata_relative_path
-            self._metadata_index_dirty = True
+            self.catalog.store.upsert_metadata(resource_hash, metadata_relative_path, metadata_dict)
+            self.catalog.metadata_search_index.add(resource_hash, metadata_dict)
 
         try:
             relative_path = file_path.relative_to(self.data_path).as_posix()
@@ -59,7 +63,10 @@ class PersistenceService:
         resource_hash = resource.get_hash()
         logger.info(f"Stored resource {resource_hash} -> {file_path}")
         self.catalog.file_index[resource_hash] = relative_path
-        self._index_dirty = True
+        self.catalog.store.upsert_file(resource_hash, relative_path, file_fingerprint(file_path))
+
+        if self.catalog.is_searchable(relative_path):
+            self.catalog.text_index.add(resource_hash, extract_text_from_path(file_path))
 
         return file_path
     
@@ -86,11 +93,12 @@ class PersistenceService:
 
         self._delete_content(file_path)
         self.catalog.file_index.pop(resource_hash, None)
-        self._index_dirty = True
 
         self._delete_metadata(metadata_path)
         self.catalog.metadata_index.pop(resource_hash, None)
-        self._metadata_index_dirty = True
+        self.catalog.store.delete([resource_hash])
+        self.catalog.text_index.remove(resource_hash)
+        self.catalog.metadata_search_index.remove(resource_hash)
 
         if flush:
             self.flush_index()
@@ -103,6 +111,8 @@ class PersistenceService:
         Remove any resource matching the given metadata key-value pair.
         Removes the resource, metadata files, and wipes both indices accordingly.
         """
+        # the catalog database may have resources persisted by other processes since the last refresh
+        self.catalog.refresh()
         to_remove = self.catalog.get_resource_hashes_by_metadata_filter(key, value)
         deleted = False
         for resource_hash in to_remove:
@@ -143,7 +153,8 @@ class PersistenceService:
             if keys_to_remove:
                 for key in keys_to_remove:
                     self.catalog.file_index.pop(key, None)
-                self._index_dirty = True
+                    self.catalog.text_index.remove(key)
+                self.catalog.store.delete(keys_to_remove)
 
             for key, stored in self.catalog.metadata_index.items():
                 stored_path = Path(stored)
@@ -157,20 +168,40 @@ class PersistenceService:
             if metadata_keys_to_remove:
                 for key in metadata_keys_to_remove:
                     self.catalog.metadata_index.pop(key, None)
-                self._metadata_index_dirty = True
+                    self.catalog.metadata_search_index.remove(key)
+                self.catalog.store.delete(metadata_keys_to_remove)
+
+    def sync_search_indexes(self) -> None:
+        """
+        Bring the text store and the metadata search index in line with the catalog: add
+        the resources they do not cover yet (e.g. persisted before they existed) and drop
+        the ones no longer catalogued. Only the data manager does this; searches only
+        read them.
+        """
+        self.catalog.refresh()
+        self.catalog.sync_text_index()
+        self.catalog.sync_metadata_search_index()
 
-    def flush_index(self) -> None:
-        if self._index_dirty:
-            self.catalog.write_index(self.data_path, self.catalog.file_index, filename=self.catalog.filename)
-            self._index_dirty = False
+    def flush_index(self, export: bool = False) -> None:
+        """
+        Make the pending changes of the text and metadata search indexes durable (an
+        append to their journals). The catalog database is written as resources are
+        persisted; its YAML export (index.yaml, metadata_index.yaml) is rewritten only
+        with export, or once YAML_EXPORT_EVERY changes have piled up since the last one.
+        """
+        self.catalog.text_index.flush()
+        self.catalog.metadata_search_index.flush()
 
-        if self._metadata_index_dirty:
-            self.catalog.write_index(
-                self.data_path,
-                self.catalog.metadata_index,
-                filename=self.catalog.metadata_filename,
-            )
-            self._metadata_index_dirty = False
+        store = self.catalog.store
+        generation = store.generation()
+        exported = int(store.get_info("exported_generation") or 0)
+        if generation == exported or not (export or generation - exported >= YAML_EXPORT_EVERY):
+            return
+        self.catalog.write_index(self.data_path, store.file_index(), filename=self.catalog.filename)
+        self.catalog.write_index(self.data_path, store.metadata_index(), filename=self.catalog.metadata_filename)
+        store.set_info("exported_generation", str(generation))
+        store.compact_changes()
+        logger.info(f"Exported the resource catalog to {self.catalog.filename} and {self.catalog.metadata_filename}")
 
     def _remove_tree(self, path: Path) -> None:
         for item in path.iterdir():
@@ -206,7 +237,7 @@ class PersistenceService:
             "resources must return str or bytes"
         )
 
-    def _write_metadata(self, metadata_path: Path, metadata: Any) -> None:
+    def _write_metadata(self, metadata_path: Path, metadata: Any) -> Dict[str, str]:
         if type(metadata) != ResourceMetadata:
             raise Exception("Metadata must be of type ResourceMetadata")
         metadata_dict = self._normalise_metadata(metadata)
@@ -216,6 +247,7 @@ class PersistenceService:
         metadata_path.parent.mkdir(parents=True, exist_ok=True)
         with metadata_path.open("w", encoding="utf-8") as fh:
             yaml.safe_dump(metadata_dict, fh, sort_keys=True)
+        return metadata_dict
 
     def _delete_content(self,file_path: Path) -> None:
         file_path.unlink()
@@ -51,6 +51,7 @@ class ScraperManager:
             enable_warnings=self.config.get("enable_warnings", True),
         )
         self._git_scraper: Optional["GitScraper"] = None
+        self._persistence: Optional[PersistenceService] = None
         self.sso_collector = SSOCollector(self.sso_config)
 
     def collect(
@@ -152,17 +153,23 @@ class ScraperManager:
     # ------------------------------------------------------------------
     # Backwards compatibility helpers for manual uploader workflows
     # ------------------------------------------------------------------
+    def _get_persistence(self) -> PersistenceService:
+        if self._persistence is None:
+            self._persistence = PersistenceService(self.data_path)
+        else:
+            self._persistence.catalog.refresh()
+        return self._persistence
+
     def register_resource(self, target_dir: Path, resource: ScrapedResource) -> Path:
-        """Persist a scraped resource using a fresh persistence service."""
-        persistence = PersistenceService(self.data_path)
+        """Persist a scraped resource, reusing one persistence service across calls."""
+        persistence = self._get_persistence()
         path = persistence.persist_resource(resource, target_dir)
         persistence.flush_index()
         return path
 
     def persist_sources(self) -> None:
-        """Flush the unified index when running outside the main pipeline."""
-        persistence = PersistenceService(self.data_path)
-        persistence.flush_index()
+        """Flush (and export) the unified index when running outside the main pipeline."""
+        self._get_persistence().flush_index(export=True)
 
     def _get_git_scraper(self) -> "GitScraper":
         if self._git_scraper is None:
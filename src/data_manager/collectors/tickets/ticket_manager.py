@@ -40,7 +40,7 @@ class TicketManager:
         if persistence is None:
             persistence = PersistenceService(self.data_path)
         self.collect(persistence)
-        persistence.flush_index()
+        persistence.flush_index(export=True)
 
     def _init_client(self, factory, name: str):
         try:
@@ -0,0 +1,384 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from threading import RLock
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.data_manager.collectors.utils.identifiers import resource_identifiers
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CATALOG_DB_FILE = "catalog.sqlite"
+
+# metadata fields stored in their own (indexed) columns, for the filters used most
+INDEXED_METADATA_FIELDS = ("source_type", "url", "ticket_id")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    resource_hash TEXT PRIMARY KEY,
+    path TEXT,
+    metadata_path TEXT,
+    metadata TEXT,
+    source_type TEXT,
+    url TEXT,
+    ticket_id TEXT,
+    fingerprint TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_resources_source_type ON resources(source_type);
+CREATE INDEX IF NOT EXISTS idx_resources_url ON resources(url);
+CREATE INDEX IF NOT EXISTS idx_resources_ticket_id ON resources(ticket_id);
+CREATE TABLE IF NOT EXISTS catalog_info (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS identifiers (
+    identifier TEXT NOT NULL,
+    resource_hash TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    PRIMARY KEY (identifier, resource_hash, origin)
+);
+CREATE INDEX IF NOT EXISTS idx_identifiers_resource_hash ON identifiers(resource_hash);
+CREATE TABLE IF NOT EXISTS changes (
+    generation INTEGER PRIMARY KEY AUTOINCREMENT,
+    resource_hash TEXT
+);
+"""
+
+
+def file_fingerprint(path: Path | str) -> Optional[str]:
+    """Cheap change marker of a file (size and modification time), or None if it is missing."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+class CatalogStore:
+    """
+    SQLite (WAL) database holding the catalog of persisted resources: for every
+    resource hash, the path of its file, the path of its metadata file, the metadata
+    itself, and a fingerprint of the file. ``source_type``, ``url`` and ``ticket_id``
+    have their own indexed columns, so filtering on them is an index lookup.
+
+    The database lives at ``<data_path>/catalog.sqlite`` and is shared by every
+    process using the data path. Every write also appends the hashes it touched to the
+    ``changes`` log, in the same transaction; its last generation tells a reader
+    whether the catalog changed, and the log which resources to re-read.
+
+    The ``identifiers`` table maps the exact identifiers of each resource (hash, file
+    name, ticket ID, URL; see identifiers.resource_identifiers) to it, so a query
+    naming one is answered with an index lookup.
+    """
+
+    def __init__(self, data_path: Path | str) -> None:
+        self.db_path = Path(data_path) / CATALOG_DB_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = RLock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _write(
+        self,
+        statement: str,
+        rows: Iterable[tuple],
+        changed: Iterable[Optional[str]] = (),
+        identifiers: Optional[Dict[str, Iterable[str]]] = None,
+        origin: str = "",
+        drop_identifiers: Iterable[str] = (),
+    ) -> None:
+        """
+        Run the statement on the rows, log the changed hashes, replace the identifiers
+        (from the given origin) of the resources in ``identifiers`` and drop all those of
+        the resources in ``drop_identifiers``, in one transaction.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(statement, rows)
+                self._conn.executemany("INSERT INTO changes (resource_hash) VALUES (?)", [(h,) for h in changed])
+                if identifiers:
+                    self._replace_identifiers(identifiers, origin)
+                self._conn.executemany(
+                    "DELETE FROM identifiers WHERE resource_hash = ?", [(h,) for h in drop_identifiers]
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _replace_identifiers(self, identifiers: Dict[str, Iterable[str]], origin: str) -> None:
+        self._conn.executemany(
+            "DELETE FROM identifiers WHERE resource_hash = ? AND origin = ?", [(h, origin) for h in identifiers]
+        )
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO identifiers (identifier, resource_hash, origin) VALUES (?, ?, ?)",
+            [(identifier, h, origin) for h, values in identifiers.items() for identifier in values],
+        )
+
+    def _query(self, statement: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(statement, params).fetchall()
+
+    def get_info(self, key: str) -> Optional[str]:
+        rows = self._query("SELECT value FROM catalog_info WHERE key = ?", (key,))
+        return rows[0][0] if rows else None
+
+    def set_info(self, key: str, value: str) -> None:
+        self._write("INSERT OR REPLACE INTO catalog_info (key, value) VALUES (?, ?)", [(key, value)])
+
+    def upsert_file(self, resource_hash: str, path: str, fingerprint: Optional[str] = None) -> None:
+        self._write(
+            "INSERT INTO resources (resource_hash, path, fingerprint, updated_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(resource_hash) DO UPDATE SET "
+            "path = excluded.path, fingerprint = excluded.fingerprint, updated_at = excluded.updated_at",
+            [(resource_hash, path, fingerprint, time.time())],
+            changed=[resource_hash],
+            identifiers={resource_hash: resource_identifiers(resource_hash, path=path)},
+            origin="file",
+        )
+
+    def upsert_metadata(self, resource_hash: str, metadata_path: str, metadata: Dict[str, Any]) -> None:
+        self.upsert_metadata_many([(resource_hash, metadata_path, metadata)])
+
+    def upsert_metadata_many(self, entries: Iterable[tuple]) -> None:
+        """Store (resource_hash, metadata_path, metadata) entries."""
+        entries = list(entries)
+        now = time.time()
+        self._write(
+            "INSERT INTO resources (resource_hash, metadata_path, metadata, source_type, url, ticket_id, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(resource_hash) DO UPDATE SET "
+            "metadata_path = excluded.metadata_path, metadata = excluded.metadata, "
+            "source_type = excluded.source_type, url = excluded.url, ticket_id = excluded.ticket_id, "
+            "updated_at = excluded.updated_at",
+            [
+                (
+                    resource_hash,
+                    metadata_path,
+                    json.dumps(metadata, sort_keys=True, default=str),
+                    *(None if metadata.get(f) is None else str(metadata.get(f)) for f in INDEXED_METADATA_FIELDS),
+                    now,
+                )
+                for resource_hash, metadata_path, metadata in entries
+            ],
+            changed=[entry[0] for entry in entries],
+            identifiers={h: resource_identifiers(h, metadata) for h, _, metadata in entries},
+            origin="metadata",
+        )
+
+    def delete(self, resource_hashes: Iterable[str]) -> None:
+        resource_hashes = list(resource_hashes)
+        self._write(
+            "DELETE FROM resources WHERE resource_hash = ?",
+            [(h,) for h in resource_hashes],
+            changed=resource_hashes,
+            drop_identifiers=resource_hashes,
+        )
+
+    def find_identifiers(self, identifiers: List[str]) -> List[str]:
+        """Resources having any of the (normalized) identifiers, in the order of the identifiers."""
+        if not identifiers:
+            return []
+        rows = self._query(
+            "SELECT identifier, resource_hash FROM identifiers "
+            f"WHERE identifier IN ({', '.join('?' * len(identifiers))}) ORDER BY resource_hash",
+            tuple(identifiers),
+        )
+        by_identifier: Dict[str, List[str]] = {}
+        for identifier, resource_hash in rows:
+            by_identifier.setdefault(identifier, []).append(resource_hash)
+        hashes: List[str] = []
+        for identifier in identifiers:
+            for resource_hash in by_identifier.get(identifier, []):
+                if resource_hash not in hashes:
+                    hashes.append(resource_hash)
+        return hashes
+
+    def index_identifiers_once(self) -> bool:
+        """
+        Fill the identifiers table from the resources already in the catalog, the first
+        time a catalog created before it existed is opened. Returns True if this call did it.
+        """
+        if self.get_info("identifiers_indexed"):
+            return False
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._conn.execute("SELECT value FROM catalog_info WHERE key = 'identifiers_indexed'").fetchone()
+                if not done:
+                    rows = self._conn.execute("SELECT resource_hash, path, metadata FROM resources").fetchall()
+                    self._replace_identifiers(
+                        {h: resource_identifiers(h, path=path) for h, path, _ in rows if path}, "file"
+                    )
+                    self._replace_identifiers(
+                        {h: resource_identifiers(h, json.loads(metadata)) for h, _, metadata in rows if metadata},
+                        "metadata",
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO catalog_info (key, value) VALUES ('identifiers_indexed', ?)",
+                        (str(time.time()),),
+                    )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if not done:
+            logger.info(f"Indexed the exact identifiers of {len(rows)} catalogued resources")
+        return not done
+
+    def generation(self) -> int:
+        """Number of the last change written to the catalog (0 if none): a cheap "did anything change" check."""
+        rows = self._query("SELECT seq FROM sqlite_sequence WHERE name = 'changes'")
+        return rows[0][0] if rows else 0
+
+    def changes_since(self, generation: int) -> Optional[List[str]]:
+        """
+        Hashes of the resources changed after the given generation, or None if the log
+        no longer reaches back that far (or records a bulk change): re-read everything then.
+        """
+        if generation < int(self.get_info("compacted_through") or 0):
+            return None
+        rows = self._query("SELECT DISTINCT resource_hash FROM changes WHERE generation > ?", (generation,))
+        hashes = [row[0] for row in rows]
+        return None if None in hashes else hashes
+
+    def compact_changes(self, keep: int = 10000) -> None:
+        """Drop all but the last ``keep`` changes from the log."""
+        through = self.generation() - keep
+        if through <= int(self.get_info("compacted_through") or 0):
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM changes WHERE generation <= ?", (through,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO catalog_info (key, value) VALUES ('compacted_through', ?)", (str(through),)
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def rows_for(self, resource_hashes: List[str]) -> Dict[str, tuple]:
+        """resource hash -> (path, metadata_path) of those of the given resources still in the catalog."""
+        rows: Dict[str, tuple] = {}
+        for start in range(0, len(resource_hashes), 500):
+            chunk = resource_hashes[start:start + 500]
+            for resource_hash, path, metadata_path in self._query(
+                "SELECT resource_hash, path, metadata_path FROM resources "
+                f"WHERE resource_hash IN ({', '.join('?' * len(chunk))})",
+                tuple(chunk),
+            ):
+                rows[resource_hash] = (path, metadata_path)
+        return rows
+
+    def file_index(self) -> Dict[str, str]:
+        """resource hash -> stored file path, like index.yaml."""
+        return dict(self._query("SELECT resource_hash, path FROM resources WHERE path IS NOT NULL"))
+
+    def metadata_index(self) -> Dict[str, str]:
+        """resource hash -> stored metadata file path, like metadata_index.yaml."""
+        return dict(self._query("SELECT resource_hash, metadata_path FROM resources WHERE metadata_path IS NOT NULL"))
+
+    def get_metadata(self, resource_hash: str) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT metadata FROM resources WHERE resource_hash = ?", (resource_hash,))
+        if not rows or rows[0][0] is None:
+            return None
+        return json.loads(rows[0][0])
+
+    def get_all_metadata(self) -> Dict[str, Dict[str, Any]]:
+        """The metadata of every resource that has some, in a single query."""
+        rows = self._query("SELECT resource_hash, metadata FROM resources WHERE metadata IS NOT NULL ORDER BY resource_hash")
+        return {resource_hash: json.loads(metadata) for resource_hash, metadata in rows}
+
+    def get_fingerprint(self, resource_hash: str) -> Optional[str]:
+        rows = self._query("SELECT fingerprint FROM resources WHERE resource_hash = ?", (resource_hash,))
+        return rows[0][0] if rows else None
+
+    def find(self, metadata_field: str, value: str) -> List[str]:
+        """Resources whose metadata has ``metadata_field`` equal to ``value``."""
+        if metadata_field in INDEXED_METADATA_FIELDS:
+            rows = self._query(
+                f"SELECT resource_hash FROM resources WHERE {metadata_field} = ? ORDER BY resource_hash", (value,)
+            )
+        else:
+            rows = self._query(
+                "SELECT resource_hash FROM resources WHERE json_extract(metadata, ?) = ? ORDER BY resource_hash",
+                (f'$."{metadata_field}"', value),
+            )
+        return [row[0] for row in rows]
+
+    def migrate_once(
+        self,
+        load_file_index: Callable[[], Dict[str, str]],
+        load_metadata_index: Callable[[], Dict[str, str]],
+        load_metadata: Callable[[str], Optional[Dict[str, Any]]],
+        resolve_path: Callable[[str], Path],
+    ) -> bool:
+        """
+        Import the YAML catalogs (index.yaml, metadata_index.yaml and the metadata files
+        they point to) the first time the database is opened on a data path.
+        The catalogs are only loaded (through the load_* callables) when this call
+        does the migration. Returns True if it did.
+        """
+        if self.get_info("yaml_migrated"):
+            return False
+        with self._lock:
+            # re-check under the write lock, in case another process got there first
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                done = self._conn.execute("SELECT value FROM catalog_info WHERE key = 'yaml_migrated'").fetchone()
+                if not done:
+                    file_index, metadata_index = load_file_index(), load_metadata_index()
+                    now = time.time()
+                    self._conn.executemany(
+                        "INSERT OR IGNORE INTO resources (resource_hash, path, fingerprint, updated_at) VALUES (?, ?, ?, ?)",
+                        [(h, p, file_fingerprint(resolve_path(p)), now) for h, p in file_index.items()],
+                    )
+                    for resource_hash, metadata_path in metadata_index.items():
+                        metadata = load_metadata(metadata_path) or None
+                        self._conn.execute(
+                            "INSERT INTO resources (resource_hash, metadata_path, metadata, source_type, url, ticket_id, updated_at) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                            "ON CONFLICT(resource_hash) DO UPDATE SET metadata_path = excluded.metadata_path, "
+                            "metadata = excluded.metadata, source_type = excluded.source_type, "
+                            "url = excluded.url, ticket_id = excluded.ticket_id",
+                            (
+                                resource_hash,
+                                metadata_path,
+                                json.dumps(metadata, sort_keys=True, default=str) if metadata else None,
+                                *(
+                                    None if not metadata or metadata.get(f) is None else str(metadata.get(f))
+                                    for f in INDEXED_METADATA_FIELDS
+                                ),
+                                now,
+                            ),
+                        )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO catalog_info (key, value) VALUES ('yaml_migrated', ?)", (str(now),)
+                    )
+                    # a bulk change: readers re-read the whole catalog
+                    self._conn.execute("INSERT INTO changes (resource_hash) VALUES (NULL)")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        if not done:
+            logger.info(
+                f"Migrated {len(file_index)} files and {len(metadata_index)} metadata entries "
+                f"from the YAML catalogs into {self.db_path}"
+            )
+        return not done
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# metadata fields whose values identify a resource exactly
+IDENTIFIER_FIELDS = ("ticket_id", "url", "filename", "file_name")
+
+_URL = re.compile(r"https?://[^\s<>\"'`)\]]+")
+_TICKET_ID = re.compile(r"\b[A-Z][A-Z0-9_]+-\d+\b")
+_ISSUE_NUMBER = re.compile(r"(?:#|\b(?:issue|ticket)\s+#?)(\d{2,})\b", re.IGNORECASE)
+_FILENAME = re.compile(r"(?<![\w./-])[\w-]+(?:\.[\w-]+)*\.[A-Za-z][A-Za-z0-9]{0,5}\b")
+_LONG_NUMBER = re.compile(r"\b\d{6,}\b")
+
+
+def normalize_identifier(value: Any) -> str:
+    """Identifiers match regardless of case and of surrounding punctuation or trailing slashes."""
+    return str(value).strip().strip(".,;:!?\"'`()[]<>").rstrip("/").casefold()
+
+
+def resource_identifiers(
+    resource_hash: str,
+    metadata: Optional[Dict[str, Any]] = None,
+    path: Optional[str] = None,
+) -> Set[str]:
+    """The normalized identifiers of a resource: its hash, file name, and identifier fields of its metadata."""
+    identifiers = {normalize_identifier(resource_hash)}
+    if path:
+        identifiers.add(normalize_identifier(Path(path).name))
+    for field in IDENTIFIER_FIELDS:
+        value = (metadata or {}).get(field)
+        if value not in (None, ""):
+            identifiers.add(normalize_identifier(value))
+    identifiers.discard("")
+    return identifiers
+
+
+def query_identifiers(query: str) -> List[str]:
+    """
+    Exact identifiers mentioned in a query, normalized: URLs, ticket IDs (e.g.
+    CMSTRANSF-527), issue numbers (#1234), file names and long numbers (e.g. hashes).
+    """
+    found: List[str] = []
+    for url in _URL.findall(query):
+        found.append(url)
+    remainder = _URL.sub(" ", query)
+    found.extend(_TICKET_ID.findall(remainder))
+    found.extend(_ISSUE_NUMBER.findall(remainder))
+    found.extend(_FILENAME.findall(remainder))
+    found.extend(_LONG_NUMBER.findall(remainder))
+
+    identifiers: List[str] = []
+    for value in found:
+        normalized = normalize_identifier(value)
+        if normalized and normalized not in identifiers:
+            identifiers.append(normalized)
+    return identifiers
+
@@ -8,7 +8,11 @@ from langchain_core.documents import Document
 import yaml
 
 from src.utils.logging import get_logger
-from src.data_manager.vectorstore.loader_utils import load_doc_from_path
+from src.data_manager.collectors.utils.catalog_store import CATALOG_DB_FILE, CatalogStore
+from src.data_manager.collectors.utils.identifiers import query_identifiers
+from src.data_manager.collectors.utils.metadata_search import MetadataSearchIndex
+from src.data_manager.collectors.utils.text_index import TextIndex
+from src.data_manager.vectorstore.loader_utils import extract_text_from_path, load_doc_from_path
 
 logger = get_logger(__name__)
 
@@ -29,7 +33,14 @@ DEFAULT_TEXT_EXTENSIONS = {
 
 @dataclass
 class CatalogService:
-    """Expose lightweight access to catalogued resources and metadata."""
+    """
+    Expose lightweight access to catalogued resources and metadata.
+
+    The catalog is kept in a SQLite database (see CatalogStore), imported once from
+    the YAML catalogs of data paths created before it existed. index.yaml and
+    metadata_index.yaml are still exported now and then (see
+    PersistenceService.flush_index), but no longer read.
+    """
 
     data_path: Path | str
     include_extensions: Sequence[str] = field(default_factory=lambda: sorted(DEFAULT_TEXT_EXTENSIONS))
@@ -37,18 +48,56 @@ class CatalogService:
     metadata_filename: str = "metadata_index.yaml"
     _file_index: Dict[str, str] = field(init=False, default_factory=dict)
     _metadata_index: Dict[str, str] = field(init=False, default_factory=dict)
+    _store: Optional[CatalogStore] = field(init=False, default=None)
+    _generation: Optional[int] = field(init=False, default=None)
+    _text_index: Optional[TextIndex] = field(init=False, default=None)
+    _metadata_search_index: Optional[MetadataSearchIndex] = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         self.data_path = Path(self.data_path)
         if self.include_extensions:
             self.include_extensions = tuple(ext.lower() for ext in self.include_extensions)
+        self._store = CatalogStore(self.data_path)
+        self._store.migrate_once(
+            lambda: self.load_index(self.data_path, filename=self.filename),
+            lambda: self.load_index(self.data_path, filename=self.metadata_filename),
+            load_metadata=lambda stored: self._read_metadata_file(self._resolve(stored)),
+            resolve_path=self._resolve,
+        )
+        self._store.index_identifiers_once()
         self.refresh()
 
     def refresh(self) -> None:
-        """Reload file and metadata indices from disk."""
-        logger.debug("Refreshing catalog indices from %s", self.data_path)
-        self._file_index = self.load_index(self.data_path, filename=self.filename)
-        self._metadata_index = self.load_index(self.data_path, filename=self.metadata_filename)
+        """
+        Bring the file and metadata indices up to date with the catalog database: a
+        no-op when it did not change, re-reading only the changed resources otherwise.
+        """
+        generation = self._store.generation()
+        if generation != self._generation:
+            changed = self._store.changes_since(self._generation) if self._generation is not None else None
+            if changed is None:
+                logger.debug("Reloading catalog indices from %s", self.data_path)
+                self._file_index = self._store.file_index()
+                self._metadata_index = self._store.metadata_index()
+            else:
+                logger.debug(f"Refreshing {len(changed)} changed resources from {self.data_path}")
+                rows = self._store.rows_for(changed)
+                for resource_hash in changed:
+                    path, metadata_path = rows.get(resource_hash, (None, None))
+                    for index, stored in ((self._file_index, path), (self._metadata_index, metadata_path)):
+                        if stored is None:
+                            index.pop(resource_hash, None)
+                        else:
+                            index[resource_hash] = stored
+            self._generation = generation
+        if self._text_index is not None:
+            self._text_index.reload()
+        if self._metadata_search_index is not None:
+            self._metadata_search_index.reload()
+
+    @property
+    def store(self) -> CatalogStore:
+        return self._store
 
     @property
     def file_index(self) -> Dict[str, str]:
@@ -58,18 +107,66 @@ class CatalogService:
     def metadata_index(self) -> Dict[str, str]:
         return self._metadata_index
 
+    @property
+    def text_index(self) -> TextIndex:
+        """Store of the extracted text of each resource, with its trigram index (loaded on first use)."""
+        if self._text_index is None:
+            self._text_index = TextIndex(self.data_path)
+        return self._text_index
+
+    @property
+    def metadata_search_index(self) -> MetadataSearchIndex:
+        """Inverted index of the flattened metadata of each resource (loaded on first use)."""
+        if self._metadata_search_index is None:
+            self._metadata_search_index = MetadataSearchIndex(self.data_path)
+        return self._metadata_search_index
+
+    def sync_metadata_search_index(self) -> int:
+        """
+        Bring the metadata search index in line with the metadata index, parsing the
+        metadata files it does not cover yet and dropping the others. This writes the
+        shared index, so it is only for the data manager (PersistenceService.sync_search_indexes).
+        Returns the number of resources added.
+        """
+        return self.metadata_search_index.sync(self._metadata_index.keys(), self.get_metadata_for_hash)
+
+    def is_searchable(self, stored_path: str) -> bool:
+        """Whether a file (by its stored path) has one of the included extensions."""
+        return not self.include_extensions or Path(stored_path).suffix.lower() in self.include_extensions
+
+    def extract_text_for_hash(self, hash: str) -> Optional[str]:
+        """Run the document loaders on the file of a resource and return its full text."""
+        path = self.get_filepath_for_hash(hash)
+        return extract_text_from_path(path) if path else None
+
+    def sync_text_index(self) -> int:
+        """
+        Bring the text store in line with the file index, extracting the text of the
+        resources it does not cover yet (e.g. persisted before it existed) and dropping
+        the others. This writes the shared store, so it is only for the data manager
+        (PersistenceService.sync_search_indexes). Returns the number of resources extracted.
+        """
+        searchable = (h for h, stored in self._file_index.items() if self.is_searchable(stored))
+        return self.text_index.sync(searchable, self.extract_text_for_hash)
+
+    def get_text_for_hash(self, hash: str) -> Optional[str]:
+        """Extracted text of a resource, from the text store when it has it."""
+        if hash in self.text_index:
+            return self.text_index.get_text(hash)
+        return self.extract_text_for_hash(hash)
+
+    def find_by_identifiers(self, query: str) -> List[str]:
+        """
+        Resources named exactly in the query, by a ticket ID, URL, file name or hash
+        (see identifiers.query_identifiers), most specific identifier first.
+        """
+        return self._store.find_identifiers(query_identifiers(query))
+
     def get_resource_hashes_by_metadata_filter(self, metadata_field: str, value: str) -> List[str]:
         """
         Return resource hashes whose metadata contains ``metadata_field`` equal to ``value``.
         """
-        matches: List[str] = []
-        for resource_hash in self._metadata_index:
-            metadata = self.get_metadata_for_hash(resource_hash)
-            if not metadata:
-                continue
-            if metadata.get(metadata_field) == value:
-                matches.append(resource_hash)
-        return matches
+        return self._store.find(metadata_field, value)
 
     def iter_files(self) -> Iterable[Tuple[str, Path]]:
         for resource_hash in self._file_index.keys():
@@ -80,19 +177,36 @@ class CatalogService:
                 continue
             yield resource_hash, path
 
+    def _resolve(self, stored: str) -> Path:
+        path = Path(stored)
+        if not path.is_absolute():
+            path = (self.data_path / path).resolve()
+        return path
+
     def metadata_path_for_hash(self, resource_hash: str) -> Optional[Path]:
         stored = self._metadata_index.get(resource_hash)
         if not stored:
             return None
-        metadata_path = Path(stored)
-        if not metadata_path.is_absolute():
-            metadata_path = (self.data_path / metadata_path).resolve()
+        metadata_path = self._resolve(stored)
         return metadata_path if metadata_path.exists() else None
     
     def get_metadata_for_hash(self, hash: str) -> Optional[Dict[str, any]]:
+        metadata = self._store.get_metadata(hash)
+        if metadata is not None:
+            return metadata
         metadata_path = self.metadata_path_for_hash(hash)
         if not metadata_path:
             return None
+        return self._read_metadata_file(metadata_path)
+
+    def get_all_metadata(self) -> Dict[str, Dict[str, any]]:
+        """resource hash -> metadata of every catalogued resource, in a single query."""
+        return self._store.get_all_metadata()
+
+    @staticmethod
+    def _read_metadata_file(metadata_path: Path) -> Optional[Dict[str, any]]:
+        if not metadata_path.exists():
+            return None
         try:
             with metadata_path.open("r", encoding="utf-8") as fh:
                 data = yaml.safe_load(fh) or {}
@@ -108,9 +222,7 @@ class CatalogService:
         stored = self._file_index.get(hash)
         if not stored:
             return None
-        path = Path(stored)
-        if not path.is_absolute():
-            path = (self.data_path / path).resolve()
+        path = self._resolve(stored)
         return path if path.exists() else None
 
     # TODO this should probably be in the persistence service (?)
@@ -167,9 +279,19 @@ class CatalogService:
     def load_sources_catalog(cls, data_path: Path | str, filename: Optional[str] = None) -> Dict[str, str]:
         """
         Convenience helper that returns the resource index mapping with absolute paths.
+        Reads the catalog database when the data path has one.
         """
         base_path = Path(data_path)
-        index = cls.load_index(base_path, filename=filename)
+        index = None
+        if filename is None and (base_path / CATALOG_DB_FILE).exists():
+            store = CatalogStore(base_path)
+            try:
+                if store.get_info("yaml_migrated"):
+                    index = store.file_index()
+            finally:
+                store.close()
+        if index is None:
+            index = cls.load_index(base_path, filename=filename)
         resolved: Dict[str, str] = {}
         for key, stored_path in index.items():
             path = Path(stored_path)
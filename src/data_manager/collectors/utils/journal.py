@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from threading import RLock
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ChangeJournal:
+    """
+    Append-only JSON-lines log of the changes made to an index since its last snapshot.
+
+    Writers append their changes instead of rewriting the snapshot, and fold the journal
+    into a new snapshot once it holds ``compact_every`` records. Readers replay only the
+    part of the journal they have not seen yet, tracked by byte offset. Records must be
+    idempotent (e.g. "set" and "remove"), since a reader may replay a record that a
+    concurrent compaction already folded into the snapshot.
+
+    Appends and compactions hold an exclusive lock on ``<journal>.lock``, shared by all
+    processes, so that no record is appended between a writer's last replay of the
+    journal and its reset.
+    """
+
+    def __init__(self, path: Path | str, compact_every: int = 1000) -> None:
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.compact_every = max(1, int(compact_every))
+
+        self._thread_lock = RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the inter-process lock of the journal (re-entrant within this instance)."""
+        with self._thread_lock:
+            if self._lock_depth == 0:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = self.lock_path.open("a")
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                except OSError:
+                    lock_file.close()
+                    raise
+                self._lock_file = lock_file
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        payload = "".join(json.dumps(record, sort_keys=True) + "\n" for record in records)
+        with self.lock(), self.path.open("a", encoding="utf-8") as fh:
+            fh.write(payload)
+
+    def read(self, position: Tuple[int, int] = (0, 0)) -> Tuple[List[Dict[str, Any]], Tuple[int, int]]:
+        """
+        Records appended after position, and the position to read from next time.
+        A position is (inode, byte offset): once compaction replaces the journal, a
+        reader's old position no longer applies and the new journal is read from the start.
+        """
+        try:
+            with self.path.open("rb") as fh:
+                inode = os.fstat(fh.fileno()).st_ino
+                offset = position[1] if position[0] == inode else 0
+                fh.seek(offset)
+                data = fh.read()
+        except OSError:
+            return [], (0, 0)
+        # only complete lines: a concurrent writer may be in the middle of one
+        end = data.rfind(b"\n") + 1
+        records = []
+        for line in data[:end].splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f"Skipping malformed record in {self.path}")
+        return records, (inode, offset + end)
+
+    def count(self) -> int:
+        try:
+            with self.path.open("rb") as fh:
+                return sum(1 for _ in fh)
+        except OSError:
+            return 0
+
+    def needs_compaction(self) -> bool:
+        return self.count() >= self.compact_every
+
+    def reset(self) -> None:
+        """Empty the journal, once its records are part of a new snapshot (call with the lock held)."""
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text("", encoding="utf-8")
+        os.replace(tmp_path, self.path)
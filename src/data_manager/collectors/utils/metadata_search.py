@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+from pathlib import Path
+from threading import RLock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.data_manager.collectors.utils.journal import ChangeJournal
+from src.data_manager.collectors.utils.text_index import char_trigrams
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+METADATA_SEARCH_INDEX_FILE = "metadata_search_index.json"
+METADATA_SEARCH_JOURNAL_FILE = "metadata_search_index.journal"
+
+# "key: value" or "key=value" queries look the value up under that key only
+_KEY_VALUE_QUERY = re.compile(r"^\s*([\w.\-]+)\s*[:=]\s*(.+?)\s*$")
+
+
+def flatten_metadata(data: Dict[str, object], prefix: str = "") -> Dict[str, str]:
+    """Flatten nested metadata into dotted keys with string values."""
+    flattened: Dict[str, str] = {}
+    for key, value in data.items():
+        full_key = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            flattened.update(flatten_metadata(value, prefix=full_key))
+        else:
+            flattened[full_key] = "" if value is None else str(value)
+    return flattened
+
+
+class MetadataSearchIndex:
+    """
+    In-memory index of the flattened metadata of every resource, with a snapshot
+    persisted to ``<data_path>/metadata_search_index.json``.
+
+    Lookups go through an exact (key, value) map and a trigram index over keys and
+    values, so a search only compares the resources that can match instead of
+    parsing every ``.meta.yaml`` file. PersistenceService updates it whenever it
+    writes or deletes metadata; the changes are appended to a journal, folded into
+    the snapshot every ``compact_every`` changes.
+    """
+
+    def __init__(self, data_path: Path | str, compact_every: int = 1000) -> None:
+        self.snapshot_path = Path(data_path) / METADATA_SEARCH_INDEX_FILE
+        self.journal = ChangeJournal(Path(data_path) / METADATA_SEARCH_JOURNAL_FILE, compact_every=compact_every)
+
+        self._lock = RLock()
+        self._writer = f"{os.getpid()}-{id(self)}"
+        self._entries: Dict[str, Dict[str, str]] = {}
+        self._exact: Dict[Tuple[str, str], Set[str]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._mtime_ns: Optional[int] = None
+        self._journal_position = (0, 0)
+        self._pending: List[Dict[str, Any]] = []
+        self.reload()
+
+    def __contains__(self, resource_hash: str) -> bool:
+        return resource_hash in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, resource_hash: str) -> Optional[Dict[str, str]]:
+        """Flattened metadata of a resource, or None if it is not indexed."""
+        entry = self._entries.get(resource_hash)
+        return dict(entry) if entry is not None else None
+
+    def reload(self) -> None:
+        """
+        Catch up with the changes other processes made: re-read the snapshot if it was
+        rewritten (compacted) since it was loaded, then replay the journal's new records.
+        """
+        try:
+            mtime_ns = self.snapshot_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        with self._lock:
+            reloaded = mtime_ns is not None and mtime_ns != self._mtime_ns and self._load_snapshot(mtime_ns)
+            records, self._journal_position = self.journal.read(self._journal_position)
+            for record in records:
+                # our own records are already applied, unless the snapshot was just re-read
+                if reloaded or record.get("writer") != self._writer:
+                    self._apply(record)
+            if reloaded:
+                for record in self._pending:
+                    self._apply(record)
+
+    def _load_snapshot(self, mtime_ns: int) -> bool:
+        try:
+            with self.snapshot_path.open("r", encoding="utf-8") as fh:
+                entries = json.load(fh)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Failed to read metadata search index {self.snapshot_path}: {exc}")
+            return False
+        self._entries, self._exact, self._trigrams = {}, {}, {}
+        for resource_hash, flattened in (entries if isinstance(entries, dict) else {}).items():
+            self._index(resource_hash, flattened)
+        self._mtime_ns = mtime_ns
+        self._journal_position = (0, 0)
+        logger.debug(f"Loaded metadata search index of {len(self._entries)} resources")
+        return True
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        self._unindex(record["hash"])
+        if record["op"] == "set":
+            self._index(record["hash"], record["metadata"])
+
+    def _index(self, resource_hash: str, flattened: Dict[str, str]) -> None:
+        self._entries[resource_hash] = flattened
+        for key, value in flattened.items():
+            self._exact.setdefault((key.lower(), value.lower()), set()).add(resource_hash)
+            for trigram in char_trigrams(key) | char_trigrams(value):
+                self._trigrams.setdefault(trigram, set()).add(resource_hash)
+
+    def _unindex(self, resource_hash: str) -> None:
+        flattened = self._entries.pop(resource_hash, None)
+        if flattened is None:
+            return
+        for key, value in flattened.items():
+            exact_key = (key.lower(), value.lower())
+            hashes = self._exact.get(exact_key)
+            if hashes is not None:
+                hashes.discard(resource_hash)
+                if not hashes:
+                    del self._exact[exact_key]
+            for trigram in char_trigrams(key) | char_trigrams(value):
+                hashes = self._trigrams.get(trigram)
+                if hashes is not None:
+                    hashes.discard(resource_hash)
+                    if not hashes:
+                        del self._trigrams[trigram]
+
+    def add(self, resource_hash: str, metadata: Dict[str, Any]) -> None:
+        """Index (or re-index) the metadata of a resource."""
+        record = {"op": "set", "hash": resource_hash, "metadata": flatten_metadata(metadata), "writer": self._writer}
+        with self._lock:
+            self._apply(record)
+            self._pending.append(record)
+
+    def remove(self, resource_hash: str) -> None:
+        with self._lock:
+            if resource_hash in self._entries:
+                record = {"op": "remove", "hash": resource_hash, "writer": self._writer}
+                self._apply(record)
+                self._pending.append(record)
+
+    def lookup(self, key: str, value: str) -> List[str]:
+        """Resources whose metadata has exactly this value (case-sensitive) under this key."""
+        with self._lock:
+            hashes = self._exact.get((key.lower(), value.lower()), set())
+            return sorted(h for h in hashes if self._entries[h].get(key) == value)
+
+    def _substring_candidates(self, text: str) -> Iterable[str]:
+        trigrams = char_trigrams(text)
+        if not trigrams:
+            return list(self._entries)
+        postings = sorted((self._trigrams.get(t, set()) for t in trigrams), key=len)
+        return set(postings[0]).intersection(*postings[1:])
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Resources whose metadata matches the query, with the matching fields: a
+        "key: value" query matches the value under that key (exactly first, else as a
+        substring); any other query is a case-insensitive substring of a key or a value.
+        """
+        query = query.strip()
+        results: List[Tuple[str, Dict[str, str]]] = []
+        with self._lock:
+            key_value = _KEY_VALUE_QUERY.match(query)
+            if key_value:
+                key, value = key_value.group(1), key_value.group(2)
+                exact = sorted(self._exact.get((key.lower(), value.lower()), set()))
+                if exact:
+                    for resource_hash in exact[:limit]:
+                        matched = {k: v for k, v in self._entries[resource_hash].items() if k.lower() == key.lower()}
+                        results.append((resource_hash, matched))
+                    return results
+                value_lower = value.lower()
+                for resource_hash in sorted(self._substring_candidates(value_lower)):
+                    matched = {
+                        k: v for k, v in self._entries[resource_hash].items()
+                        if k.lower() == key.lower() and value_lower in v.lower()
+                    }
+                    if matched:
+                        results.append((resource_hash, matched))
+                        if limit and len(results) >= limit:
+                            return results
+                if results:
+                    return results
+
+            query_lower = query.lower()
+            for resource_hash in sorted(self._substring_candidates(query_lower)):
+                matched = {
+                    k: v for k, v in self._entries[resource_hash].items()
+                    if query_lower in k.lower() or query_lower in v.lower()
+                }
+                if matched:
+                    results.append((resource_hash, matched))
+                    if limit and len(results) >= limit:
+                        break
+        return results
+
+    def sync(self, resource_hashes: Iterable[str], load: Callable[[str], Optional[Dict[str, Any]]]) -> int:
+        """
+        Make the index cover exactly the given resources: load (with load(hash) -> metadata)
+        those missing, e.g. persisted before the index existed, and drop the others.
+        Returns the number of resources added.
+        """
+        wanted = set(resource_hashes)
+        with self._lock:
+            stale = [h for h in self._entries if h not in wanted]
+            missing = [h for h in wanted if h not in self._entries]
+        for resource_hash in stale:
+            self.remove(resource_hash)
+        added = 0
+        for resource_hash in missing:
+            metadata = load(resource_hash)
+            if isinstance(metadata, dict):
+                self.add(resource_hash, metadata)
+                added += 1
+        if stale or added:
+            logger.info(f"Metadata search index sync: added {added}, removed {len(stale)} resources")
+            self.flush()
+        return added
+
+    def flush(self, compact: bool = False) -> None:
+        """
+        Append the pending changes to the journal. Once the journal is long enough (or
+        with compact), fold it into a new snapshot.
+        """
+        with self._lock, self.journal.lock():
+            self.reload()
+            self.journal.append(self._pending)
+            self._pending = []
+            if not (compact or self.journal.needs_compaction()):
+                return
+            # the journal was just replayed, so the index in memory holds all of its records
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_path.open("w", encoding="utf-8") as fh:
+                json.dump(self._entries, fh, sort_keys=True)
+            os.replace(tmp_path, self.snapshot_path)
+            self.journal.reset()
+            self._mtime_ns = self.snapshot_path.stat().st_mtime_ns
+            self._journal_position = (0, 0)
+            logger.info(f"Compacted metadata search index of {len(self._entries)} resources")
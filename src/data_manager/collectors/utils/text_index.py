@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+import base64
+import json
+import os
+import re
+from array import array
+from pathlib import Path
+from threading import RLock
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+try:  # Python >= 3.11
+    import re._parser as sre_parse
+    from re._constants import LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+    from sre_constants import LITERAL, MAX_REPEAT, MIN_REPEAT, SUBPATTERN
+
+from src.data_manager.collectors.utils.journal import ChangeJournal
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+TEXT_STORE_DIRNAME = "text_store"
+TRIGRAM_INDEX_FILE = "trigrams.json"
+TRIGRAM_JOURNAL_FILE = "trigrams.journal"
+
+
+def char_trigrams(text: str) -> Set[str]:
+    """The set of (lowercased) character trigrams of a text."""
+    lowered = text.lower()
+    return {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+
+
+def _literal_runs(parsed: Iterable, runs: List[str]) -> None:
+    """Collect the runs of literal characters every match of a parsed (sub)pattern contains."""
+    current: List[str] = []
+    for op, value in parsed:
+        if op is LITERAL:
+            current.append(chr(value))
+            continue
+        if current:
+            runs.append("".join(current))
+            current = []
+        if op is SUBPATTERN:
+            _literal_runs(value[-1], runs)
+        elif op in (MAX_REPEAT, MIN_REPEAT) and value[0] >= 1:
+            _literal_runs(value[2], runs)
+    if current:
+        runs.append("".join(current))
+
+
+def required_literals(pattern: str) -> List[str]:
+    """
+    Literal substrings that any match of the regex pattern must contain (an escaped
+    query yields itself). Alternations and character classes contribute nothing, so
+    a pattern made only of them yields no literals.
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return []
+    runs: List[str] = []
+    _literal_runs(parsed, runs)
+    return runs
+
+
+class TextIndex:
+    """
+    Persistent store of the text extracted from each resource, with an inverted index
+    of its (lowercased) character trigrams, kept under ``<data_path>/text_store``.
+
+    Text is extracted once, when a resource is persisted, so searches read plain text
+    instead of re-running the document loaders, and the trigram index narrows a search
+    down to the resources that can match before any of them is scanned.
+
+    Changes are appended to a journal rather than rewriting the index, which is
+    compacted into a new snapshot every ``compact_every`` changes.
+    """
+
+    def __init__(self, data_path: Path | str, compact_every: int = 1000) -> None:
+        self.root = Path(data_path) / TEXT_STORE_DIRNAME
+        self.index_path = self.root / TRIGRAM_INDEX_FILE
+        self.journal = ChangeJournal(self.root / TRIGRAM_JOURNAL_FILE, compact_every=compact_every)
+
+        self._lock = RLock()
+        self._writer = f"{os.getpid()}-{id(self)}"
+        self._ids: List[Optional[str]] = []  # document id -> resource hash (None once removed)
+        self._doc_ids: Dict[str, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._mtime_ns: Optional[int] = None
+        self._journal_position = (0, 0)
+        self._pending: List[Dict[str, str]] = []
+        self.reload()
+
+    def _text_path(self, resource_hash: str) -> Path:
+        return self.root / "texts" / resource_hash[:2] / f"{resource_hash}.txt"
+
+    def __contains__(self, resource_hash: str) -> bool:
+        return resource_hash in self._doc_ids
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def hashes(self) -> List[str]:
+        with self._lock:
+            return list(self._doc_ids)
+
+    def reload(self) -> None:
+        """
+        Catch up with the changes other processes made: re-read the snapshot if it was
+        rewritten (compacted) since it was loaded, then replay the journal's new records.
+        Costs a stat and a read of the journal's tail when nothing changed.
+        """
+        try:
+            mtime_ns = self.index_path.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        with self._lock:
+            reloaded = mtime_ns is not None and mtime_ns != self._mtime_ns and self._load_snapshot(mtime_ns)
+            records, self._journal_position = self.journal.read(self._journal_position)
+            for record in records:
+                # our own records are already applied, unless the snapshot was just re-read
+                if reloaded or record.get("writer") != self._writer:
+                    self._apply(record)
+            if reloaded:
+                for record in self._pending:
+                    self._apply(record)
+
+    def _load_snapshot(self, mtime_ns: int) -> bool:
+        try:
+            with self.index_path.open("r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Failed to read trigram index {self.index_path}: {exc}")
+            return False
+        self._ids = data.get("ids", [])
+        self._doc_ids = {h: i for i, h in enumerate(self._ids) if h is not None}
+        self._postings = {}
+        for trigram, encoded in data.get("postings", {}).items():
+            ids = array("I")
+            ids.frombytes(base64.b64decode(encoded))
+            self._postings[trigram] = ids
+        self._mtime_ns = mtime_ns
+        self._journal_position = (0, 0)
+        logger.debug(f"Loaded trigram index of {len(self._doc_ids)} resources from {self.index_path}")
+        return True
+
+    def _apply(self, record: Dict[str, str]) -> None:
+        if record["op"] == "set":
+            self._index(record["hash"], self.get_text(record["hash"]) or "")
+        elif record["op"] == "remove":
+            self._remove_from_index(record["hash"])
+
+    def _index(self, resource_hash: str, text: str) -> None:
+        self._remove_from_index(resource_hash)
+        doc_id = len(self._ids)
+        self._ids.append(resource_hash)
+        self._doc_ids[resource_hash] = doc_id
+        for trigram in char_trigrams(text):
+            self._postings.setdefault(trigram, array("I")).append(doc_id)
+
+    def add(self, resource_hash: str, text: Optional[str]) -> None:
+        """Store the extracted text of a resource (replacing any previous one) and index it."""
+        text = text or ""
+        path = self._text_path(resource_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding="utf-8", errors="surrogatepass")
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._index(resource_hash, text)
+            self._pending.append({"op": "set", "hash": resource_hash, "writer": self._writer})
+
+    def remove(self, resource_hash: str) -> None:
+        """Drop a resource's text and index entries."""
+        with self._lock:
+            if resource_hash in self._doc_ids:
+                self._remove_from_index(resource_hash)
+                self._pending.append({"op": "remove", "hash": resource_hash, "writer": self._writer})
+        try:
+            self._text_path(resource_hash).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _remove_from_index(self, resource_hash: str) -> None:
+        # postings keep the id of a removed document until the next compaction; it maps to None
+        doc_id = self._doc_ids.pop(resource_hash, None)
+        if doc_id is not None:
+            self._ids[doc_id] = None
+
+    def get_text(self, resource_hash: str) -> Optional[str]:
+        try:
+            return self._text_path(resource_hash).read_text(encoding="utf-8", errors="surrogatepass")
+        except OSError:
+            return None
+
+    def candidates(self, pattern: str) -> Optional[List[str]]:
+        """
+        Resources whose text may match the regex pattern (a superset of the matches), or
+        None if the pattern has no trigram to narrow the search with (scan all resources).
+        """
+        trigrams: Set[str] = set()
+        for literal in required_literals(pattern):
+            # only ASCII trigrams: lowercasing is not how IGNORECASE folds every other character
+            trigrams.update(t for t in char_trigrams(literal) if t.isascii())
+        if not trigrams:
+            return None
+
+        with self._lock:
+            postings = []
+            for trigram in trigrams:
+                ids = self._postings.get(trigram)
+                if ids is None:
+                    return []
+                postings.append(ids)
+            postings.sort(key=len)
+            matching = set(postings[0])
+            for ids in postings[1:]:
+                if len(matching) <= 1:
+                    break
+                matching.intersection_update(ids)
+            return [self._ids[i] for i in sorted(matching) if self._ids[i] is not None]
+
+    def sync(self, resource_hashes: Iterable[str], extract: Callable[[str], Optional[str]]) -> int:
+        """
+        Make the store cover exactly the given resources: extract (with extract(hash) -> text)
+        those missing, e.g. persisted before the store existed, and drop the others.
+        Returns the number of resources added.
+        """
+        wanted = set(resource_hashes)
+        with self._lock:
+            stale = [h for h in self._doc_ids if h not in wanted]
+            missing = [h for h in wanted if h not in self._doc_ids]
+        for resource_hash in stale:
+            self.remove(resource_hash)
+        for resource_hash in missing:
+            self.add(resource_hash, extract(resource_hash))
+        if stale or missing:
+            logger.info(f"Text store sync: added {len(missing)}, removed {len(stale)} resources")
+            self.flush()
+        return len(missing)
+
+    def _compact_ids(self) -> None:
+        live = [h for h in self._ids if h is not None]
+        remap = {old: new for new, old in enumerate(i for i, h in enumerate(self._ids) if h is not None)}
+        postings: Dict[str, array] = {}
+        for trigram, ids in self._postings.items():
+            kept = array("I", (remap[i] for i in ids if i in remap))
+            if kept:
+                postings[trigram] = kept
+        self._ids = live
+        self._doc_ids = {h: i for i, h in enumerate(live)}
+        self._postings = postings
+
+    def flush(self, compact: bool = False) -> None:
+        """
+        Append the pending changes to the journal. Once the journal is long enough (or
+        with compact), fold it into a new snapshot, dropping removed documents.
+        """
+        with self._lock, self.journal.lock():
+            self.reload()
+            self.journal.append(self._pending)
+            self._pending = []
+            if compact or self.journal.needs_compaction():
+                self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        # the journal was just replayed, so the index in memory holds all of its records
+        if len(self._doc_ids) < len(self._ids):
+            self._compact_ids()
+        data = {
+            "ids": self._ids,
+            "postings": {t: base64.b64encode(ids.tobytes()).decode("ascii") for t, ids in self._postings.items()},
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump(data, fh)
+        os.replace(tmp_path, self.index_path)
+        self.journal.reset()
+        self._mtime_ns = self.index_path.stat().st_mtime_ns
+        self._journal_position = (0, 0)
+        logger.info(f"Compacted trigram index of {len(self._doc_ids)} resources into {self.index_path}")
@@ -39,7 +39,8 @@ class DataManager():
             logger.info(message)
             step()
 
-        self.persistence.flush_index()
+        self.persistence.sync_search_indexes()
+        self.persistence.flush_index(export=True)
 
         self.vector_manager = VectorStoreManager(
             config=self.config,
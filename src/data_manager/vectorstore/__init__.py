@@ -1,3 +1,19 @@
+from .corpus_version import (compute_corpus_version, publish_corpus_version,
+                             read_corpus_version)
+from .embedding_client import EmbeddingClient
+from .embeddings import (SharedEmbeddings, acquire_embedding_model,
+                         embedding_from_config, release_embedding_model)
 from .manager import SUPPORTED_DISTANCE_METRICS, VectorStoreManager
 
-__all__ = ["VectorStoreManager", "SUPPORTED_DISTANCE_METRICS"]
+__all__ = [
+    "VectorStoreManager",
+    "SUPPORTED_DISTANCE_METRICS",
+    "EmbeddingClient",
+    "compute_corpus_version",
+    "publish_corpus_version",
+    "read_corpus_version",
+    "SharedEmbeddings",
+    "acquire_embedding_model",
+    "embedding_from_config",
+    "release_embedding_model",
+]
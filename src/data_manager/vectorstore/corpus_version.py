@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+CORPUS_VERSIONS_FILE = "corpus_versions.json"
+
+# (path) -> (mtime_ns, versions), so readers only re-read the file when it changes
+_read_cache: Dict[str, Tuple[int, Dict[str, str]]] = {}
+_read_cache_lock = Lock()
+
+
+def compute_corpus_version(resource_hashes: Iterable[str]) -> str:
+    """A version string that only depends on the set of resources in the corpus."""
+    digest = hashlib.sha256()
+    for resource_hash in sorted(set(resource_hashes)):
+        digest.update(resource_hash.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _versions_path(data_path: str) -> Path:
+    return Path(data_path) / CORPUS_VERSIONS_FILE
+
+
+def _load_versions(path: Path) -> Dict[str, str]:
+    try:
+        with path.open("r", encoding="utf-8") as fh:
+            versions = json.load(fh)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as exc:
+        logger.warning(f"Failed to read corpus versions from {path}: {exc}")
+        return {}
+    return versions if isinstance(versions, dict) else {}
+
+
+def publish_corpus_version(data_path: str, collection_name: str, version: str) -> bool:
+    """
+    Record the current corpus version of a collection, so that anything derived from
+    the corpus (e.g. cached answers) can tell it is stale. Returns True if it changed.
+    """
+    path = _versions_path(data_path)
+    versions = _load_versions(path)
+    if versions.get(collection_name) == version:
+        return False
+
+    versions[collection_name] = version
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        json.dump(versions, fh, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    logger.info(f"Published corpus version {version} for collection {collection_name}")
+    return True
+
+
+def read_corpus_version(data_path: str, collection_name: str) -> Optional[str]:
+    """Return the last published corpus version of a collection, or None if there is none."""
+    path = _versions_path(data_path)
+    try:
+        mtime_ns = path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+    key = str(path)
+    with _read_cache_lock:
+        cached = _read_cache.get(key)
+        if cached is None or cached[0] != mtime_ns:
+            cached = (mtime_ns, _load_versions(path))
+            _read_cache[key] = cached
+    return cached[1].get(collection_name)
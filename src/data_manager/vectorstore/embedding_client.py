@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from typing import List
+
+import requests
+from langchain_core.embeddings import Embeddings
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingClient(Embeddings):
+    """
+    Embeddings backed by the deployment's embedding server (src/bin/service_embedding.py),
+    so that services don't each load their own copy of the embedding model. The server
+    batches concurrent requests from all services together.
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 60.0, max_request_size: int = 256) -> None:
+        self.url = f"http://{host}:{port}/embed"
+        self.timeout = timeout
+        self.max_request_size = max(1, int(max_request_size))
+        self._session = requests.Session()
+
+    def _embed(self, texts: List[str], kind: str) -> List[List[float]]:
+        response = self._session.post(
+            self.url,
+            json={"texts": texts, "kind": kind},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Embedding server returned {response.status_code}: {response.text}")
+        return response.json()["embeddings"]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        embeddings: List[List[float]] = []
+        for start in range(0, len(texts), self.max_request_size):
+            embeddings.extend(self._embed(list(texts[start:start + self.max_request_size]), "documents"))
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed([text], "query")[0]
+
+    def __repr__(self) -> str:
+        return f"EmbeddingClient({self.url!r})"
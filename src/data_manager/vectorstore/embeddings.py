@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import copy
+import json
+from threading import Lock, RLock
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from src.data_manager.vectorstore.embedding_client import EmbeddingClient
+from src.utils.config_loader import resolve_class
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# embedding clients that are safe to call from several threads at once (remote APIs);
+# calls to any other (local) model are serialized, since e.g. HF tokenizers are not
+THREAD_SAFE_EMBEDDINGS = {"OpenAIEmbeddings", "EmbeddingClient"}
+
+
+class SharedEmbeddings(Embeddings):
+    """
+    A process-wide embedding model handed out by the registry, see acquire_embedding_model.
+    Wraps the actual model, serializing calls to it unless it is known to be thread-safe.
+    Other attributes are forwarded to the wrapped model.
+    """
+
+    def __init__(self, model: Embeddings, key: Tuple[type, str], serialize: bool) -> None:
+        self.model = model
+        self.key = key
+        self._lock = RLock() if serialize else None
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if self._lock is None:
+            return self.model.embed_documents(texts)
+        with self._lock:
+            return self.model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self._lock is None:
+            return self.model.embed_query(text)
+        with self._lock:
+            return self.model.embed_query(text)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("__") or name in ("model", "key", "_lock"):
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def __repr__(self) -> str:
+        return f"SharedEmbeddings({self.model!r})"
+
+
+_registry: Dict[Tuple[type, str], SharedEmbeddings] = {}
+_refcounts: Dict[Tuple[type, str], int] = {}
+_registry_lock = Lock()
+
+
+def acquire_embedding_model(embedding_class: Any, embedding_kwargs: Dict[str, Any] | None = None) -> SharedEmbeddings:
+    """
+    Return the process-wide instance of embedding_class built with embedding_kwargs,
+    creating it on first use. Every call takes a reference, to be given back with
+    release_embedding_model once the caller no longer needs the model.
+    """
+    embedding_class = resolve_class(embedding_class)
+    embedding_kwargs = dict(embedding_kwargs or {})
+    key = (embedding_class, json.dumps(embedding_kwargs, sort_keys=True, default=repr))
+
+    with _registry_lock:
+        shared = _registry.get(key)
+        if shared is None:
+            logger.info(f"Loading embedding model {embedding_class.__name__}")
+            model = embedding_class(**copy.deepcopy(embedding_kwargs))
+            shared = SharedEmbeddings(
+                model,
+                key,
+                serialize=embedding_class.__name__ not in THREAD_SAFE_EMBEDDINGS,
+            )
+            _registry[key] = shared
+            _refcounts[key] = 0
+        _refcounts[key] += 1
+    return shared
+
+
+def release_embedding_model(shared: SharedEmbeddings) -> None:
+    """
+    Give back a reference taken with acquire_embedding_model. The registry drops the
+    model once no reference is left, so it is freed when the last user lets go of it.
+    """
+    with _registry_lock:
+        if _registry.get(shared.key) is not shared:
+            return
+        _refcounts[shared.key] -= 1
+        if _refcounts[shared.key] <= 0:
+            logger.info(f"Releasing embedding model {shared.key[0].__name__}")
+            del _registry[shared.key]
+            del _refcounts[shared.key]
+
+
+def embedding_from_config(dm_config: Dict[str, Any], services_config: Dict[str, Any] | None = None) -> SharedEmbeddings:
+    """
+    Acquire the embedding model selected by a data_manager config (embedding_name).
+    If the embedding server is enabled in the services config, this is a client of the
+    server instead, which holds the actual model for the whole deployment.
+    """
+    server_config = (services_config or {}).get("embedding_server", {}) or {}
+    if server_config.get("enabled", False):
+        return acquire_embedding_model(
+            EmbeddingClient,
+            {
+                "host": server_config["host"],
+                "port": server_config["port"],
+                "timeout": server_config.get("timeout", 60),
+            },
+        )
+
+    embedding_entry = dm_config["embedding_class_map"][dm_config["embedding_name"]]
+    return acquire_embedding_model(embedding_entry["class"], embedding_entry.get("kwargs", {}))
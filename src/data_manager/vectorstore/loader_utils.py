@@ -81,3 +81,21 @@ def load_text_from_path(file_path: str | Path) -> Optional[str]:
     except Exception as exc:
         logger.warning("Failed to extract text from %s: %s", file_path, exc)
         return None
+
+
+def extract_text_from_path(file_path: str | Path) -> Optional[str]:
+    """Extract the full text of a file as the document loaders see it (all pages joined).
+
+    Formats without a loader (csv, json, logs, ...) are read as plain text.
+    Returns None if extraction fails.
+    """
+    path = Path(file_path)
+    loader = select_loader(path)
+    if loader is None:
+        return load_text_from_path(path)
+    try:
+        docs = loader.load()
+    except Exception as exc:
+        logger.warning("Failed to extract text from %s: %s", file_path, exc)
+        return None
+    return "\n".join(str(d.page_content) for d in docs if getattr(d, "page_content", None))
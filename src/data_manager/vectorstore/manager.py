@@ -17,6 +17,10 @@ from .loader_utils import select_loader
 from langchain_text_splitters.character import CharacterTextSplitter
 
 from src.data_manager.collectors.utils.index_utils import CatalogService
+from src.data_manager.vectorstore.corpus_version import (compute_corpus_version,
+                                                         publish_corpus_version)
+from src.data_manager.vectorstore.embeddings import (embedding_from_config,
+                                                     release_embedding_model)
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -47,12 +51,8 @@ class VectorStoreManager:
                 f"Must be one of {SUPPORTED_DISTANCE_METRICS}"
             )
 
-        # Build embedding model
-        embedding_class_map = self._data_manager_config["embedding_class_map"]
-        embedding_entry = embedding_class_map[embedding_name]
-        embedding_class = embedding_entry["class"]
-        embedding_kwargs = embedding_entry.get("kwargs", {})
-        self.embedding_model = embedding_class(**embedding_kwargs)
+        # Get the (process-wide, shared) embedding model
+        self.embedding_model = embedding_from_config(self._data_manager_config, self._services_config)
 
         self.text_splitter = CharacterTextSplitter(
             chunk_size=self._data_manager_config["chunk_size"],
@@ -80,6 +80,12 @@ class VectorStoreManager:
                 self.parallel_workers = default_workers
         self.parallel_workers = max(1, self.parallel_workers)
 
+    def close(self) -> None:
+        """Release this manager's reference to the shared embedding model."""
+        if self.embedding_model is not None:
+            release_embedding_model(self.embedding_model)
+            self.embedding_model = None
+
     def delete_existing_collection_if_reset(self) -> None:
         """Delete the collection if reset_collection is enabled."""
         if not self._data_manager_config.get("reset_collection", False):
@@ -137,6 +143,12 @@ class VectorStoreManager:
         logger.info(f"N Collection: {collection.count()}")
         del collection
 
+        publish_corpus_version(
+            self.data_path,
+            self.collection_name,
+            compute_corpus_version(hashes_in_data),
+        )
+
     def _build_client(self):
         chroma_cfg = self._services_config.get("chromadb", {})
         if chroma_cfg.get("use_HTTP_chromadb_client"):
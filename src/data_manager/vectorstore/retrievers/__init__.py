@@ -1,3 +1,4 @@
+from .cache import RetrievalCache, retrieval_cache_from_config
 from .grading_retriever import GradingRetriever
 from .bm25_retriever import BM25LexicalRetriever
 from .hybrid_retriever import HybridRetriever
@@ -8,4 +9,6 @@ __all__ = [
     "SemanticRetriever",
     "GradingRetriever",
     "HybridRetriever",
+    "RetrievalCache",
+    "retrieval_cache_from_config",
 ]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.data_manager.vectorstore.corpus_version import read_corpus_version
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """Queries differing only in surrounding or repeated whitespace retrieve the same documents."""
+    return " ".join(query.split())
+
+
+def _collection_name(vectorstore: Any) -> Optional[str]:
+    collection = getattr(vectorstore, "_collection", None) or getattr(vectorstore, "collection", None)
+    return getattr(collection, "name", None)
+
+
+class RetrievalCache:
+    """
+    LRU cache of retrieval results, i.e. lists of (Document, score), keyed by
+    (normalized query, retriever type, k, filters, collection, corpus version).
+
+    Results are only reused within one corpus version: once the vectorstore manager
+    publishes a new one, the older entries are never matched again (and age out).
+    """
+
+    def __init__(self, data_path: str, max_entries: int = 2048, ttl_seconds: Optional[float] = 3600):
+        self.data_path = data_path
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+
+        self._lock = Lock()
+        self._entries: OrderedDict[Tuple, Tuple[float, List]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, vectorstore: Any, retriever: str, query: str, k: int, filters: Optional[Dict[str, Any]]) -> Tuple:
+        collection_name = _collection_name(vectorstore)
+        corpus_version = read_corpus_version(self.data_path, collection_name) if collection_name else None
+        return (
+            normalize_query(query),
+            retriever,
+            k,
+            json.dumps(filters, sort_keys=True, default=repr) if filters else None,
+            collection_name,
+            corpus_version,
+        )
+
+    def get_or_compute(
+        self,
+        vectorstore: Any,
+        retriever: str,
+        query: str,
+        k: int,
+        compute: Callable[[], List],
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List:
+        """Return the cached results for this search, running compute() on a miss."""
+        key = self._key(vectorstore, retriever, query, k, filters)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (not self.ttl_seconds or now - entry[0] < self.ttl_seconds):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.debug(f"Retrieval cache hit for {retriever} (k={k}): '{key[0]}'")
+                return list(entry[1])
+            self.misses += 1
+
+        results = list(compute() or [])
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return list(results)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_caches: Dict[Tuple, RetrievalCache] = {}
+_caches_lock = Lock()
+
+
+def retrieval_cache_from_config(config: Dict[str, Any]) -> Optional[RetrievalCache]:
+    """
+    Return the process-wide retrieval cache for a config, or None if it is disabled
+    (data_manager.retrievers.cache.enabled). Configs with the same settings share one cache.
+    """
+    cache_cfg = config["data_manager"].get("retrievers", {}).get("cache", {}) or {}
+    if not cache_cfg.get("enabled", False):
+        return None
+
+    key = (
+        config["global"]["DATA_PATH"],
+        cache_cfg.get("max_entries", 2048),
+        cache_cfg.get("ttl_seconds", 3600),
+    )
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = RetrievalCache(*key)
+            _caches[key] = cache
+    return cache
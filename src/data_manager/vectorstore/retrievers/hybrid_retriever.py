@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from langchain_core.callbacks.manager import CallbackManagerForRetrieverRun
 from langchain_classic.retrievers import EnsembleRetriever
@@ -7,6 +7,7 @@ from langchain_core.retrievers import BaseRetriever
 from langchain_core.vectorstores.base import VectorStore
 
 from src.data_manager.vectorstore.retrievers.bm25_retriever import BM25LexicalRetriever
+from src.data_manager.vectorstore.retrievers.cache import RetrievalCache
 from src.utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -14,6 +15,11 @@ logger = get_logger(__name__)
 class HybridRetriever(BaseRetriever):
     """
     Hybrid retriever that combines BM25 (lexical) and ChromaDB (semantic) search.
+    With a RetrievalCache, repeated queries are answered from it; the BM25 index is
+    only built the first time a query actually has to be searched.
+    With an identifier_lookup (query -> hashes of the resources it names exactly, e.g.
+    CatalogService.find_by_identifiers), the chunks of those resources most similar to
+    the query are put ahead of the fuzzy results.
     """
     vectorstore: VectorStore
     k: int
@@ -21,22 +27,29 @@ class HybridRetriever(BaseRetriever):
     semantic_weight: float = 0.4
     bm25_k1: float = 0.5
     bm25_b: float = 0.75
+    cache: Optional[RetrievalCache] = None
+    identifier_lookup: Optional[Callable[[str], List[str]]] = None
     _bm25_retriever: BM25LexicalRetriever = None
     _ensemble_retriever: EnsembleRetriever = None
     
     def __init__(self, vectorstore: VectorStore, k: int = 3,
                  bm25_weight: float = 0.6, semantic_weight: float = 0.4,
-                 bm25_k1: float = 0.5, bm25_b: float = 0.75):
+                 bm25_k1: float = 0.5, bm25_b: float = 0.75,
+                 cache: Optional[RetrievalCache] = None,
+                 identifier_lookup: Optional[Callable[[str], List[str]]] = None):
         super().__init__(
             vectorstore=vectorstore, 
             k=k,
             bm25_weight=bm25_weight,
             semantic_weight=semantic_weight,
             bm25_k1=bm25_k1,
-            bm25_b=bm25_b
+            bm25_b=bm25_b,
+            cache=cache,
+            identifier_lookup=identifier_lookup,
         )
         self.k = k
-        self._initialize_retrievers()
+        if self.cache is None:
+            self._initialize_retrievers()
     
     def _initialize_retrievers(self):
         """
@@ -66,11 +79,72 @@ class HybridRetriever(BaseRetriever):
     
     def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun = None) -> List[Document]:
         """
-        Retrieve relevant documents using hybrid search (BM25 + semantic).
-        Falls back to semantic search only if hybrid search is not available.
+        Retrieve relevant documents using hybrid search (BM25 + semantic), after the
+        most relevant chunks of the resources the query names exactly, if any. Exact
+        matches fill at most half of the k results (rounded up) ahead of the hybrid
+        ones; more of them are only used when the hybrid search returns too few.
         """
+        exact = self._exact_matches(query)
+        fuzzy = self._fuzzy_search(query, run_manager)
+        if not exact:
+            return fuzzy
+        seen = {self._chunk_key(doc) for doc, _ in exact}
+        reserved = (self.k + 1) // 2
+        merged = (
+            exact[:reserved]
+            + [(doc, score) for doc, score in fuzzy if self._chunk_key(doc) not in seen]
+            + exact[reserved:]
+        )
+        return merged[:self.k]
+
+    @staticmethod
+    def _chunk_key(doc: Document) -> Tuple:
+        return (doc.metadata.get("resource_hash"), doc.metadata.get("chunk_index"), doc.page_content[:200])
+
+    def _exact_matches(self, query: str) -> List[Tuple[Document, float]]:
+        """
+        The chunks most similar to the query among those of the resources it names
+        exactly (by ticket ID, URL, file name or hash), best first.
+        """
+        if self.identifier_lookup is None:
+            return []
+        try:
+            resource_hashes = self.identifier_lookup(query)
+            if not resource_hashes:
+                return []
+            where = (
+                {"resource_hash": resource_hashes[0]}
+                if len(resource_hashes) == 1
+                else {"resource_hash": {"$in": resource_hashes}}
+            )
+            found = self.vectorstore.similarity_search_with_score(query, k=self.k, filter=where)
+        except Exception as exc:
+            logger.warning(f"Exact identifier lookup failed, using hybrid search only: {exc}")
+            return []
+
+        logger.debug(f"Exact identifier match: {len(resource_hashes)} resources, {len(found)} chunks")
+        # exact matches get the top score, above the placeholder of the hybrid results
+        return [
+            (Document(page_content=doc.page_content, metadata={**(doc.metadata or {}), "exact_match": True}), 1.0)
+            for doc, _ in found
+        ]
+
+    def _fuzzy_search(self, query: str, run_manager: CallbackManagerForRetrieverRun = None) -> List:
+        if self.cache is not None:
+            return self.cache.get_or_compute(
+                self.vectorstore,
+                f"hybrid(bm25={self.bm25_weight},semantic={self.semantic_weight},k1={self.bm25_k1},b={self.bm25_b})",
+                query,
+                self.k,
+                lambda: self._search(query, run_manager),
+            )
+        return self._search(query, run_manager)
+
+    def _search(self, query: str, run_manager: CallbackManagerForRetrieverRun = None) -> List[Document]:
         logger.debug(f"Query: {query}")
         logger.debug(f"Using hybrid search (BM25 + semantic) to retrieve top-{self.k} docs")
+        if self._ensemble_retriever is None and self.cache is not None:
+            self._initialize_retrievers()
         if self._ensemble_retriever is None:
             raise RuntimeError("HybridRetriever not initialised; ensemble retriever is missing.")
 
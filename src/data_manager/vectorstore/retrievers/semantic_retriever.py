@@ -1,9 +1,10 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
 from langchain_core.vectorstores.base import VectorStore
 
+from src.data_manager.vectorstore.retrievers.cache import RetrievalCache
 from src.utils.logging import get_logger
 from src.data_manager.vectorstore.retrievers.utils import supports_instructions, make_instruction_query, INSTRUCTION_AWARE_MODELS
 
@@ -14,13 +15,16 @@ class SemanticRetriever(BaseRetriever):
     k: int = 3
     instructions: str | None = None
     dm_config: Dict[str, any] = None
+    cache: Optional[RetrievalCache] = None
     
-    def __init__(self, vectorstore: VectorStore, dm_config: Dict[str, any], k: int = 3, instructions: str | None = None):
+    def __init__(self, vectorstore: VectorStore, dm_config: Dict[str, any], k: int = 3, instructions: str | None = None,
+                 cache: Optional[RetrievalCache] = None):
         super().__init__()
         self.vectorstore = vectorstore
         self.k = k
         self.instructions = instructions
         self.dm_config = dm_config
+        self.cache = cache
 
     def _get_relevant_documents(self, query: str) -> List[Document]:
         """
@@ -36,7 +40,16 @@ class SemanticRetriever(BaseRetriever):
         elif self.instructions:
             logger.warning(f"Instructions provided but model '{embedding_model}' not in supported models: {INSTRUCTION_AWARE_MODELS}")
             
-        similarity_result = self.vectorstore.similarity_search_with_score(query, k=self.k)
+        if self.cache is not None:
+            similarity_result = self.cache.get_or_compute(
+                self.vectorstore,
+                "semantic",
+                query,
+                self.k,
+                lambda: self.vectorstore.similarity_search_with_score(query, k=self.k),
+            )
+        else:
+            similarity_result = self.vectorstore.similarity_search_with_score(query, k=self.k)
         logger.debug("=== Similarity Search Results ===")
         logger.debug(f"Query: {query}")
         logger.debug(f"Using embedding model: {embedding_model}")
@@ -5,7 +5,7 @@ import time
 
 from datetime import datetime
 from threading import Lock
-from typing import List
+from typing import Any, Dict, List
 from urllib.parse import urlparse
 from functools import wraps
 
@@ -17,9 +17,10 @@ import psycopg2.extras
 import yaml
 from authlib.integrations.flask_client import OAuth
 from chromadb.config import Settings
-from flask import jsonify, render_template, request, session, flash, redirect, url_for
+from flask import Response, jsonify, render_template, request, session, flash, redirect, stream_with_context, url_for
 from flask_cors import CORS
 from langchain_chroma.vectorstores import Chroma
+from langchain_core.messages import AIMessage
 from pygments import highlight
 from pygments.formatters import HtmlFormatter
 from pygments.lexers import (BashLexer, CLexer, CppLexer, FortranLexer,
@@ -27,8 +28,9 @@ from pygments.lexers import (BashLexer, CLexer, CppLexer, FortranLexer,
                              MathematicaLexer, MatlabLexer, PythonLexer,
                              TypeScriptLexer)
 
-from src.a2rchi.a2rchi import A2rchi
+from src.a2rchi.utils.pipeline_pool import PipelinePool
 from src.data_manager.data_manager import DataManager
+from src.data_manager.vectorstore.retrievers import retrieval_cache_from_config
 from src.utils.config_loader import CONFIGS_PATH, get_config_names, load_config
 from src.utils.env import read_secret
 from src.utils.logging import get_logger
@@ -126,12 +128,14 @@ class ChatWrapper:
             "password": read_secret("PG_PASSWORD"),
             **self.services_config["postgres"],
         }
-        self.conn = None
-        self.cursor = None
 
-        # initialize lock and chain
+        # initialize lock and chain; requests resolve their own A2rchi instance from a pool of
+        # warm pipelines (one per config) so switching configs never rebuilds or swaps pipelines
         self.lock = Lock()
-        self.a2rchi = A2rchi(pipeline=self.config["services"]["chat_app"]["pipeline"])
+        self.pipeline_pool = PipelinePool(
+            max_size=self.config["services"]["chat_app"].get("pipeline_pool_size", 4)
+        )
+        self.a2rchi = None
         self.number_of_queries = 0
 
         # track configs and active config state
@@ -147,10 +151,13 @@ class ChatWrapper:
         self._store_config_ids()
         if self.default_config_name:
             self.update_config(config_name=self.default_config_name)
+        else:
+            self.a2rchi = self.pipeline_pool.get(self.config["services"]["chat_app"]["pipeline"])
 
     def update_config(self, config_id=None, config_name=None):
         """
-        Update the active config by ensuring it exists in thje postgres and applying it to the pipeline.
+        Update the active config by ensuring it exists in the postgres and resolving the A2rchi instance serving it.
+        Returns (a2rchi, config_id) so callers can use them without relying on the (shared) active state.
         """
         target_config_name = config_name or self.current_config_name or self.default_config_name
         if not target_config_name:
@@ -162,13 +169,12 @@ class ChatWrapper:
         else:
             self.config_name_to_id[target_config_name] = config_id
 
-        if self.config_id == config_id and self.current_config_name == target_config_name:
-            return
-
         pipeline_name = config_payload["services"]["chat_app"]["pipeline"]
+        a2rchi = self.pipeline_pool.get(pipeline_name, config_name=target_config_name)
+        self.a2rchi = a2rchi
         self.config_id = config_id
         self.current_config_name = target_config_name
-        self.a2rchi.update(pipeline=pipeline_name, config_name=target_config_name)
+        return a2rchi, config_id
 
     def _get_config_payload(self, config_name):
         if config_name not in self._config_cache:
@@ -404,15 +410,14 @@ class ChatWrapper:
         )
 
         # create connection to database
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute(SQL_INSERT_FEEDBACK, insert_tup)
-        self.conn.commit()
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
+        cursor.execute(SQL_INSERT_FEEDBACK, insert_tup)
+        conn.commit()
 
         # clean up database connection state
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
     def delete_reaction_feedback(self, message_id: int):
         """
@@ -420,13 +425,12 @@ class ChatWrapper:
         """
         if message_id is None:
             return
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute(SQL_DELETE_REACTION_FEEDBACK, (message_id,))
-        self.conn.commit()
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
+        cursor.execute(SQL_DELETE_REACTION_FEEDBACK, (message_id,))
+        conn.commit()
+        cursor.close()
+        conn.close()
 
 
     def query_conversation_history(self, conversation_id, client_id):
@@ -436,27 +440,25 @@ class ChatWrapper:
         the message content
         """
         # create connection to database
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
 
         # ensure conversation belongs to client before querying
-        self.cursor.execute(SQL_GET_CONVERSATION_METADATA, (conversation_id, client_id))
-        metadata = self.cursor.fetchone()
+        cursor.execute(SQL_GET_CONVERSATION_METADATA, (conversation_id, client_id))
+        metadata = cursor.fetchone()
         if metadata is None:
-            self.cursor.close()
-            self.conn.close()
-            self.cursor, self.conn = None, None
+            cursor.close()
+            conn.close()
             raise ConversationAccessError("Conversation does not exist for this client")
 
         # query conversation history
-        self.cursor.execute(SQL_QUERY_CONVO, (conversation_id,))
-        history = self.cursor.fetchall()
+        cursor.execute(SQL_QUERY_CONVO, (conversation_id,))
+        history = cursor.fetchall()
         history = collapse_assistant_sequences(history, sender_name=A2RCHI_SENDER)
 
         # clean up database connection state
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
         return history
 
@@ -478,16 +480,15 @@ class ChatWrapper:
         insert_tup = (title, now, now, client_id, version)
 
         # create connection to database
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute(SQL_CREATE_CONVERSATION, insert_tup)
-        conversation_id = self.cursor.fetchone()[0]
-        self.conn.commit()
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
+        cursor.execute(SQL_CREATE_CONVERSATION, insert_tup)
+        conversation_id = cursor.fetchone()[0]
+        conn.commit()
 
         # clean up database connection state
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
         logger.info(f"Created new conversation with ID: {conversation_id}")
         return conversation_id
@@ -500,17 +501,16 @@ class ChatWrapper:
         now = datetime.now()
 
         # create connection to database
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
 
         # update timestamp
-        self.cursor.execute(SQL_UPDATE_CONVERSATION_TIMESTAMP, (now, conversation_id, client_id))
-        self.conn.commit()
+        cursor.execute(SQL_UPDATE_CONVERSATION_TIMESTAMP, (now, conversation_id, client_id))
+        conn.commit()
 
         # clean up database connection state
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
     def prepare_context_for_storage(self, source_documents, scores):
         scores = scores or []
@@ -535,10 +535,14 @@ class ChatWrapper:
 
         return context
 
-    def insert_conversation(self, conversation_id, user_message, a2rchi_message, link, a2rchi_context, is_refresh=False) -> List[int]:
+    def insert_conversation(self, conversation_id, user_message, a2rchi_message, link, a2rchi_context, is_refresh=False, config_id=None) -> List[int]:
         """
+        Insert the user message (unless this is a refresh) and A2rchi's response, tagged with
+        the config that produced it (defaults to the active config).
         """
         logger.debug("Entered insert_conversation.")
+        if config_id is None:
+            config_id = self.config_id
 
         service = "Chatbot"
         # parse user message / a2rchi message
@@ -549,26 +553,25 @@ class ChatWrapper:
         insert_tups = (
             [
                 # (service, conversation_id, sender, content, context, ts)
-                (service, conversation_id, user_sender, user_content, '', '', user_msg_ts, self.config_id),
-                (service, conversation_id, a2rchi_sender, a2rchi_content, link, a2rchi_context, a2rchi_msg_ts, self.config_id),
+                (service, conversation_id, user_sender, user_content, '', '', user_msg_ts, config_id),
+                (service, conversation_id, a2rchi_sender, a2rchi_content, link, a2rchi_context, a2rchi_msg_ts, config_id),
             ]
             if not is_refresh
             else [
-                (service, conversation_id, a2rchi_sender, a2rchi_content, link, a2rchi_context, a2rchi_msg_ts, self.config_id),
+                (service, conversation_id, a2rchi_sender, a2rchi_content, link, a2rchi_context, a2rchi_msg_ts, config_id),
             ]
         )
 
         # create connection to database
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
-        psycopg2.extras.execute_values(self.cursor, SQL_INSERT_CONVO, insert_tups)
-        self.conn.commit()
-        message_ids = list(map(lambda tup: tup[0], self.cursor.fetchall()))
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
+        psycopg2.extras.execute_values(cursor, SQL_INSERT_CONVO, insert_tups)
+        conn.commit()
+        message_ids = list(map(lambda tup: tup[0], cursor.fetchall()))
 
         # clean up database connection state
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
         return message_ids
 
@@ -595,15 +598,14 @@ class ChatWrapper:
         )
 
         # create connection to database
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
-        self.cursor.execute(SQL_INSERT_TIMING, insert_tup)
-        self.conn.commit()
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
+        cursor.execute(SQL_INSERT_TIMING, insert_tup)
+        conn.commit()
 
         # clean up database connection state
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
     def insert_tool_calls_from_messages(self, conversation_id: int, message_id: int, messages: List) -> None:
         """
@@ -662,28 +664,21 @@ class ChatWrapper:
             
         logger.debug("Inserting %d tool calls for message %d", len(insert_tups), message_id)
 
-        self.conn = psycopg2.connect(**self.pg_config)
-        self.cursor = self.conn.cursor()
-        psycopg2.extras.execute_values(self.cursor, SQL_INSERT_TOOL_CALLS, insert_tups)
-        self.conn.commit()
+        conn = psycopg2.connect(**self.pg_config)
+        cursor = conn.cursor()
+        psycopg2.extras.execute_values(cursor, SQL_INSERT_TOOL_CALLS, insert_tups)
+        conn.commit()
 
-        self.cursor.close()
-        self.conn.close()
-        self.cursor, self.conn = None, None
+        cursor.close()
+        conn.close()
 
-    def __call__(self, message: List[str], conversation_id: int|None, client_id: str, is_refresh: bool, server_received_msg_ts: datetime,  client_sent_msg_ts: float, client_timeout: float, config_name: str):
+    def _update_vectorstore(self, timestamps: Dict[str, datetime]) -> None:
         """
-        Execute the chat functionality.
+        Update vector store through data manager; will only do something if new files have been added.
         """
-        # store timestamps for code profiling information
-        start_time = time.time()
-
-        timestamps = {}
-
         self.lock.acquire()
         timestamps['lock_acquisition_ts'] = datetime.now()
         try:
-            # update vector store through data manager; will only do something if newwhere files have been added
             logger.info("Acquired lock file update vectorstore")
 
             self.data_manager.update_vectorstore()
@@ -699,27 +694,133 @@ class ChatWrapper:
             self.lock.release()
             logger.info("Released lock file update vectorstore")
 
-        try:
-            # convert the message to native A2rchi form (because javascript does not have tuples)
-            sender, content = tuple(message[0])
+    def _prepare_chat_history(self, message: List[str], conversation_id: int|None, client_id: str, is_refresh: bool):
+        """
+        Resolve the conversation for this message and return (sender, content, conversation_id, history).
+        A new conversation is created when conversation_id is None.
+        """
+        # convert the message to native A2rchi form (because javascript does not have tuples)
+        sender, content = tuple(message[0])
 
-            if not client_id:
-                raise ValueError("client_id is required to process chat messages")
+        if not client_id:
+            raise ValueError("client_id is required to process chat messages")
 
-            # new conversation if conversation_id is None, otherwise use existing
-            if conversation_id is None:
-                conversation_id = self.create_conversation(content, client_id)
-                history = []
-            else:
-                history = self.query_conversation_history(conversation_id, client_id)
-                self.update_conversation_timestamp(conversation_id, client_id)
+        # new conversation if conversation_id is None, otherwise use existing
+        if conversation_id is None:
+            conversation_id = self.create_conversation(content, client_id)
+            history = []
+        else:
+            history = self.query_conversation_history(conversation_id, client_id)
+            self.update_conversation_timestamp(conversation_id, client_id)
 
-            timestamps['query_convo_history_ts'] = datetime.now()
+        # if this is a chat refresh / message regeneration; remove previous contiuous non-A2rchi message(s)
+        if is_refresh:
+            while history and history[-1][0] == A2RCHI_SENDER:
+                _ = history.pop(-1)
+
+        return sender, content, conversation_id, history
+
+    def _finalize_response(self, result, sender: str, content: str, conversation_id: int, is_refresh: bool, server_received_msg_ts: datetime, timestamps: Dict[str, datetime], config_id: int):
+        """
+        Format the final pipeline output for display and persist the conversation turn
+        (messages, context and agent tool calls). Returns (output, message_ids).
+        """
+        # keep track of total number of queries and log this amount
+        self.number_of_queries += 1
+        logger.info(f"Number of queries is: {self.number_of_queries}")
+
+        # display answer
+        output = self.format_code_in_text(result["answer"])
+
+        # display sources (links or ticket references)
+        documents = result.get("source_documents", [])
+        scores = result.get("metadata", {}).get("retriever_scores", [])
+        top_sources = self.get_top_sources(documents, scores)
+        output += self.format_links(top_sources)
+
+        # message is constructed!
+        timestamps['a2rchi_message_ts'] = datetime.now()
 
-            # if this is a chat refresh / message regeneration; remove previous contiuous non-A2rchi message(s)
-            if is_refresh:
-                while history and history[-1][0] == A2RCHI_SENDER:
-                    _ = history.pop(-1)
+        # formatting context
+        context = self.prepare_context_for_storage(documents, scores)
+
+        best_reference = "Link unavailable"
+        if top_sources:
+            primary_source = top_sources[0]
+            best_reference = primary_source["link"] or primary_source["display"]
+
+        # and now finally insert the conversation
+        user_message = (sender, content, server_received_msg_ts)
+        a2rchi_message = (A2RCHI_SENDER, output, timestamps['a2rchi_message_ts'])
+        message_ids = self.insert_conversation(
+            conversation_id,
+            user_message,
+            a2rchi_message,
+            best_reference,
+            context,
+            is_refresh,
+            config_id=config_id,
+        )
+        timestamps['insert_convo_ts'] = datetime.now()
+
+        # insert tool calls extracted from messages
+        agent_messages = getattr(result, 'messages', []) or []
+        logger.debug("Agent messages count: %d", len(agent_messages))
+        for i, msg in enumerate(agent_messages):
+            msg_type = type(msg).__name__
+            has_tool_calls = hasattr(msg, 'tool_calls') and msg.tool_calls
+            has_tool_call_id = hasattr(msg, 'tool_call_id') and msg.tool_call_id
+            logger.debug("  Message %d: %s, tool_calls=%s, tool_call_id=%s", 
+                       i, msg_type, has_tool_calls, has_tool_call_id)
+        if agent_messages and message_ids:
+            a2rchi_message_id = message_ids[-1]  # A2rchi's response is the last message
+            self.insert_tool_calls_from_messages(conversation_id, a2rchi_message_id, agent_messages)
+
+        return output, message_ids
+
+    @staticmethod
+    def _stream_events_from_output(output, seen_tool_calls: set, seen_tool_results: set) -> List[Dict[str, Any]]:
+        """
+        Translate a partial PipelineOutput into client events: tool-call progress
+        for agent messages, and the answer generated so far otherwise.
+        """
+        messages = getattr(output, "messages", []) or []
+        if not messages:
+            return [{"type": "chunk", "answer": output.answer}] if output.answer else []
+
+        events = []
+        for msg in messages:
+            for tc in getattr(msg, "tool_calls", None) or []:
+                tool_call_id = tc.get("id") or ""
+                if tool_call_id in seen_tool_calls:
+                    continue
+                seen_tool_calls.add(tool_call_id)
+                events.append({
+                    "type": "tool_start",
+                    "tool_call_id": tool_call_id,
+                    "tool_name": tc.get("name", "unknown"),
+                    "tool_args": tc.get("args", {}),
+                })
+            tool_call_id = getattr(msg, "tool_call_id", None)
+            if tool_call_id and tool_call_id not in seen_tool_results:
+                seen_tool_results.add(tool_call_id)
+                events.append({"type": "tool_end", "tool_call_id": tool_call_id})
+
+        last_message = messages[-1]
+        if isinstance(last_message, AIMessage) and not last_message.tool_calls and output.answer:
+            events.append({"type": "chunk", "answer": output.answer})
+        return events
+
+    def __call__(self, message: List[str], conversation_id: int|None, client_id: str, is_refresh: bool, server_received_msg_ts: datetime,  client_sent_msg_ts: float, client_timeout: float, config_name: str):
+        """
+        Execute the chat functionality.
+        """
+        timestamps = {}
+        self._update_vectorstore(timestamps)
+
+        try:
+            sender, content, conversation_id, history = self._prepare_chat_history(message, conversation_id, client_id, is_refresh)
+            timestamps['query_convo_history_ts'] = datetime.now()
 
             # guard call to LLM; if timestamp from message is more than timeout secs in the past;
             # return error=True and do not generate response as the client will have timed out
@@ -730,65 +831,15 @@ class ChatWrapper:
             if len(history) < QUERY_LIMIT:
                 history = history + [(sender, content)] if not is_refresh else history
                 requested_config = config_name or self.current_config_name or self.default_config_name
-                self.update_config(config_name=requested_config)
-                result = self.a2rchi(history=history, conversation_id=conversation_id)
+                a2rchi, config_id = self.update_config(config_name=requested_config)
+                result = a2rchi(history=history, conversation_id=conversation_id)
                 timestamps['chain_finished_ts'] = datetime.now()
             else:
                 # for now let's return a timeout error, as returning a different
                 # error message would require handling new message_ids param. properly
                 return None, None, None, timestamps, 500
 
-            # keep track of total number of queries and log this amount
-            self.number_of_queries += 1
-            logger.info(f"Number of queries is: {self.number_of_queries}")
-
-            # display answer
-            output = self.format_code_in_text(result["answer"])
-
-
-            # display sources (links or ticket references)
-            documents = result.get("source_documents", [])
-            scores = result.get("metadata", {}).get("retriever_scores", [])
-            top_sources = self.get_top_sources(documents, scores)
-            output += self.format_links(top_sources)
-
-            # message is constructed!
-            timestamps['a2rchi_message_ts'] = datetime.now()
-
-            # formatting context
-            context = self.prepare_context_for_storage(documents, scores)
-
-            best_reference = "Link unavailable"
-            if top_sources:
-                primary_source = top_sources[0]
-                best_reference = primary_source["link"] or primary_source["display"]
-
-            # and now finally insert the conversation
-            user_message = (sender, content, server_received_msg_ts)
-            a2rchi_message = (A2RCHI_SENDER, output, timestamps['a2rchi_message_ts'])
-            message_ids = self.insert_conversation(
-                conversation_id,
-                user_message,
-                a2rchi_message,
-                best_reference,
-                context,
-                is_refresh
-            )
-            timestamps['insert_convo_ts'] = datetime.now()
-            history.append((A2RCHI_SENDER, result["answer"]))
-            
-            # insert tool calls extracted from messages
-            agent_messages = getattr(result, 'messages', []) or []
-            logger.debug("Agent messages count: %d", len(agent_messages))
-            for i, msg in enumerate(agent_messages):
-                msg_type = type(msg).__name__
-                has_tool_calls = hasattr(msg, 'tool_calls') and msg.tool_calls
-                has_tool_call_id = hasattr(msg, 'tool_call_id') and msg.tool_call_id
-                logger.debug("  Message %d: %s, tool_calls=%s, tool_call_id=%s", 
-                           i, msg_type, has_tool_calls, has_tool_call_id)
-            if agent_messages and message_ids:
-                a2rchi_message_id = message_ids[-1]  # A2rchi's response is the last message
-                self.insert_tool_calls_from_messages(conversation_id, a2rchi_message_id, agent_messages)
+            output, message_ids = self._finalize_response(result, sender, content, conversation_id, is_refresh, server_received_msg_ts, timestamps, config_id)
 
         except ConversationAccessError as e:
             logger.warning(f"Unauthorized conversation access attempt: {e}")
@@ -798,16 +849,73 @@ class ChatWrapper:
             logger.error(f"Failed to produce response: {e}", exc_info=True)
             return None, None, None, timestamps, 500
 
-        finally:
-            if self.cursor is not None:
-                self.cursor.close()
-            if self.conn is not None:
-                self.conn.close()
-
         timestamps['finish_call_ts'] = datetime.now()
 
         return output, conversation_id, message_ids, timestamps, None
 
+    def stream(self, message: List[str], conversation_id: int|None, client_id: str, is_refresh: bool, server_received_msg_ts: datetime,  client_sent_msg_ts: float, client_timeout: float, config_name: str):
+        """
+        Streaming counterpart of __call__. Yields event dictionaries:
+            {"type": "chunk", "answer": ...}            answer generated so far (plain text)
+            {"type": "tool_start"/"tool_end", ...}      agent tool-call progress
+            {"type": "final", "response": ..., ...}     formatted answer, once the turn is persisted
+            {"type": "error", "status": ...}            on failure, with the same codes as __call__
+        The final event also carries "message_ids" and "timestamps" for the caller to store timing info.
+        Pipelines without a stream method are invoked normally and only produce the final event.
+        """
+        timestamps = {}
+        self._update_vectorstore(timestamps)
+
+        try:
+            sender, content, conversation_id, history = self._prepare_chat_history(message, conversation_id, client_id, is_refresh)
+            timestamps['query_convo_history_ts'] = datetime.now()
+
+            if server_received_msg_ts.timestamp() - client_sent_msg_ts > client_timeout:
+                yield {"type": "error", "status": 408}
+                return
+
+            if len(history) >= QUERY_LIMIT:
+                yield {"type": "error", "status": 500}
+                return
+
+            history = history + [(sender, content)] if not is_refresh else history
+            requested_config = config_name or self.current_config_name or self.default_config_name
+            a2rchi, config_id = self.update_config(config_name=requested_config)
+
+            # let the client know which conversation this turn belongs to before generation starts
+            yield {"type": "meta", "conversation_id": conversation_id}
+
+            result = None
+            if a2rchi.supports_stream():
+                seen_tool_calls, seen_tool_results = set(), set()
+                for output in a2rchi.stream(history=history, conversation_id=conversation_id):
+                    if output.final:
+                        result = output
+                        continue
+                    yield from self._stream_events_from_output(output, seen_tool_calls, seen_tool_results)
+            if result is None:
+                result = a2rchi(history=history, conversation_id=conversation_id)
+            timestamps['chain_finished_ts'] = datetime.now()
+
+            output, message_ids = self._finalize_response(result, sender, content, conversation_id, is_refresh, server_received_msg_ts, timestamps, config_id)
+            timestamps['finish_call_ts'] = datetime.now()
+
+            yield {
+                "type": "final",
+                "response": output,
+                "conversation_id": conversation_id,
+                "a2rchi_msg_id": message_ids[-1],
+                "message_ids": message_ids,
+                "timestamps": timestamps,
+            }
+
+        except ConversationAccessError as e:
+            logger.warning(f"Unauthorized conversation access attempt: {e}")
+            yield {"type": "error", "status": 403}
+        except Exception as e:
+            logger.error(f"Failed to produce streamed response: {e}", exc_info=True)
+            yield {"type": "error", "status": 500}
+
 
 class FlaskAppWrapper(object):
 
@@ -823,6 +931,7 @@ class FlaskAppWrapper(object):
         self.data_path = self.global_config["DATA_PATH"]
         self.persistence = PersistenceService(self.data_path)
         self.catalog = CatalogService(self.data_path)
+        self.retrieval_cache = retrieval_cache_from_config(self.config)
 
         self.salt = read_secret("UPLOADER_SALT")
         secret_key = read_secret("FLASK_UPLOADER_APP_SECRET_KEY")
@@ -883,6 +992,7 @@ class FlaskAppWrapper(object):
         # Protected endpoints (require auth when enabled)
         self.add_endpoint('/chat', 'index', self.require_auth(self.index))
         self.add_endpoint('/api/get_chat_response', 'get_chat_response', self.require_auth(self.get_chat_response), methods=["POST"])
+        self.add_endpoint('/api/get_chat_response_stream', 'get_chat_response_stream', self.require_auth(self.get_chat_response_stream), methods=["POST"])
         self.add_endpoint('/terms', 'terms', self.require_auth(self.terms))
         self.add_endpoint('/api/like', 'like', self.require_auth(self.like),  methods=["POST"])
         self.add_endpoint('/api/dislike', 'dislike', self.require_auth(self.dislike),  methods=["POST"])
@@ -1257,6 +1367,57 @@ class FlaskAppWrapper(object):
 
         return jsonify(response_data)
 
+    def get_chat_response_stream(self):
+        """
+        Streaming variant of get_chat_response, taking the same request body.
+
+        Returns:
+            A newline-delimited JSON stream (application/x-ndjson) of events: partial answers
+            ("chunk"), agent tool-call progress ("tool_start"/"tool_end"), and finally either
+            a "final" event with the same fields as get_chat_response or an "error" event.
+        """
+        server_received_msg_ts = datetime.now()
+
+        message = request.json.get('last_message')
+        conversation_id = request.json.get('conversation_id')
+        config_name = request.json.get('config_name')
+        is_refresh = request.json.get('is_refresh')
+        client_sent_msg_ts = request.json.get('client_sent_msg_ts') / 1000
+        client_timeout = request.json.get('client_timeout') / 1000
+        client_id = request.json.get('client_id')
+
+        if not client_id:
+            return jsonify({'error': 'client_id missing'}), 400
+
+        error_messages = {
+            408: 'client timeout',
+            403: 'conversation not found',
+        }
+
+        def generate():
+            start_time = time.time()
+            logger.debug("Streaming from the ChatWrapper()")
+            for event in self.chat.stream(message, conversation_id, client_id, is_refresh, server_received_msg_ts, client_sent_msg_ts, client_timeout, config_name):
+                if event["type"] == "error":
+                    event["error"] = error_messages.get(event["status"], 'server error; see chat logs for message')
+                elif event["type"] == "final":
+                    timestamps = event.pop("timestamps")
+                    message_ids = event.pop("message_ids")
+                    timestamps['server_response_msg_ts'] = datetime.now()
+                    timestamps['server_received_msg_ts'] = server_received_msg_ts
+                    timestamps['client_sent_msg_ts'] = datetime.fromtimestamp(client_sent_msg_ts)
+                    self.chat.insert_timing(message_ids[-1], timestamps)
+                    event['server_response_msg_ts'] = timestamps['server_response_msg_ts'].timestamp()
+                    event['final_response_msg_ts'] = datetime.now().timestamp()
+                    logger.info(f"API Streamed Response Time: {time.time() - start_time:.2f} seconds")
+                yield json.dumps(event, default=str) + "\n"
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+        )
+
     def landing(self):
         """Landing page for unauthenticated users"""
         # If user is already logged in, redirect to chat
@@ -1275,8 +1436,6 @@ class FlaskAppWrapper(object):
         return render_template('terms.html')
 
     def like(self):
-        self.chat.lock.acquire()
-        logger.info("Acquired lock file")
         try:
             # Get the JSON data from the request body
             data = request.json
@@ -1304,20 +1463,7 @@ class FlaskAppWrapper(object):
             logger.error(f"Request failed: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
-        # According to the Python documentation: https://docs.python.org/3/tutorial/errors.html#defining-clean-up-actions
-        # this will still execute, before the function returns in the try or except block.
-        finally:
-            self.chat.lock.release()
-            logger.info("Released lock file")
-
-            if self.chat.cursor is not None:
-                self.chat.cursor.close()
-            if self.chat.conn is not None:
-                self.chat.conn.close()
-
     def dislike(self):
-        self.chat.lock.acquire()
-        logger.info("Acquired lock file")
         try:
             # Get the JSON data from the request body
             data = request.json
@@ -1349,20 +1495,7 @@ class FlaskAppWrapper(object):
             logger.error(f"Request failed: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
-        # According to the Python documentation: https://docs.python.org/3/tutorial/errors.html#defining-clean-up-actions
-        # this will still execute, before the function returns in the try or except block.
-        finally:
-            self.chat.lock.release()
-            logger.info("Released lock file")
-
-            if self.chat.cursor is not None:
-                self.chat.cursor.close()
-            if self.chat.conn is not None:
-                self.chat.conn.close()
-
     def text_feedback(self):
-        self.chat.lock.acquire()
-        logger.info("Acquired lock file for text feedback")
         try:
             data = request.json
             message_id = data.get('message_id')
@@ -1395,15 +1528,6 @@ class FlaskAppWrapper(object):
             logger.error(f"Request failed: {str(e)}")
             return jsonify({'error': str(e)}), 500
 
-        finally:
-            self.chat.lock.release()
-            logger.info("Released lock file")
-
-            if self.chat.cursor is not None:
-                self.chat.cursor.close()
-            if self.chat.conn is not None:
-                self.chat.conn.close()
-
     def list_docs(self):
         """
         API endpoint to list all documents indexed in ChromaDB with pagination.
@@ -1550,7 +1674,16 @@ class FlaskAppWrapper(object):
             )
 
             # Perform similarity search with scores
-            results = vectorstore.similarity_search_with_score(query, k=n_results)
+            if self.retrieval_cache is not None:
+                results = self.retrieval_cache.get_or_compute(
+                    vectorstore,
+                    "semantic",
+                    query,
+                    n_results,
+                    lambda: vectorstore.similarity_search_with_score(query, k=n_results),
+                )
+            else:
+                results = vectorstore.similarity_search_with_score(query, k=n_results)
 
             # Format the response
             documents = []
@@ -1786,8 +1919,7 @@ class FlaskAppWrapper(object):
         """
         sources_index = {}
 
-        for source_hash in self.catalog.metadata_index.keys():
-            metadata_source = self.catalog.get_metadata_for_hash(source_hash)
+        for source_hash, metadata_source in self.catalog.get_all_metadata().items():
             if not isinstance(metadata_source, dict):
                 logger.info("Metadata for hash %s missing or invalid; skipping", source_hash)
                 continue
@@ -0,0 +1,142 @@
+import queue
+import time
+from concurrent.futures import Future
+from threading import Thread
+from typing import Callable, List, Sequence, Tuple
+
+from flask import Flask, jsonify, request
+
+from src.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent embedding requests into micro-batches. The first request
+    of a batch waits at most max_wait_ms for others to join it, or until the batch
+    holds max_batch_size texts, and the whole batch is then embedded in one call.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 10.0,
+        name: str = "embedding",
+    ):
+        self.embed = embed
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._worker = Thread(target=self._run, name=f"{name}-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue texts for embedding; the returned future resolves to their vectors."""
+        future: Future = Future()
+        if not texts:
+            future.set_result([])
+        else:
+            self._queue.put((list(texts), future))
+        return future
+
+    def _collect_batch(self) -> List[Tuple[List[str], Future]]:
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            texts = [text for item_texts, _ in batch for text in item_texts]
+            try:
+                vectors = self.embed(texts)
+            except Exception as e:
+                logger.error(f"Failed to embed batch of {len(texts)} texts: {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            logger.debug(f"Embedded batch of {len(texts)} texts from {len(batch)} requests")
+            offset = 0
+            for item_texts, future in batch:
+                future.set_result(vectors[offset:offset + len(item_texts)])
+                offset += len(item_texts)
+
+
+def queries_embed_like_documents(model) -> bool:
+    """
+    Whether embed_query(text) gives the same vector as embed_documents([text])[0]
+    for this model, in which case queries can be batched with embed_documents.
+    """
+    model_name = type(model).__name__
+    if model_name == "OpenAIEmbeddings":
+        return True
+    if model_name == "HuggingFaceEmbeddings":
+        return not getattr(model, "query_encode_kwargs", None)
+    return False
+
+
+class FlaskAppWrapper(object):
+    """
+    Serves one embedding model to every A2rchi service of a deployment (see EmbeddingClient),
+    batching the concurrent requests it receives.
+    """
+
+    def __init__(self, app: Flask, embedding_model, max_batch_size: int = 64, max_wait_ms: float = 10.0):
+        self.app = app
+        self.embedding_model = embedding_model
+
+        wrapped_model = getattr(embedding_model, "model", embedding_model)
+        if queries_embed_like_documents(wrapped_model):
+            embed_queries = embedding_model.embed_documents
+        else:
+            embed_queries = lambda texts: [embedding_model.embed_query(text) for text in texts]
+
+        self.batchers = {
+            "documents": MicroBatcher(embedding_model.embed_documents, max_batch_size, max_wait_ms, name="documents"),
+            "query": MicroBatcher(embed_queries, max_batch_size, max_wait_ms, name="query"),
+        }
+
+        self.add_endpoint("/health", "health", self.health)
+        self.add_endpoint("/embed", "embed", self.embed, methods=["POST"])
+
+    def add_endpoint(self, endpoint=None, endpoint_name=None, handler=None, methods=['GET'], *args, **kwargs):
+        self.app.add_url_rule(endpoint, endpoint_name, handler, methods=methods, *args, **kwargs)
+
+    def run(self, **kwargs):
+        self.app.run(**kwargs)
+
+    def health(self):
+        return jsonify({"status": "ok"}), 200
+
+    def embed(self):
+        """
+        Embed a list of texts. Expects {"texts": [...], "kind": "documents" | "query"}
+        and returns {"embeddings": [[...], ...]} in the same order as the texts.
+        """
+        data = request.get_json(silent=True) or {}
+        texts = data.get("texts")
+        kind = data.get("kind", "documents")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            return jsonify({"error": "texts must be a list of strings"}), 400
+        if kind not in self.batchers:
+            return jsonify({"error": f"kind must be one of {sorted(self.batchers)}"}), 400
+
+        try:
+            embeddings = self.batchers[kind].submit(texts).result()
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        return jsonify({"embeddings": embeddings}), 200
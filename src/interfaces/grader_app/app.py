@@ -109,8 +109,6 @@ class GradingWrapper:
         self.conn = None
         self.cursor = None
 
-        self.lock = Lock()
-
         # initialize grading chain
         self.grader = A2rchi(pipeline="GradingPipeline") # more similar to chatwrapper, just need to handle the successive prompts SOMEWHERE
 
@@ -127,7 +125,7 @@ class GradingWrapper:
         Main grading pipeline: run summary → analysis → final decision.
         Returns final evaluation text.
         """
-        self.lock.acquire()
+        # the grading pipeline keeps no per-call state on the instance, so submissions can be graded concurrently
         try:
             final_decision = self.grader(
                 submission_text=student_solution,
@@ -138,7 +136,6 @@ class GradingWrapper:
             logger.error(f"Failed to grade submission: {str(e)}")
             final_decision = "Error during grading pipeline"
         finally:
-            self.lock.release()
             if self.cursor is not None:
                 self.cursor.close()
             if self.conn is not None:
@@ -25,15 +25,34 @@ class PiazzaAIWrapper:
         # intialize chain
         self.a2rchi = A2rchi(pipeline="QAPipeline")
 
+    @staticmethod
+    def format_post(post):
+        return "SUBJECT: " + post['history'][-1]['subject'] + "\n\nCONTENT: " + post['history'][-1]['content']
+
     def __call__(self, post):
 
         # post --> history for qa chain
-        post_str = "SUBJECT: " + post['history'][-1]['subject'] + "\n\nCONTENT: " + post['history'][-1]['content']
+        post_str = self.format_post(post)
         history = [("User", post_str)]
 
         answer = self.a2rchi(history=history)["answer"]
 
         return answer, post_str
+
+    def batch(self, posts, max_concurrency=None):
+        """
+        Answer several posts concurrently. Returns (answer, post_str) per post, in order;
+        the answer is the exception instead if that post failed.
+        """
+        post_strs = [self.format_post(post) for post in posts]
+        results = self.a2rchi.batch(
+            [{"history": [("User", post_str)]} for post_str in post_strs],
+            max_concurrency=max_concurrency,
+        )
+        return [
+            (result if isinstance(result, Exception) else result.answer, post_str)
+            for result, post_str in zip(results, post_strs)
+        ]
     
 
 
@@ -128,13 +147,22 @@ class Piazza:
             logger.info("No new posts to process.")
             return
 
-        # process 
+        # fetch the new posts, then answer them concurrently
+        posts = []
         for post_nr in new_post_nrs:
             try:
-                post = self.piazza_net.get_post(post_nr)
+                posts.append(self.piazza_net.get_post(post_nr))
+            except Exception as e:
+                logger.error(f"Failed to fetch post {post_nr} due to the following exception: {e}")
 
-                logger.info(f"PROCESSING NEW POST: {post_nr}")
-                response, post_str = self.ai_wrapper(post)
+        logger.info(f"PROCESSING NEW POSTS: {[post['nr'] for post in posts]}")
+        answers = self.ai_wrapper.batch(posts, max_concurrency=self.piazza_config.get("max_concurrency"))
+
+        for post, (response, post_str) in zip(posts, answers):
+            if isinstance(response, Exception):
+                logger.error(f"Failed to process post {post['nr']} due to the following exception: {response}")
+                continue
+            try:
                 response = f"====================\nReplying to Post @{post['nr']}\n==========\n\n{post_str}\n==========\n\nA2RCHI RESPONSE: {response}\n====================\n"
 
                 # send response to Slack
@@ -142,7 +170,7 @@ class Piazza:
                 logger.info(r)
                 time.sleep(1)  # to avoid hitting rate limits
             except Exception as e:
-                logger.error(f"Failed to process post {post_nr} due to the following exception: {e}")
+                logger.error(f"Failed to process post {post['nr']} due to the following exception: {e}")
 
         if post_nrs:
             # set min. next post to be one greater than max we just saw
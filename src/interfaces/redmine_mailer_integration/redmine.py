@@ -97,7 +97,8 @@ class RedmineAIWrapper:
         self.cursor, self.conn = None, None
 
 
-    def __call__(self, history, issue_id):
+    @staticmethod
+    def format_history(history):
         # create formatted history
         reformatted_history = []
         for entry in history:
@@ -109,12 +110,9 @@ class RedmineAIWrapper:
             reformatted_history.append((role,message))
         reformatted_history[0] = ("Expert", reformatted_history[0][1])
         reformatted_history[-1] = ("User", reformatted_history[-1][1])
+        return reformatted_history
 
-        # update vectorstore
-        self.data_manager.update_vectorstore()
-
-        # execute chain and get answer
-        result = self.a2rchi(history=reformatted_history)
+    def _store_result(self, reformatted_history, issue_id, result):
         answer = result.answer
 
         # prepare other information for storage
@@ -126,6 +124,57 @@ class RedmineAIWrapper:
         
         return answer
 
+    def __call__(self, history, issue_id):
+        reformatted_history = self.format_history(history)
+
+        # update vectorstore
+        self.data_manager.update_vectorstore()
+
+        # execute chain and get answer
+        result = self.a2rchi(history=reformatted_history)
+        return self._store_result(reformatted_history, issue_id, result)
+
+    def batch(self, histories_and_issue_ids, max_concurrency=None):
+        """
+        Answer several issues concurrently, given (history, issue_id) pairs. Returns the
+        answer per issue, in order; the answer is the exception instead if that issue failed
+        (a history that is an exception, e.g. it could not be fetched, is passed through).
+        """
+        answers = [None] * len(histories_and_issue_ids)
+        reformatted_histories = {}
+        for i, (history, _) in enumerate(histories_and_issue_ids):
+            if isinstance(history, Exception):
+                answers[i] = history
+                continue
+            try:
+                reformatted_histories[i] = self.format_history(history)
+            except Exception as e:
+                answers[i] = e
+
+        # update vectorstore; if that fails, answer from the current one
+        try:
+            self.data_manager.update_vectorstore()
+        except Exception as e:
+            logger.error(f"Failed to update the vectorstore, answering from the current one: {e}")
+            traceback.print_exc()
+
+        indices = list(reformatted_histories)
+        results = self.a2rchi.batch(
+            [{"history": reformatted_histories[i]} for i in indices],
+            max_concurrency=max_concurrency,
+        )
+
+        # storing shares one database connection, so it is done one issue at a time
+        for i, result in zip(indices, results):
+            if isinstance(result, Exception):
+                answers[i] = result
+                continue
+            try:
+                answers[i] = self._store_result(reformatted_histories[i], histories_and_issue_ids[i][1], result)
+            except Exception as e:
+                answers[i] = e
+        return answers
+
     @staticmethod
     def get_substring_between(text, start_word, end_word):
         """
@@ -276,6 +325,7 @@ class Redmine:
         Process all issues that are assigned to me and that are in 'New' or `In Progress` status.
         """
         issue_ids = []
+        issue_histories = []
         for issue in self.redmine.issue.filter(assigned_to_id=self.user.id,):
             if issue.status.id == self.status_dict['New'] or issue.status.id == self.status_dict['In Progress']:
                 issue_ids.append(issue.id)
@@ -286,14 +336,29 @@ class Redmine:
                         history += f"\n next entry: {record.notes}"                    
                 logger.info(f"History input: {history}")
                 try:
-                    answer = self.ai_wrapper(self.get_issue_history(issue.id), issue.id)
+                    issue_histories.append((self.get_issue_history(issue.id), issue.id))
                 except Exception as e:
-                    logger.error(str(e))
-                    traceback.print_exc()
-                    answer = "I am sorry, I am not able to process this request at the moment. Please continue with this ticket manually."
-                self.add_note_to_issue(issue.id,answer)
-                logger.info(f"A2rchi's response:\n {answer}")
-                self.feedback_issue(issue.id)
+                    issue_histories.append((e, issue.id))
+
+        # answer all the issues concurrently, then update them one by one
+        answers = []
+        if issue_histories:
+            try:
+                answers = self.ai_wrapper.batch(issue_histories, max_concurrency=self.ai_wrapper.redmine_config.get("max_concurrency"))
+            except Exception as e:
+                # not an answer to any one issue: leave them all for the next scan
+                logger.error(f"Failed to answer the new issues, leaving them for the next scan: {e}")
+                traceback.print_exc()
+                return []
+
+        for issue_id, answer in zip(issue_ids, answers):
+            if isinstance(answer, Exception):
+                logger.error(str(answer))
+                traceback.print_exception(answer)
+                answer = "I am sorry, I am not able to process this request at the moment. Please continue with this ticket manually."
+            self.add_note_to_issue(issue_id,answer)
+            logger.info(f"A2rchi's response:\n {answer}")
+            self.feedback_issue(issue_id)
         logger.info("redmine.process_new_issues: %d"%(len(issue_ids)))
         return issue_ids
 
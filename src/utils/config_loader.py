@@ -1,76 +1,255 @@
+import copy
+import hashlib
 import os
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
 
 import yaml
 
+from src.utils.lazy_imports import import_path
+
 # DEFINITIONS
 CONFIGS_PATH = "/root/A2rchi/configs/"
 
+# parse with libyaml when available, it is an order of magnitude faster than the pure-python loader
+_YAML_LOADER = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+# classes that can be referenced in the configs' class maps, as "module:attribute".
+# a config loaded with map=True holds LazyClass references to them, which import on first use.
+MODEL_CLASS_PATHS = {
+    "AnthropicLLM": "src.a2rchi.models.anthropic:AnthropicLLM",
+    "OpenAIGPT4": "src.a2rchi.models.openai:OpenAILLM",
+    "OpenAIGPT35": "src.a2rchi.models.openai:OpenAILLM",
+    "DumbLLM": "src.a2rchi.models.dumb:DumbLLM",
+    "LlamaLLM": "src.a2rchi.models.llama:LlamaLLM",
+    "HuggingFaceOpenLLM": "src.a2rchi.models.huggingface_open:HuggingFaceOpenLLM",
+    "HuggingFaceImageLLM": "src.a2rchi.models.huggingface_image:HuggingFaceImageLLM",
+    "VLLM": "src.a2rchi.models.vllm:VLLM",
+    "OllamaInterface": "src.a2rchi.models.ollama:OllamaInterface",
+}
+EMBEDDING_CLASS_PATHS = {
+    "OpenAIEmbeddings": "langchain_openai:OpenAIEmbeddings",
+    "HuggingFaceEmbeddings": "langchain_huggingface:HuggingFaceEmbeddings",
+}
+SSO_CLASS_PATHS = {
+    "CERNSSOScraper": "src.data_manager.collectors.scrapers.integrations.sso_scraper:CERNSSOScraper",
+}
+
+
+class LazyClass:
+    """
+    Reference to a class by "module:attribute" that is only imported when first used,
+    so that e.g. a service using only OpenAI models never imports torch or vLLM.
+    Calling it instantiates the class; other attributes are forwarded to the class.
+    """
+
+    __slots__ = ("path", "_cls", "_lock")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cls = None
+        self._lock = Lock()
+
+    def resolve(self) -> type:
+        if self._cls is None:
+            with self._lock:
+                if self._cls is None:
+                    self._cls = import_path(self.path)
+        return self._cls
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyClass):
+            return self.path == other.path
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (LazyClass, (self.path,))
+
+    def __repr__(self):
+        return f"LazyClass({self.path!r})"
+
+
+def resolve_class(cls: Any) -> Any:
+    """Return the actual class behind a (possibly lazy) class reference from a mapped config."""
+    return cls.resolve() if isinstance(cls, LazyClass) else cls
+
+
+class ReadOnlyDict(dict):
+    """
+    Read-only view of a cached config section. Configs are shared between all
+    callers, so they refuse in-place changes; use copy.deepcopy for a mutable copy.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Configs returned by the config loader are read-only, use copy.deepcopy() to modify them.")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {key: copy.deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class ReadOnlyList(list):
+    """
+    Read-only view of a list in a cached config, see ReadOnlyDict.
+    """
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Configs returned by the config loader are read-only, use copy.deepcopy() to modify them.")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(value, memo) for value in self]
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+# dump the read-only views like the plain containers they wrap
+for _dumper in (yaml.Dumper, yaml.SafeDumper):
+    yaml.add_representer(ReadOnlyDict, lambda dumper, data: dumper.represent_dict(data), Dumper=_dumper)
+    yaml.add_representer(ReadOnlyList, lambda dumper, data: dumper.represent_list(data), Dumper=_dumper)
+
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return ReadOnlyDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return ReadOnlyList(_freeze(item) for item in value)
+    return value
+
+
+@dataclass
+class _CachedConfig:
+    mtime_ns: int
+    size: int
+    digest: str
+    config: ReadOnlyDict
+    mapped: Optional[ReadOnlyDict] = None
+
+
+_cache_lock = Lock()
+_config_cache: Dict[str, _CachedConfig] = {}
+_default_path: Optional[Tuple[int, str]] = None
+
+
+def _config_path(name: str = None) -> str:
+    """
+    Path of the configuration specified by name, or of the first one by default.
+    The default is only looked up again when the configs directory changes.
+    """
+    global _default_path
+
+    if name is not None:
+        return CONFIGS_PATH + f"{name}.yaml"
+
+    dir_mtime = os.stat(CONFIGS_PATH).st_mtime_ns
+    with _cache_lock:
+        if _default_path is None or _default_path[0] != dir_mtime:
+            _default_path = (dir_mtime, CONFIGS_PATH + os.listdir(CONFIGS_PATH)[0])
+        return _default_path[1]
+
+
+def _get_cached_config(name: str = None) -> _CachedConfig:
+    """
+    Return the cache entry for the configuration specified by name, (re)parsing
+    the file only if it is new or its modification time or size changed.
+    """
+    path = _config_path(name)
+    stat = os.stat(path)
+
+    with _cache_lock:
+        entry = _config_cache.get(path)
+        if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            return entry
+
+        with open(path, "rb") as f:
+            raw = f.read()
+        config = yaml.load(raw, Loader=_YAML_LOADER)
+        entry = _CachedConfig(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=hashlib.sha256(raw).hexdigest(),
+            config=_freeze(config),
+        )
+        _config_cache[path] = entry
+        return entry
+
+
+def _map_classes(config: Dict[str, Any]) -> ReadOnlyDict:
+    """
+    Return a copy of the config where the class names in the class maps are
+    replaced by lazy references to the actual classes.
+    """
+    config = copy.deepcopy(config)
+
+    # change the model class parameter from a string to an actual class
+    for model, entry in config["a2rchi"]["model_class_map"].items():
+        entry["class"] = LazyClass(MODEL_CLASS_PATHS[model])
+
+    for model, entry in config["data_manager"]["embedding_class_map"].items():
+        entry["class"] = LazyClass(EMBEDDING_CLASS_PATHS[model])
+
+    # change the SSO class parameter from a string to an actual class
+    sso_section = config.get('utils', {}).get('sso', {}) or {}
+    sources_sso = config.get('data_manager', {}).get('sources', {}).get('sso', {}) or {}
+    active_sso_config = None
+    if sources_sso.get('enabled'):
+        active_sso_config = sources_sso
+    elif sso_section.get('enabled'):
+        active_sso_config = sso_section
+
+    if active_sso_config:
+        sso_class_map = active_sso_config.get('sso_class_map', {})
+        for sso_class in sso_class_map.keys():
+            if sso_class in SSO_CLASS_PATHS:
+                sso_class_map[sso_class]['class'] = LazyClass(SSO_CLASS_PATHS[sso_class])
+
+    return _freeze(config)
+
+
 def load_config(map: bool = False, name: str = None):
     """
     Load the configuration specified by name, or the first one by default.
     Optionally maps models to the corresponding class.
+    The returned config is a cached, read-only view.
     """
 
-    if name is None:
-        default_path = CONFIGS_PATH + os.listdir(CONFIGS_PATH)[0]
-        with open(default_path, "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-    else:
-        with open(CONFIGS_PATH+f"{name}.yaml", "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
+    entry = _get_cached_config(name)
+    if not map:
+        return entry.config
 
-    # change the model class parameter from a string to an actual class
-    if map:
-
-        from langchain_huggingface import HuggingFaceEmbeddings
-        from langchain_openai import OpenAIEmbeddings
-
-        from src.a2rchi.models import (VLLM, AnthropicLLM, DumbLLM,
-                                       HuggingFaceImageLLM, HuggingFaceOpenLLM,
-                                       LlamaLLM, OllamaInterface, OpenAILLM)
-        from src.data_manager.collectors.scrapers.integrations.sso_scraper import \
-            CERNSSOScraper
-        
-        MODEL_MAPPING = {
-            "AnthropicLLM": AnthropicLLM,
-            "OpenAIGPT4": OpenAILLM,
-            "OpenAIGPT35": OpenAILLM,
-            "DumbLLM": DumbLLM,
-            "LlamaLLM": LlamaLLM,
-            "HuggingFaceOpenLLM": HuggingFaceOpenLLM,
-            "HuggingFaceImageLLM": HuggingFaceImageLLM,
-            "VLLM": VLLM,
-            "OllamaInterface": OllamaInterface, 
-        }
-        for model in config["a2rchi"]["model_class_map"].keys():
-            config["a2rchi"]["model_class_map"][model]["class"] = MODEL_MAPPING[model]
-
-        EMBEDDING_MAPPING = {
-            "OpenAIEmbeddings": OpenAIEmbeddings,
-            "HuggingFaceEmbeddings": HuggingFaceEmbeddings
-        }
-        for model in config["data_manager"]["embedding_class_map"].keys():
-            config["data_manager"]["embedding_class_map"][model]["class"] = EMBEDDING_MAPPING[model]
-
-        # change the SSO class parameter from a string to an actual class
-        sso_section = config.get('utils', {}).get('sso', {}) or {}
-        sources_sso = config.get('data_manager', {}).get('sources', {}).get('sso', {}) or {}
-        active_sso_config = None
-        if sources_sso.get('enabled'):
-            active_sso_config = sources_sso
-        elif sso_section.get('enabled'):
-            active_sso_config = sso_section
-
-        if active_sso_config:
-            SSO_MAPPING = {
-                'CERNSSOScraper': CERNSSOScraper,
-            }
-            sso_class_map = active_sso_config.get('sso_class_map', {})
-            for sso_class in sso_class_map.keys():
-                if sso_class in SSO_MAPPING:
-                    sso_class_map[sso_class]['class'] = SSO_MAPPING[sso_class]
-
-    return config
+    if entry.mapped is None:
+        mapped = _map_classes(entry.config)
+        with _cache_lock:
+            if entry.mapped is None:
+                entry.mapped = mapped
+    return entry.mapped
 
 def load_global_config(name: str = None):
     """
@@ -78,15 +257,7 @@ def load_global_config(name: str = None):
     This is assumed to be static.
     """
 
-    if name is None:
-        default_path = CONFIGS_PATH + os.listdir(CONFIGS_PATH)[0]
-        with open(default_path, "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-    else:
-        with open(CONFIGS_PATH+f"{name}.yaml", "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-
-    return config["global"]
+    return load_config(name=name)["global"]
 
 def load_utils_config(name: str = None):
     """
@@ -94,15 +265,7 @@ def load_utils_config(name: str = None):
     This is assumed to be static.
     """
 
-    if name is None:
-        default_path = CONFIGS_PATH + os.listdir(CONFIGS_PATH)[0]
-        with open(default_path, "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-    else:
-        with open(CONFIGS_PATH+f"{name}.yaml", "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-
-    return config.get("utils", {}) or {}
+    return load_config(name=name).get("utils", {}) or {}
 
 def load_data_manager_config(name: str = None):
     """
@@ -110,15 +273,7 @@ def load_data_manager_config(name: str = None):
     This is assumed to be static.
     """
 
-    if name is None:
-        default_path = CONFIGS_PATH + os.listdir(CONFIGS_PATH)[0]
-        with open(default_path, "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-    else:
-        with open(CONFIGS_PATH+f"{name}.yaml", "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-
-    return config["data_manager"]
+    return load_config(name=name)["data_manager"]
 
 def load_services_config(name: str = None):
     """
@@ -126,15 +281,25 @@ def load_services_config(name: str = None):
     This is assumed to be static.
     """
 
-    if name is None:
-        default_path = CONFIGS_PATH + os.listdir(CONFIGS_PATH)[0]
-        with open(default_path, "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
-    else:
-        with open(CONFIGS_PATH+f"{name}.yaml", "r") as f:
-            config = yaml.load(f, Loader=yaml.FullLoader)
+    return load_config(name=name)["services"]
+
+def get_config_hash(name: str = None):
+    """
+    Return a hash of the raw contents of the configuration specified by name
+    (or the first one by default), used to detect that a config file changed.
+    """
+
+    return _get_cached_config(name).digest
+
+def clear_config_cache():
+    """
+    Drop all cached configs, forcing the next load to re-read the files.
+    """
+    global _default_path
 
-    return config["services"]
+    with _cache_lock:
+        _config_cache.clear()
+        _default_path = None
 
 def get_config_names():
     """
@@ -0,0 +1,35 @@
+"""Lazy imports of objects referenced as "module:attribute"."""
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def import_path(path: str) -> Any:
+    """Import and return the object referenced by a "module:attribute" path."""
+    module_name, attribute = path.split(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def make_lazy_getattr(
+    lazy_imports: Dict[str, str], module_name: str
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """
+    Return the module ``__getattr__`` and ``__dir__`` of a package exporting
+    ``lazy_imports`` (name -> "module:attribute"), which are only imported when first
+    accessed; the imported object is then set on the package so later lookups are direct.
+
+        __getattr__, __dir__ = make_lazy_getattr(_LAZY_IMPORTS, __name__)
+    """
+
+    def __getattr__(name: str) -> Any:
+        if name not in lazy_imports:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = import_path(lazy_imports[name])
+        setattr(sys.modules[module_name], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[module_name])) | set(lazy_imports))
+
+    return __getattr__, __dir__
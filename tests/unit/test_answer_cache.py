@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("langchain_core")
+
+from src.a2rchi.utils.answer_cache import SemanticAnswerCache
+from src.a2rchi.utils.output_dataclass import PipelineOutput
+
+
+class KeywordEmbeddings:
+    """Embeds a question by which of a few keywords it contains."""
+
+    keywords = ("quota", "transfer", "restart", "site")
+
+    def embed_query(self, text):
+        return [float(keyword in text.lower()) for keyword in self.keywords]
+
+
+def _ask(cache, question, version="v1", answer=None):
+    lookup = cache.lookup(question, version)
+    if not lookup.hit and answer is not None:
+        cache.store(lookup, PipelineOutput(answer=answer, metadata={"condensed_output": question}))
+    return lookup
+
+
+def test_similar_question_hits():
+    cache = SemanticAnswerCache(KeywordEmbeddings(), similarity_threshold=0.95)
+    assert not _ask(cache, "Why is the transfer over quota?", answer="Clean up the area.").hit
+
+    lookup = _ask(cache, "transfer failing: quota exceeded")
+    assert lookup.hit
+    assert lookup.output.answer == "Clean up the area."
+    assert lookup.similarity == pytest.approx(1.0)
+
+    assert not _ask(cache, "How do I restart the site?").hit
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_cached_output_carries_current_metadata():
+    cache = SemanticAnswerCache(KeywordEmbeddings())
+    _ask(cache, "transfer quota", answer="Clean up the area.")
+    lookup = _ask(cache, "quota of transfer")
+
+    output = cache.cached_output(lookup, {"condensed_output": "quota of transfer"})
+    assert output.answer == "Clean up the area."
+    assert output.metadata["condensed_output"] == "quota of transfer"
+    assert output.metadata["answer_cache"]["cached_question"] == "transfer quota"
+
+
+def test_new_corpus_version_drops_entries():
+    cache = SemanticAnswerCache(KeywordEmbeddings())
+    _ask(cache, "transfer quota", version="v1", answer="old answer")
+
+    assert not _ask(cache, "transfer quota", version="v2").hit
+    assert cache.stats()["entries"] == 0
+
+
+def test_ttl_and_max_entries():
+    cache = SemanticAnswerCache(KeywordEmbeddings(), max_entries=2, ttl_seconds=60)
+    _ask(cache, "quota", answer="a")
+    _ask(cache, "transfer", answer="b")
+    _ask(cache, "restart", answer="c")
+    assert cache.stats()["entries"] == 2
+    assert not _ask(cache, "quota").hit
+
+    for entry in cache._entries:
+        entry.created -= 61
+    assert not _ask(cache, "restart").hit
+    assert cache.stats()["entries"] == 0
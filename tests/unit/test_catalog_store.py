@@ -0,0 +1,110 @@
+import pytest
+
+from src.data_manager.collectors.utils.catalog_store import CatalogStore
+
+
+def test_upsert_and_indexes(tmp_path):
+    store = CatalogStore(tmp_path)
+    store.upsert_file("aaa", "docs/guide.md", fingerprint="10-1")
+    store.upsert_metadata("aaa", "docs/guide.md.meta.yaml", {"source_type": "web", "owner": "ops"})
+    store.upsert_metadata("bbb", "tickets/527.meta.yaml", {"source_type": "ticket", "ticket_id": "CMSTRANSF-527"})
+
+    assert store.file_index() == {"aaa": "docs/guide.md"}
+    assert store.metadata_index() == {"aaa": "docs/guide.md.meta.yaml", "bbb": "tickets/527.meta.yaml"}
+    assert store.get_metadata("aaa") == {"source_type": "web", "owner": "ops"}
+    assert store.get_metadata("ccc") is None
+    assert store.get_fingerprint("aaa") == "10-1"
+    assert sorted(store.get_all_metadata()) == ["aaa", "bbb"]
+
+    # indexed column and metadata JSON lookups
+    assert store.find("source_type", "ticket") == ["bbb"]
+    assert store.find("ticket_id", "CMSTRANSF-527") == ["bbb"]
+    assert store.find("owner", "ops") == ["aaa"]
+
+    store.delete(["aaa"])
+    assert store.file_index() == {}
+    assert store.find("owner", "ops") == []
+
+
+def test_shared_between_instances(tmp_path):
+    writer, reader = CatalogStore(tmp_path), CatalogStore(tmp_path)
+    writer.upsert_file("aaa", "docs/guide.md")
+    assert reader.file_index() == {"aaa": "docs/guide.md"}
+
+
+def test_migrate_once(tmp_path):
+    store = CatalogStore(tmp_path)
+    metadata_files = {"aaa.meta.yaml": {"url": "https://example.org/a"}}
+
+    assert store.migrate_once(
+        lambda: {"aaa": "aaa.txt"},
+        lambda: {"aaa": "aaa.meta.yaml"},
+        load_metadata=metadata_files.get,
+        resolve_path=lambda stored: tmp_path / stored,
+    )
+    assert store.file_index() == {"aaa": "aaa.txt"}
+    assert store.find("url", "https://example.org/a") == ["aaa"]
+
+    # a second call (e.g. from another process) does nothing, and does not even load the catalogs
+    def not_loaded():
+        raise AssertionError("YAML catalog loaded after the migration")
+
+    assert not CatalogStore(tmp_path).migrate_once(
+        not_loaded, not_loaded, load_metadata=metadata_files.get, resolve_path=lambda stored: tmp_path / stored
+    )
+    assert store.file_index() == {"aaa": "aaa.txt"}
+
+
+def test_changes_since(tmp_path):
+    store = CatalogStore(tmp_path)
+    assert store.generation() == 0
+    store.upsert_file("aaa", "a.txt")
+    start = store.generation()
+
+    store.upsert_file("bbb", "b.txt")
+    store.upsert_metadata_many([("aaa", "a.meta.yaml", {}), ("ccc", "c.meta.yaml", {})])
+    store.delete(["bbb"])
+
+    assert store.generation() > start
+    assert sorted(store.changes_since(start)) == ["aaa", "bbb", "ccc"]
+    assert store.changes_since(store.generation()) == []
+    assert sorted(store.rows_for(["aaa", "bbb", "ccc"])) == ["aaa", "ccc"]
+
+
+def test_changes_since_compacted_or_bulk_change(tmp_path):
+    store = CatalogStore(tmp_path)
+    for i in range(5):
+        store.upsert_file(f"h{i}", f"{i}.txt")
+
+    store.compact_changes(keep=2)
+    assert store.changes_since(1) is None
+    assert sorted(store.changes_since(store.generation() - 2)) == ["h3", "h4"]
+
+    # the YAML migration is a bulk change: readers re-read everything
+    generation = store.generation()
+    store.migrate_once(dict, dict, load_metadata=lambda stored: None, resolve_path=lambda stored: tmp_path / stored)
+    assert store.changes_since(generation) is None
+
+
+def test_catalog_service_reads_yaml_catalogs_once(tmp_path, monkeypatch):
+    pytest.importorskip("chromadb")
+    import src.data_manager.vectorstore  # noqa: F401 (imports index_utils in dependency order)
+    from src.data_manager.collectors.utils.index_utils import CatalogService
+
+    (tmp_path / "index.yaml").write_text("aaa: aaa.txt\n")
+    (tmp_path / "metadata_index.yaml").write_text("{}\n")
+    loaded = []
+    load_index = CatalogService.load_index.__func__
+
+    def counting_load_index(cls, data_path, filename=None):
+        loaded.append(filename)
+        return load_index(cls, data_path, filename)
+
+    monkeypatch.setattr(CatalogService, "load_index", classmethod(counting_load_index))
+
+    assert CatalogService(tmp_path).file_index == {"aaa": "aaa.txt"}
+    assert sorted(loaded) == ["index.yaml", "metadata_index.yaml"]
+
+    # once migrated, constructing a service does not parse the YAML catalogs again
+    assert CatalogService(tmp_path).file_index == {"aaa": "aaa.txt"}
+    assert len(loaded) == 2
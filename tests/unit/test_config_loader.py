@@ -0,0 +1,49 @@
+import copy
+import os
+
+import pytest
+import yaml
+
+import src.utils.config_loader as config_loader
+
+
+@pytest.fixture
+def configs_path(tmp_path, monkeypatch):
+    (tmp_path / "main.yaml").write_text("name: main\nglobal:\n  verbosity: 3\nservices:\n  ports: [1, 2]\n")
+    monkeypatch.setattr(config_loader, "CONFIGS_PATH", f"{tmp_path}/")
+    config_loader.clear_config_cache()
+    yield tmp_path
+    config_loader.clear_config_cache()
+
+
+def test_load_config_is_cached(configs_path):
+    config = config_loader.load_config()
+    assert config["name"] == "main"
+    assert config_loader.load_config(name="main") is config
+    assert config_loader.load_global_config() == {"verbosity": 3}
+
+
+def test_load_config_is_read_only(configs_path):
+    config = config_loader.load_config()
+    with pytest.raises(TypeError):
+        config["name"] = "other"
+    with pytest.raises(TypeError):
+        config["services"]["ports"].append(3)
+
+    mutable = copy.deepcopy(config)
+    mutable["services"]["ports"].append(3)
+    assert config["services"]["ports"] == [1, 2]
+    assert yaml.safe_load(yaml.dump(config)) == mutable | {"services": {"ports": [1, 2]}}
+
+
+def test_load_config_reloads_modified_file(configs_path):
+    config_file = configs_path / "main.yaml"
+    old_hash = config_loader.get_config_hash("main")
+    assert config_loader.load_config()["global"]["verbosity"] == 3
+
+    config_file.write_text("name: main\nglobal:\n  verbosity: 4\n")
+    stat = config_file.stat()
+    os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert config_loader.load_config()["global"]["verbosity"] == 4
+    assert config_loader.get_config_hash("main") != old_hash
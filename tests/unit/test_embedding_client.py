@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("chromadb")
+
+from flask import Flask
+
+from src.data_manager.vectorstore.embedding_client import EmbeddingClient
+from src.interfaces.embedding_server.app import FlaskAppWrapper
+
+
+class LengthEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [-float(len(text))]
+
+
+class Response:
+    def __init__(self, response, status_code=None):
+        self.status_code = status_code or response.status_code
+        self.text = response.get_data(as_text=True)
+        self._json = response.get_json()
+
+    def json(self):
+        return self._json
+
+
+class ServerSession:
+    """Sends the client's requests to an in-process embedding server."""
+
+    def __init__(self, status_code=None):
+        self.server = FlaskAppWrapper(Flask(__name__), LengthEmbeddings(), max_wait_ms=0).app.test_client()
+        self.status_code = status_code
+        self.requests = []
+
+    def post(self, url, json, timeout):
+        self.requests.append(json)
+        return Response(self.server.post("/embed", json=json), self.status_code)
+
+
+def _client(max_request_size, session):
+    client = EmbeddingClient("embedding-server", 7870, max_request_size=max_request_size)
+    client._session = session
+    return client
+
+
+def test_documents_are_split_into_requests():
+    session = ServerSession()
+    client = _client(3, session)
+    texts = ["a" * n for n in range(1, 8)]
+
+    assert client.embed_documents(texts) == [[float(n)] for n in range(1, 8)]
+    assert [len(request["texts"]) for request in session.requests] == [3, 3, 1]
+    assert {request["kind"] for request in session.requests} == {"documents"}
+    assert client.embed_documents([]) == []
+    assert len(session.requests) == 3
+
+
+def test_query():
+    session = ServerSession()
+    assert _client(3, session).embed_query("abcd") == [-4.0]
+    assert session.requests == [{"texts": ["abcd"], "kind": "query"}]
+
+
+def test_server_errors_raise():
+    client = _client(3, ServerSession(status_code=500))
+    with pytest.raises(RuntimeError, match="returned 500"):
+        client.embed_documents(["a"])
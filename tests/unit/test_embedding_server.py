@@ -0,0 +1,139 @@
+import threading
+
+import pytest
+
+pytest.importorskip("flask")
+
+from flask import Flask
+
+from src.interfaces.embedding_server.app import FlaskAppWrapper, MicroBatcher
+import src.utils.config_loader as config_loader
+
+
+class WordEmbeddings:
+    """Embeds a text as [number of words, number of characters]."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.document_calls = []
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [[float(len(text.split())), float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text.split())), -1.0]
+
+
+class RecordingEmbed:
+    def __init__(self, fail=False):
+        self.batches = []
+        self.fail = fail
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_a_batch():
+    embed = RecordingEmbed()
+    batcher = MicroBatcher(embed, max_batch_size=64, max_wait_ms=200)
+
+    futures = {}
+
+    def submit(texts):
+        futures[texts] = batcher.submit(list(texts))
+
+    threads = [threading.Thread(target=submit, args=(texts,)) for texts in (("a",), ("bb", "ccc"), ("dddd",))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert futures[("a",)].result(timeout=5) == [[1.0]]
+    assert futures[("bb", "ccc")].result(timeout=5) == [[2.0], [3.0]]
+    assert futures[("dddd",)].result(timeout=5) == [[4.0]]
+    assert len(embed.batches) == 1
+    assert sorted(embed.batches[0]) == ["a", "bb", "ccc", "dddd"]
+
+
+def test_batches_stop_at_max_batch_size():
+    embed = RecordingEmbed()
+    batcher = MicroBatcher(embed, max_batch_size=4, max_wait_ms=500)
+
+    # requests are never split, a batch closes once it holds max_batch_size texts
+    futures = [batcher.submit(texts) for texts in (["a", "b"], ["c", "d"], ["e", "f"])]
+    assert [future.result(timeout=5) for future in futures] == [[[1.0], [1.0]]] * 3
+    assert embed.batches == [["a", "b", "c", "d"], ["e", "f"]]
+
+
+def test_failed_batch_fails_every_request():
+    batcher = MicroBatcher(RecordingEmbed(fail=True), max_wait_ms=100)
+    futures = [batcher.submit(["a"]), batcher.submit(["b"])]
+    for future in futures:
+        with pytest.raises(RuntimeError, match="model crashed"):
+            future.result(timeout=5)
+    assert batcher.submit([]).result(timeout=5) == []
+
+
+@pytest.fixture
+def server():
+    model = WordEmbeddings()
+    wrapper = FlaskAppWrapper(Flask(__name__), model, max_batch_size=8, max_wait_ms=0)
+    return model, wrapper.app.test_client()
+
+
+def test_embed_route(server):
+    model, client = server
+
+    response = client.post("/embed", json={"texts": ["one", "two words"], "kind": "documents"})
+    assert response.status_code == 200
+    assert response.get_json() == {"embeddings": [[1.0, 3.0], [2.0, 9.0]]}
+
+    # queries go through embed_query unless the model is known to embed them like documents
+    response = client.post("/embed", json={"texts": ["a question"], "kind": "query"})
+    assert response.get_json() == {"embeddings": [[2.0, -1.0]]}
+    assert model.document_calls == [["one", "two words"]]
+
+
+def test_embed_route_rejects_bad_requests(server):
+    _, client = server
+    assert client.post("/embed", json={"texts": "one"}).status_code == 400
+    assert client.post("/embed", json={"texts": ["one", 2]}).status_code == 400
+    assert client.post("/embed", json={"texts": ["one"], "kind": "images"}).status_code == 400
+    assert client.get("/health").status_code == 200
+
+
+def test_server_from_template_config(tmp_path, monkeypatch):
+    pytest.importorskip("chromadb")
+    jinja2 = pytest.importorskip("jinja2")
+
+    # render the config the CLI deploys, with the embedding model swapped for WordEmbeddings
+    env = jinja2.Environment(loader=jinja2.PackageLoader("src.cli"), undefined=jinja2.ChainableUndefined)
+    rendered = env.get_template("base-config.yaml").render(
+        name="test",
+        data_manager={"embedding_name": "HuggingFaceEmbeddings"},
+        services={"embedding_server": {"enabled": True}},
+    )
+    (tmp_path / "test.yaml").write_text(rendered)
+    monkeypatch.setattr(config_loader, "CONFIGS_PATH", f"{tmp_path}/")
+    monkeypatch.setitem(config_loader.EMBEDDING_CLASS_PATHS, "HuggingFaceEmbeddings", f"{__name__}:WordEmbeddings")
+    config_loader.clear_config_cache()
+
+    try:
+        # importing the data manager reads the config, so this comes after it is in place
+        import src.bin.service_embedding as service_embedding
+        from src.data_manager.vectorstore.embeddings import release_embedding_model
+
+        app = service_embedding.create_app()
+        try:
+            assert isinstance(app.embedding_model.model, WordEmbeddings)
+            assert app.embedding_model.model.kwargs["model_name"] == "sentence-transformers/all-MiniLM-L6-v2"
+            response = app.app.test_client().post("/embed", json={"texts": ["a b"]})
+            assert response.get_json() == {"embeddings": [[2.0, 3.0]]}
+        finally:
+            release_embedding_model(app.embedding_model)
+    finally:
+        config_loader.clear_config_cache()
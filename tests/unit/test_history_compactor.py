@@ -0,0 +1,98 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.a2rchi.pipelines.agents.utils.history_compactor import SUMMARY_PREFIX, HistoryCompactor
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return AIMessage(content=f"summary {len(self.prompts)}")
+
+
+def count_words(texts):
+    return [len(text.split()) for text in texts]
+
+
+def conversation(turns, words=6):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=" ".join([f"q{i}"] * words)))
+        messages.append(AIMessage(content=" ".join([f"a{i}"] * words)))
+    return messages
+
+
+@pytest.fixture
+def summarizer():
+    return FakeSummarizer()
+
+
+@pytest.fixture
+def compactor(summarizer):
+    return HistoryCompactor(summarizer, count_words, max_tokens=30, keep_recent_messages=2, target_ratio=0.5)
+
+
+def test_history_within_budget_is_unchanged(compactor, summarizer):
+    messages = conversation(2)
+    assert compactor.compact("c1", messages) == messages
+    assert summarizer.prompts == []
+
+
+def test_older_messages_are_summarized(compactor, summarizer):
+    messages = conversation(3)
+    compacted = compactor.compact("c1", messages)
+
+    # the newest turn fits in half the budget; the summary is merged into its user message
+    assert len(compacted) == 2
+    assert compacted[0].content.startswith(f"{SUMMARY_PREFIX}summary 1\n\n")
+    assert compacted[0].content.endswith(messages[4].content)
+    assert compacted[1] is messages[5]
+    assert "q0" in summarizer.prompts[0] and "a1" in summarizer.prompts[0]
+    assert "q2" not in summarizer.prompts[0]
+
+
+def test_summary_is_reused_then_extended(compactor, summarizer):
+    messages = conversation(3)
+    compactor.compact("c1", messages)
+
+    # the next turn still fits next to the cached summary
+    compacted = compactor.compact("c1", messages + conversation(4)[6:7])
+    assert compacted[0].content.startswith(f"{SUMMARY_PREFIX}summary 1")
+    assert len(summarizer.prompts) == 1
+
+    # once it no longer does, only the messages that left the window are summarized
+    compacted = compactor.compact("c1", conversation(4))
+    assert len(summarizer.prompts) == 2
+    assert "summary 1" in summarizer.prompts[1]
+    assert "q2" in summarizer.prompts[1] and "q0" not in summarizer.prompts[1]
+    assert compacted[0].content.startswith(f"{SUMMARY_PREFIX}summary 2")
+
+
+def test_edited_history_is_summarized_again(compactor, summarizer):
+    compactor.compact("c1", conversation(3))
+    edited = conversation(3)
+    edited[0] = HumanMessage(content="a different first question " * 2)
+
+    compactor.compact("c1", edited)
+    assert len(summarizer.prompts) == 2
+    assert "summary 1" not in summarizer.prompts[1]
+
+
+def test_cut_keeps_whole_turns(compactor):
+    messages = conversation(3)
+    counts = count_words([m.content for m in messages])
+    cut = compactor._cut(messages, counts)
+    assert cut == 4
+    assert isinstance(messages[cut], HumanMessage)
+
+    # a long answer pushes the cut to the start of the next turn, not into the middle of one
+    messages[3] = AIMessage(content="long " * 2)
+    messages[5] = AIMessage(content="long " * 12)
+    counts = count_words([m.content for m in messages])
+    assert compactor._cut(messages, counts) == 4
@@ -0,0 +1,47 @@
+from src.data_manager.collectors.utils.catalog_store import CatalogStore
+from src.data_manager.collectors.utils.identifiers import (normalize_identifier,
+                                                           query_identifiers,
+                                                           resource_identifiers)
+
+
+def test_normalize_identifier():
+    assert normalize_identifier(" CMSTRANSF-527, ") == "cmstransf-527"
+    assert normalize_identifier("https://example.org/Page/") == "https://example.org/page"
+
+
+def test_query_identifiers():
+    query = "Why does CMSTRANSF-527 fail? See https://example.org/issue/12, #1234 and job_config.yaml"
+    assert query_identifiers(query) == [
+        "https://example.org/issue/12",
+        "cmstransf-527",
+        "1234",
+        "job_config.yaml",
+    ]
+    assert query_identifiers("how do I restart a transfer") == []
+
+
+def test_resource_identifiers():
+    identifiers = resource_identifiers(
+        "ABC123", {"ticket_id": "CMSTRANSF-527", "url": "", "title": "ignored"}, path="docs/Guide.md"
+    )
+    assert identifiers == {"abc123", "cmstransf-527", "guide.md"}
+
+
+def test_find_identifiers_and_delete(tmp_path):
+    store = CatalogStore(tmp_path)
+    store.upsert_file("aaa", "docs/guide.md")
+    store.upsert_metadata("aaa", "docs/guide.md.meta.yaml", {"url": "https://example.org/guide"})
+    store.upsert_metadata("bbb", "tickets/527.meta.yaml", {"ticket_id": "CMSTRANSF-527"})
+
+    assert store.find_identifiers(query_identifiers("CMSTRANSF-527 and guide.md")) == ["bbb", "aaa"]
+    assert store.find_identifiers(["https://example.org/guide"]) == ["aaa"]
+
+    # a new metadata version replaces the identifiers taken from the old one
+    store.upsert_metadata("aaa", "docs/guide.md.meta.yaml", {"url": "https://example.org/moved"})
+    assert store.find_identifiers(["https://example.org/guide"]) == []
+    assert store.find_identifiers(["guide.md"]) == ["aaa"]
+
+    generation = store.generation()
+    store.delete(["aaa"])
+    assert store.find_identifiers(["guide.md", "https://example.org/moved", "aaa"]) == []
+    assert store.changes_since(generation) == ["aaa"]
@@ -0,0 +1,87 @@
+import threading
+
+from src.data_manager.collectors.utils.journal import ChangeJournal
+from src.data_manager.collectors.utils.text_index import TextIndex
+
+
+def test_read_returns_new_records_only(tmp_path):
+    journal = ChangeJournal(tmp_path / "changes.journal", compact_every=3)
+    records, position = journal.read()
+    assert records == []
+
+    journal.append([{"op": "set", "hash": "a"}, {"op": "set", "hash": "b"}])
+    records, position = journal.read(position)
+    assert [r["hash"] for r in records] == ["a", "b"]
+
+    journal.append([{"op": "remove", "hash": "a"}])
+    records, position = journal.read(position)
+    assert records == [{"op": "remove", "hash": "a"}]
+    assert journal.count() == 3
+    assert journal.needs_compaction()
+
+
+def test_read_skips_incomplete_last_line(tmp_path):
+    journal = ChangeJournal(tmp_path / "changes.journal")
+    journal.append([{"op": "set", "hash": "a"}])
+    with journal.path.open("a", encoding="utf-8") as fh:
+        fh.write('{"op": "set", "ha')
+    records, position = journal.read()
+    assert records == [{"op": "set", "hash": "a"}]
+
+    with journal.path.open("a", encoding="utf-8") as fh:
+        fh.write('sh": "b"}\n')
+    records, _ = journal.read(position)
+    assert records == [{"op": "set", "hash": "b"}]
+
+
+def test_reset_restarts_readers(tmp_path):
+    journal = ChangeJournal(tmp_path / "changes.journal")
+    journal.append([{"op": "set", "hash": "a"}])
+    _, position = journal.read()
+
+    with journal.lock():
+        journal.reset()
+    journal.append([{"op": "set", "hash": "b"}])
+    records, _ = journal.read(position)
+    assert records == [{"op": "set", "hash": "b"}]
+
+
+def test_lock_is_reentrant(tmp_path):
+    journal = ChangeJournal(tmp_path / "changes.journal")
+    with journal.lock():
+        with journal.lock():
+            journal.append([{"op": "set", "hash": "a"}])
+    assert journal.count() == 1
+
+
+def test_text_indexes_sharing_a_data_path_see_each_other(tmp_path):
+    first = TextIndex(tmp_path, compact_every=1000)
+    second = TextIndex(tmp_path, compact_every=1000)
+
+    first.add("a" * 8, "alpha text")
+    first.flush()
+    second.add("b" * 8, "beta text")
+    second.flush(compact=True)
+
+    first.reload()
+    assert first.candidates("alpha") == ["a" * 8]
+    assert first.candidates("beta") == ["b" * 8]
+    assert sorted(TextIndex(tmp_path).hashes()) == ["a" * 8, "b" * 8]
+
+
+def test_concurrent_flushes_and_compactions_lose_no_change(tmp_path):
+    indexes = [TextIndex(tmp_path, compact_every=5) for _ in range(2)]
+
+    def write(index, prefix):
+        for i in range(40):
+            index.add(f"{prefix}{i:07d}", f"text of {prefix} {i}")
+            index.flush()
+
+    threads = [threading.Thread(target=write, args=(index, prefix)) for index, prefix in zip(indexes, "xy")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = sorted(f"{prefix}{i:07d}" for prefix in "xy" for i in range(40))
+    assert sorted(TextIndex(tmp_path).hashes()) == expected
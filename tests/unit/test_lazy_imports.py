@@ -0,0 +1,46 @@
+import sys
+import types
+
+import pytest
+
+from src.utils.lazy_imports import import_path, make_lazy_getattr
+
+
+@pytest.fixture
+def package(monkeypatch):
+    module = types.ModuleType("lazy_test_package")
+    module.__getattr__, module.__dir__ = make_lazy_getattr(
+        {"OrderedDict": "collections:OrderedDict", "missing": "collections:missing"}, module.__name__
+    )
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    return module
+
+
+def test_import_path():
+    assert import_path("os.path:join") is __import__("os").path.join
+
+
+def test_export_is_imported_on_first_access(package):
+    from collections import OrderedDict
+
+    assert "OrderedDict" not in vars(package)
+    assert package.OrderedDict is OrderedDict
+    # cached on the package, so the next lookup does not go through __getattr__
+    assert vars(package)["OrderedDict"] is OrderedDict
+    assert "OrderedDict" in dir(package)
+
+
+def test_unknown_names(package):
+    with pytest.raises(AttributeError, match="no attribute 'Counter'"):
+        package.Counter
+    with pytest.raises(AttributeError):
+        package.missing
+
+
+def test_packages_stay_lazy():
+    import src.a2rchi.models as models
+    import src.a2rchi.pipelines as pipelines
+
+    assert set(models.__all__) <= set(dir(models))
+    assert set(pipelines.__all__) <= set(dir(pipelines))
+    assert "src.a2rchi.models.vllm" not in sys.modules
@@ -0,0 +1,52 @@
+import pytest
+
+from src.data_manager.collectors.utils.metadata_search import MetadataSearchIndex, flatten_metadata
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = MetadataSearchIndex(tmp_path)
+    index.add("aaa", {"ticket_id": "CMSTRANSF-527", "title": "Stuck transfers at T2_US_MIT"})
+    index.add("bbb", {"ticket_id": "CMSTRANSF-52", "source": {"type": "jira"}})
+    index.add("ccc", {"url": "https://example.org/mit", "title": None})
+    return index
+
+
+def test_flatten_metadata():
+    assert flatten_metadata({"a": 1, "b": {"c": None, "d": {"e": "x"}}}) == {"a": "1", "b.c": "", "b.d.e": "x"}
+
+
+def test_key_value_query_prefers_exact_match(index):
+    assert index.search("ticket_id: CMSTRANSF-527") == [("aaa", {"ticket_id": "CMSTRANSF-527"})]
+    assert index.search("ticket_id=cmstransf-527") == [("aaa", {"ticket_id": "CMSTRANSF-527"})]
+    # no exact match: substring of the value under that key
+    assert [h for h, _ in index.search("ticket_id: CMSTRANSF-5")] == ["aaa", "bbb"]
+    assert index.search("source.type: jira") == [("bbb", {"source.type": "jira"})]
+
+
+def test_free_text_query_matches_keys_and_values(index):
+    assert [h for h, _ in index.search("mit")] == ["aaa", "ccc"]
+    assert index.search("mit", limit=1) == [("aaa", {"title": "Stuck transfers at T2_US_MIT"})]
+    assert [h for h, _ in index.search("url")] == ["ccc"]
+    assert index.search("nothing like this") == []
+
+
+def test_lookup_and_remove(index):
+    assert index.lookup("ticket_id", "CMSTRANSF-52") == ["bbb"]
+    assert index.lookup("ticket_id", "cmstransf-52") == []
+
+    index.remove("bbb")
+    assert index.lookup("ticket_id", "CMSTRANSF-52") == []
+    assert [h for h, _ in index.search("CMSTRANSF")] == ["aaa"]
+
+
+def test_changes_persist_across_instances(index, tmp_path):
+    index.flush()
+    other = MetadataSearchIndex(tmp_path)
+    assert other.get("aaa")["ticket_id"] == "CMSTRANSF-527"
+
+    index.add("aaa", {"ticket_id": "CMSTRANSF-600"})
+    index.flush(compact=True)
+    other.reload()
+    assert other.lookup("ticket_id", "CMSTRANSF-600") == ["aaa"]
+    assert other.lookup("ticket_id", "CMSTRANSF-527") == []
@@ -0,0 +1,70 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+pytest.importorskip("chromadb")
+
+import src.a2rchi.utils.pipeline_pool as pipeline_pool
+
+
+class FakeA2rchi:
+    builds = []
+
+    def __init__(self, pipeline, config_name=None):
+        if pipeline == "Broken":
+            raise RuntimeError("cannot build")
+        self.pipeline_name = pipeline
+        self.config_name = config_name
+        self.closed = False
+        FakeA2rchi.builds.append((pipeline, config_name))
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def config_hashes(monkeypatch):
+    hashes = {}
+    FakeA2rchi.builds = []
+    monkeypatch.setattr(pipeline_pool, "A2rchi", FakeA2rchi)
+    monkeypatch.setattr(pipeline_pool, "get_config_hash", lambda name: hashes.get(name, "v1"))
+    return hashes
+
+
+def test_get_reuses_pooled_instance(config_hashes):
+    pool = pipeline_pool.PipelinePool(max_size=2)
+    first = pool.get("QAPipeline", config_name="a")
+    assert pool.get("QAPipeline", config_name="a") is first
+    assert FakeA2rchi.builds == [("QAPipeline", "a")]
+
+
+def test_least_recently_used_instance_is_evicted_without_closing(config_hashes):
+    pool = pipeline_pool.PipelinePool(max_size=2)
+    a = pool.get("QAPipeline", config_name="a")
+    pool.get("QAPipeline", config_name="b")
+    pool.get("QAPipeline", config_name="a")
+    pool.get("QAPipeline", config_name="c")
+
+    assert len(pool) == 2
+    assert pool.get("QAPipeline", config_name="a") is a
+    pool.get("QAPipeline", config_name="b")
+    assert FakeA2rchi.builds.count(("QAPipeline", "b")) == 2
+    # requests may still be running on an evicted instance
+    assert not a.closed
+
+
+def test_changed_config_replaces_stale_instance(config_hashes):
+    pool = pipeline_pool.PipelinePool(max_size=4)
+    old = pool.get("QAPipeline", config_name="a")
+    config_hashes["a"] = "v2"
+    new = pool.get("QAPipeline", config_name="a")
+
+    assert new is not old
+    assert len(pool) == 1
+
+
+def test_failed_build_leaves_no_build_lock(config_hashes):
+    pool = pipeline_pool.PipelinePool()
+    with pytest.raises(RuntimeError):
+        pool.get("Broken", config_name="a")
+    assert pool._build_locks == {}
+    assert len(pool) == 0
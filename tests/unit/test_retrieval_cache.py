@@ -0,0 +1,76 @@
+import pytest
+
+pytest.importorskip("chromadb")
+
+import src.data_manager.vectorstore.retrievers.cache as retrieval_cache
+from src.data_manager.vectorstore.corpus_version import publish_corpus_version
+
+
+class FakeCollection:
+    name = "docs_with_test"
+
+
+class FakeVectorstore:
+    _collection = FakeCollection()
+
+
+@pytest.fixture
+def searches():
+    calls = []
+
+    def search(result):
+        def compute():
+            calls.append(result)
+            return [result]
+        return compute
+
+    search.calls = calls
+    return search
+
+
+def test_hits_on_normalized_query(tmp_path, searches):
+    cache = retrieval_cache.RetrievalCache(str(tmp_path))
+    vectorstore = FakeVectorstore()
+
+    assert cache.get_or_compute(vectorstore, "hybrid", "disk  quota", 3, searches("a")) == ["a"]
+    assert cache.get_or_compute(vectorstore, "hybrid", " disk quota ", 3, searches("b")) == ["a"]
+    # a different k, retriever or filter is a different search
+    assert cache.get_or_compute(vectorstore, "hybrid", "disk quota", 5, searches("c")) == ["c"]
+    assert cache.get_or_compute(vectorstore, "semantic", "disk quota", 3, searches("d")) == ["d"]
+    assert cache.get_or_compute(vectorstore, "hybrid", "disk quota", 3, searches("e"), filters={"x": 1}) == ["e"]
+
+    assert searches.calls == ["a", "c", "d", "e"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_new_corpus_version_misses(tmp_path, searches):
+    cache = retrieval_cache.RetrievalCache(str(tmp_path))
+    vectorstore = FakeVectorstore()
+
+    publish_corpus_version(str(tmp_path), FakeCollection.name, "v1")
+    cache.get_or_compute(vectorstore, "hybrid", "quota", 3, searches("old"))
+    publish_corpus_version(str(tmp_path), FakeCollection.name, "v2")
+    assert cache.get_or_compute(vectorstore, "hybrid", "quota", 3, searches("new")) == ["new"]
+
+
+def test_ttl_expiry(tmp_path, searches, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(retrieval_cache.time, "monotonic", lambda: now[0])
+    cache = retrieval_cache.RetrievalCache(str(tmp_path), ttl_seconds=60)
+    vectorstore = FakeVectorstore()
+
+    cache.get_or_compute(vectorstore, "hybrid", "quota", 3, searches("a"))
+    now[0] += 59
+    assert cache.get_or_compute(vectorstore, "hybrid", "quota", 3, searches("b")) == ["a"]
+    now[0] += 2
+    assert cache.get_or_compute(vectorstore, "hybrid", "quota", 3, searches("c")) == ["c"]
+
+
+def test_lru_eviction(tmp_path, searches):
+    cache = retrieval_cache.RetrievalCache(str(tmp_path), max_entries=2)
+    vectorstore = FakeVectorstore()
+
+    for query in ("a", "b", "a", "c"):
+        cache.get_or_compute(vectorstore, "hybrid", query, 3, searches(query))
+    assert cache.get_or_compute(vectorstore, "hybrid", "a", 3, searches("a2")) == ["a"]
+    assert cache.get_or_compute(vectorstore, "hybrid", "b", 3, searches("b2")) == ["b2"]
@@ -0,0 +1,44 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import src.a2rchi.pipelines.agents.utils.run_budget as run_budget
+from src.a2rchi.pipelines.agents.utils.run_budget import RunBudget
+
+
+def test_no_limits_never_stops():
+    budget = RunBudget.from_config({})
+    budget.record([AIMessage(content="x" * 4000)])
+    assert budget.check() is None
+
+
+def test_token_limit_with_reserve():
+    budget = RunBudget(max_tokens=1000, reserve=0.2)
+    usage = {"input_tokens": 500, "output_tokens": 200, "total_tokens": 700}
+    budget.record([HumanMessage(content="question"), AIMessage(content="", usage_metadata=usage)])
+    assert budget.check() is None
+    assert budget.model_calls == 1
+
+    budget.record([ToolMessage(content="result", tool_call_id="1"), AIMessage(content="", usage_metadata=usage)])
+    assert budget.tokens_used == 1400
+    assert budget.check() == "tokens"
+
+
+def test_tokens_estimated_without_usage():
+    budget = RunBudget(max_tokens=100)
+    budget.record([AIMessage(content="x" * 200)])
+    assert budget.tokens_used == 50
+
+
+def test_time_limit_with_reserve(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(run_budget.time, "monotonic", lambda: now[0])
+    budget = RunBudget(max_seconds=10, reserve=0.2)
+
+    now[0] += 7.9
+    assert budget.check() is None
+    now[0] += 0.2
+    assert budget.check() == "time"
+    assert budget.as_metadata()["elapsed_seconds"] == pytest.approx(8.1)
@@ -0,0 +1,58 @@
+import re
+
+from src.data_manager.collectors.utils.text_index import TextIndex, char_trigrams, required_literals
+
+
+def test_char_trigrams():
+    assert char_trigrams("AbCd") == {"abc", "bcd"}
+    assert char_trigrams("ab") == set()
+
+
+def test_required_literals():
+    assert required_literals(re.escape("disk quota exceeded")) == ["disk quota exceeded"]
+    assert required_literals(r"error \d+ in (job|task) logs") == ["error ", " in ", " logs"]
+    assert required_literals(r"timeout(s)?") == ["timeout"]
+    assert required_literals(r"(foo)+bar") == ["foo", "bar"]
+    assert required_literals(r"[abc]+|xyz") == []
+    assert required_literals(r"(unbalanced") == []
+
+
+def test_candidates_narrow_down_to_possible_matches(tmp_path):
+    index = TextIndex(tmp_path)
+    index.add("a" * 8, "Transfer failed: disk quota exceeded")
+    index.add("b" * 8, "Transfer succeeded")
+    index.add("c" * 8, "Quota checks are run nightly")
+
+    assert index.candidates(re.escape("Quota exceeded")) == ["a" * 8]
+    assert sorted(index.candidates("transfer")) == ["a" * 8, "b" * 8]
+    assert index.candidates("no such text") == []
+    # nothing to narrow the search with: every resource is a candidate
+    assert index.candidates(r"\d+") is None
+
+
+def test_removed_and_replaced_resources(tmp_path):
+    index = TextIndex(tmp_path)
+    index.add("a" * 8, "first version")
+    index.add("a" * 8, "second version")
+    index.add("b" * 8, "other text")
+    index.remove("b" * 8)
+
+    assert index.candidates("first") == []
+    assert index.candidates("second") == ["a" * 8]
+    assert index.get_text("a" * 8) == "second version"
+    assert index.get_text("b" * 8) is None
+
+    index.flush(compact=True)
+    reloaded = TextIndex(tmp_path)
+    assert reloaded.hashes() == ["a" * 8]
+    assert reloaded.candidates("second") == ["a" * 8]
+
+
+def test_sync_extracts_missing_and_drops_stale(tmp_path):
+    index = TextIndex(tmp_path)
+    index.add("stale000", "not catalogued anymore")
+    texts = {"aaaa0000": "alpha", "bbbb0000": "beta"}
+
+    assert index.sync(texts, texts.get) == 2
+    assert sorted(index.hashes()) == ["aaaa0000", "bbbb0000"]
+    assert index.sync(texts, texts.get) == 0
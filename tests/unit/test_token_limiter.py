@@ -0,0 +1,103 @@
+import importlib
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.documents import Document
+
+import src.utils.config_loader as config_loader
+
+
+class WordCountLLM:
+    """Counts one token per word."""
+
+    max_tokens = 100000
+
+    def get_num_tokens(self, text):
+        return len(text.split())
+
+
+@pytest.fixture(scope="module")
+def token_limiter(tmp_path_factory):
+    # history_utils reads the global config when it is imported
+    configs_path = tmp_path_factory.mktemp("configs")
+    (configs_path / "test.yaml").write_text("name: test\nglobal:\n  ROLES: [User, A2rchi, Expert]\n")
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(config_loader, "CONFIGS_PATH", f"{configs_path}/")
+        config_loader.clear_config_cache()
+        module = importlib.import_module("src.a2rchi.pipelines.classic_pipelines.utils.token_limiter")
+    config_loader.clear_config_cache()
+    return module
+
+
+def _docs(*word_counts):
+    return [Document(page_content=" ".join([f"w{i}"] * n), metadata={"rank": i}) for i, n in enumerate(word_counts)]
+
+
+def _ranks(docs):
+    return [doc.metadata["rank"] for doc in docs]
+
+
+def test_pack_documents_prefers_value_per_token(token_limiter):
+    limiter = token_limiter.TokenLimiter(WordCountLLM())
+    docs = _docs(50, 10, 10, 10)
+    packed, tokens = limiter._pack_documents([docs], [[50, 10, 10, 10]], available=30)
+
+    # the long top document gives way to three short ones, kept in retrieval order
+    assert _ranks(packed[0]) == [1, 2, 3]
+    assert tokens == [[10, 10, 10]]
+
+
+def test_pack_documents_keeps_min_docs(token_limiter):
+    limiter = token_limiter.TokenLimiter(WordCountLLM(), min_docs=1)
+    docs = _docs(50, 10, 10)
+    packed, tokens = limiter._pack_documents([docs], [[50, 10, 10]], available=60)
+
+    assert _ranks(packed[0]) == [0, 1]
+    assert tokens == [[50, 10]]
+
+
+def test_pack_documents_across_lists(token_limiter):
+    limiter = token_limiter.TokenLimiter(WordCountLLM())
+    first, second = _docs(10, 10), _docs(10, 10)
+    packed, tokens = limiter._pack_documents([first, second], [[10, 10], [10, 10]], available=20)
+
+    # the top document of each list beats the second of either
+    assert [_ranks(docs) for docs in packed] == [[0], [0]]
+
+
+def test_pack_documents_truncates_first_document_that_does_not_fit(token_limiter):
+    limiter = token_limiter.TokenLimiter(WordCountLLM(), truncate_last_document=True, min_truncated_doc_tokens=5)
+    docs = _docs(40, 40, 40)
+    packed, tokens = limiter._pack_documents([docs], [[40, 40, 40]], available=60)
+
+    assert _ranks(packed[0]) == [0, 1]
+    assert tokens[0][0] == 40
+    assert 0 < tokens[0][1] <= 20
+    assert packed[0][1].metadata["truncated"] is True
+    assert limiter.safe_token_count(packed[0][1].page_content) == tokens[0][1]
+
+
+def test_truncate_document(token_limiter):
+    limiter = token_limiter.TokenLimiter(WordCountLLM())
+    doc = Document(page_content=" ".join(f"word{i}" for i in range(100)), metadata={"source": "a"})
+    truncated, count = limiter._truncate_document(doc, 100, 30)
+
+    assert count <= 30
+    assert doc.page_content.startswith(truncated.page_content)
+    assert truncated.metadata == {"source": "a", "truncated": True}
+
+
+def test_prune_inputs_to_token_limit(token_limiter):
+    limiter = token_limiter.TokenLimiter(WordCountLLM(), min_history_messages=1)
+    limiter.effective_max_tokens = 45
+    history = [("User", "old " * 10), ("A2rchi", "older " * 10), ("User", "recent " * 5)]
+
+    pruned = limiter.prune_inputs_to_token_limit(
+        question="what failed", history=history, docs=_docs(30, 10, 10)
+    )
+
+    assert pruned["question"] == "what failed"
+    assert pruned["history"] == history[-1:]
+    assert _ranks(pruned["docs"]) == [1, 2]
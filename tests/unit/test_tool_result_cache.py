@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+import src.a2rchi.pipelines.agents.utils.tool_result_cache as tool_result_cache
+from src.a2rchi.pipelines.agents.utils.tool_result_cache import ToolResult, ToolResultCache
+
+
+@pytest.fixture
+def calls():
+    made = []
+
+    def call(output):
+        def compute():
+            made.append(output)
+            return ToolResult(output=output)
+        return compute
+
+    call.made = made
+    return call
+
+
+def test_hits_on_normalized_query(calls):
+    cache = ToolResultCache()
+    key = ToolResultCache.key("c1", "search_local_files", "Disk  Quota", "v1")
+
+    result, hit = cache.get_or_compute(key, calls("a"))
+    assert (result.output, hit) == ("a", False)
+
+    same = ToolResultCache.key("c1", "search_local_files", " disk quota ", "v1")
+    result, hit = cache.get_or_compute(same, calls("b"))
+    assert (result.output, hit) == ("a", True)
+    assert calls.made == ["a"]
+    assert cache.stats()["hit_rate"] == pytest.approx(0.5)
+
+
+def test_other_conversation_tool_or_version_misses(calls):
+    cache = ToolResultCache()
+    cache.get_or_compute(ToolResultCache.key("c1", "search_local_files", "quota", "v1"), calls("a"))
+
+    for key in (
+        ToolResultCache.key("c2", "search_local_files", "quota", "v1"),
+        ToolResultCache.key("c1", "search_metadata_index", "quota", "v1"),
+        ToolResultCache.key("c1", "search_local_files", "quota", "v2"),
+    ):
+        _, hit = cache.get_or_compute(key, calls("b"))
+        assert not hit
+    assert cache.stats()["misses"] == 4
+
+
+def test_ttl_expiry(calls, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tool_result_cache.time, "monotonic", lambda: now[0])
+    cache = ToolResultCache(ttl_seconds=60)
+    key = ToolResultCache.key("c1", "search_local_files", "quota", "v1")
+
+    cache.get_or_compute(key, calls("a"))
+    now[0] += 59
+    assert cache.get_or_compute(key, calls("b"))[0].output == "a"
+    now[0] += 2
+    assert cache.get_or_compute(key, calls("c"))[0].output == "c"
+
+
+def test_lru_eviction(calls):
+    cache = ToolResultCache(max_entries=2)
+
+    def key(query):
+        return ToolResultCache.key("c1", "search_local_files", query, "v1")
+
+    for query in ("a", "b", "a", "c"):
+        cache.get_or_compute(key(query), calls(query))
+    assert cache.get_or_compute(key("a"), calls("a2")) == (ToolResult(output="a"), True)
+    assert cache.get_or_compute(key("b"), calls("b2")) == (ToolResult(output="b2"), False)
+    assert cache.stats()["entries"] == 2
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0